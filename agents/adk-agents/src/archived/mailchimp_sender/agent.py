@@ -3,15 +3,51 @@ import mailchimp_marketing as MailchimpMarketing
 from mailchimp_marketing.api_client import ApiClientError
 import time
 import os
+import json
 import base64
+import asyncio
+import hashlib
+import sqlite3
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import AsyncIterator, Callable
 from dotenv import load_dotenv
 
+from retry_after import parse_retry_after
+
 load_dotenv()
 
 MAILCHIMP_API_KEY = os.getenv("MAILCHIMP_API_KEY")
 MAILCHIMP_SERVER = os.getenv("MAILCHIMP_SERVER")
 
+# Base URL of the Marketing API; can point to a local fake API for testing
+MAILCHIMP_API_URL = os.getenv("MAILCHIMP_API_URL") or f"https://{MAILCHIMP_SERVER}.api.mailchimp.com/3.0"
+# Mailchimp allows 10 simultaneous connections per API key and answers 429 beyond that
+MAILCHIMP_MAX_CONNECTIONS = int(os.getenv("MAILCHIMP_MAX_CONNECTIONS", "10"))
+MAILCHIMP_TIMEOUT = float(os.getenv("MAILCHIMP_TIMEOUT", "120"))
+MAILCHIMP_RETRIES = int(os.getenv("MAILCHIMP_RETRIES", "5"))
+MAILCHIMP_BACKOFF = float(os.getenv("MAILCHIMP_BACKOFF", "1"))
+# Mailchimp template the campaign content is rendered with
+MAILCHIMP_TEMPLATE_ID = 10054406
+
+# Local index of the images already in the File Manager, by content hash
+MAILCHIMP_FILE_INDEX_PATH = os.getenv(
+    "MAILCHIMP_FILE_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "file_index.sqlite3")
+)
+# Seconds after which the index is re-synced from the File Manager, to drop deleted files
+MAILCHIMP_FILE_INDEX_TTL = float(os.getenv("MAILCHIMP_FILE_INDEX_TTL", "3600"))
+# Files per fileManager listing page (the API allows up to 1000)
+MAILCHIMP_FILE_LIST_PAGE_SIZE = 1000
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Failures after which a request is known not to have reached the API; only these are retried
+# for requests that are not idempotent, since a retried POST may otherwise create a second object
+RETRYABLE_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Raw bytes encoded per chunk; a multiple of 3, so chunks encode to base64 without padding
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
 client = MailchimpMarketing.Client()
 client.set_config({"api_key": MAILCHIMP_API_KEY, "server": MAILCHIMP_SERVER})
 
@@ -24,13 +60,24 @@ def get_latest_compagin() -> str:
     return last_compagin_id
 
 def upload_image(file_name: str, file_path: str) -> tuple[str, str]:
-    with open(file_path, 'rb') as image_file:
-        image = base64.b64encode(image_file.read())
-        encoded_string = image.decode()
-        response = client.fileManager.upload({ "name": file_name, "file_data": encoded_string })
-        file_id = response["id"]
-        full_size_url = response["full_size_url"]
-        return (file_id, full_size_url)
+    # Checks the file index first, so an image that is already in the File Manager is not uploaded again
+    async def upload() -> tuple[str, str, bool]:
+        # A client of its own, closed at the end, so no connection pool outlives the call
+        mailchimp_client = AsyncMailchimpClient()
+        try:
+            return await upload_image_deduplicated(file_name, file_path, mailchimp_client=mailchimp_client)
+        finally:
+            await mailchimp_client.aclose()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        file_id, full_size_url, _ = asyncio.run(upload())
+    else:
+        # Called from a running event loop, which cannot run another coroutine to completion
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            file_id, full_size_url, _ = executor.submit(asyncio.run, upload()).result()
+    return (file_id, full_size_url)
 
 
 def duplicate_last_campagin() -> str:
@@ -53,10 +100,609 @@ def create_campagin(subject, title_slug_str):
 
         client.campaigns.set_content(new_compagin_id, {
             "template": {
-                "id": 10054406,
+                "id": MAILCHIMP_TEMPLATE_ID,
                 "sections": {
                 }
             }
         })
     except ApiClientError as error:
         print("Error: {}".format(error.text))
+
+
+class MailchimpError(Exception):
+    """
+    Raised when the Marketing API answers with an error that is not retried.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"Mailchimp API error {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _file_upload_body(name: str, file_path: str) -> tuple[int, Callable[[], AsyncIterator[bytes]]]:
+    """
+    Returns the length of a fileManager upload request body and a factory for the body.
+
+    The body is the JSON `{"name": ..., "file_data": "<base64>"}`, produced chunk by chunk
+    while the file is read, so the image is never held in memory as a whole. Its exact
+    length is known up front, so it is sent with a Content-Length instead of chunked.
+    """
+    prefix = b'{"name": ' + json.dumps(name).encode() + b', "file_data": "'
+    suffix = b'"}'
+    file_size = os.path.getsize(file_path)
+    length = len(prefix) + 4 * ((file_size + 2) // 3) + len(suffix)
+
+    async def body() -> AsyncIterator[bytes]:
+        yield prefix
+        with open(file_path, 'rb') as image_file:
+            for chunk in iter(lambda: image_file.read(BASE64_CHUNK_SIZE), b''):
+                yield base64.b64encode(chunk)
+        yield suffix
+
+    return length, body
+
+
+async def _close_when_cancelled(client: httpx.AsyncClient):
+    """
+    Waits until cancelled, then closes the client's connection pool.
+
+    Started on the event loop that owns the pool: asyncio.run cancels the tasks still pending
+    when its main coroutine returns, so the pool is closed on its own loop before that loop is.
+    """
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await client.aclose()
+
+
+class AsyncMailchimpClient:
+    """
+    Async client for the Mailchimp Marketing API with one pooled HTTP session.
+
+    All requests share the keep-alive connections of one `httpx.AsyncClient`. At most
+    max_connections requests are in flight at once, which is Mailchimp's limit of
+    simultaneous connections per API key. Requests answered with 429 or 5xx, and requests
+    that fail on the network, are retried with exponential backoff (honouring Retry-After).
+    Requests that are not idempotent (POST by default) are only retried when they were
+    certainly not processed: on 429 and when the connection could not be opened.
+    Connections cannot be shared between event loops, so a fresh pool is created the first
+    time the client is used on a new loop, and each pool is closed when asyncio.run finishes
+    the loop it belongs to.
+
+    Args:
+        api_url (str): Base URL of the Marketing API.
+        api_key (str): Mailchimp API key.
+        max_connections (int): Maximum number of requests in flight at once.
+
+    Example:
+        >>> campaign_id = await mailchimp.get_latest_campaign_id()
+        >>> await mailchimp.upload_file("cover.png", "./images/cover.png")
+        ('12345', 'https://mcusercontent.com/.../cover.png')
+    """
+
+    def __init__(
+        self,
+        api_url: str = MAILCHIMP_API_URL,
+        api_key: str | None = MAILCHIMP_API_KEY,
+        max_connections: int = MAILCHIMP_MAX_CONNECTIONS
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        # Tasks that close the pool of each loop; the loop itself only keeps weak references
+        self._closers: list[asyncio.Task] = []
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                auth=("anystring", self.api_key or ""),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=httpx.Timeout(MAILCHIMP_TIMEOUT, connect=10)
+            )
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+            self._closers = [task for task in self._closers if not task.done()]
+            self._closers.append(loop.create_task(_close_when_cancelled(self._client)))
+        return self._client
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json_body: dict | None = None,
+        params: dict | None = None,
+        body: tuple[int, Callable[[], AsyncIterator[bytes]]] | None = None,
+        idempotent: bool | None = None
+    ) -> dict:
+        """
+        Sends one API request and returns the decoded JSON response.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path relative to the API base URL, e.g. "/campaigns".
+            json_body (dict | None): JSON request body.
+            params (dict | None): Query parameters.
+            body (tuple | None): A streamed JSON body as returned by `_file_upload_body`.
+            idempotent (bool | None): Whether the request can safely be sent twice. Defaults
+                to True for every method except POST.
+
+        Raises:
+            MailchimpError: If the API answers with an error that is not retried, or the
+                retries are exhausted.
+        """
+        if idempotent is None:
+            idempotent = method.upper() != "POST"
+        retryable_errors = httpx.TransportError if idempotent else RETRYABLE_UNSENT_ERRORS
+        retryable_statuses = RETRYABLE_STATUSES if idempotent else {429}
+        client = self._get_client()
+        for attempt in range(1, MAILCHIMP_RETRIES + 1):
+            try:
+                async with self._semaphore:
+                    if body is not None:
+                        length, make_body = body
+                        response = await client.request(
+                            method,
+                            path,
+                            params=params,
+                            content=make_body(),
+                            headers={"Content-Type": "application/json", "Content-Length": str(length)}
+                        )
+                    else:
+                        response = await client.request(method, path, params=params, json=json_body)
+            except httpx.TransportError as e:
+                if not isinstance(e, retryable_errors) or attempt == MAILCHIMP_RETRIES:
+                    raise MailchimpError(0, str(e)) from e
+                await asyncio.sleep(MAILCHIMP_BACKOFF * 2 ** (attempt - 1))
+                continue
+
+            if response.status_code in retryable_statuses and attempt < MAILCHIMP_RETRIES:
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                await asyncio.sleep(retry_after if retry_after is not None else MAILCHIMP_BACKOFF * 2 ** (attempt - 1))
+                continue
+            if response.is_error:
+                try:
+                    detail = response.json().get("detail", response.text)
+                except ValueError:
+                    detail = response.text
+                raise MailchimpError(response.status_code, detail)
+            return response.json() if response.content else {}
+
+    async def aclose(self):
+        """
+        Closes the pooled connections. The next request opens a new pool.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+        for task in self._closers:
+            if task.get_loop() is self._loop:
+                task.cancel()
+        self._client = None
+        self._loop = None
+        self._semaphore = None
+
+    async def get_latest_campaign_id(self) -> str:
+        response = await self.request(
+            "GET",
+            "/campaigns",
+            params={"sort_field": "create_time", "sort_dir": "DESC", "count": 1, "fields": "campaigns.id"}
+        )
+        campaigns = response.get("campaigns") or []
+        if not campaigns:
+            raise MailchimpError(404, "There is no campaign to replicate")
+        return campaigns[0]["id"]
+
+    async def replicate_campaign(self, campaign_id: str) -> str:
+        response = await self.request("POST", f"/campaigns/{campaign_id}/actions/replicate")
+        return response["id"]
+
+    async def update_campaign(self, campaign_id: str, settings: dict) -> dict:
+        return await self.request("PATCH", f"/campaigns/{campaign_id}", json_body={"settings": settings})
+
+    async def set_campaign_content(self, campaign_id: str, content: dict) -> dict:
+        return await self.request("PUT", f"/campaigns/{campaign_id}/content", json_body=content)
+
+    async def upload_file(self, file_name: str, file_path: str) -> tuple[str, str]:
+        """
+        Uploads a file to the File Manager, streaming its base64 encoding.
+
+        Returns:
+            tuple[str, str]: The file ID and its full size URL.
+        """
+        response = await self.request("POST", "/file-manager/files", body=_file_upload_body(file_name, file_path))
+        return (str(response["id"]), response["full_size_url"])
+
+    async def list_files(self) -> AsyncIterator[dict]:
+        """
+        Yields every file in the File Manager with its id, name, size and full_size_url.
+        """
+        offset = 0
+        while True:
+            response = await self.request(
+                "GET",
+                "/file-manager/files",
+                params={
+                    "count": MAILCHIMP_FILE_LIST_PAGE_SIZE,
+                    "offset": offset,
+                    "fields": "files.id,files.name,files.size,files.full_size_url,total_items"
+                }
+            )
+            files = response.get("files", [])
+            for file in files:
+                yield file
+            offset += len(files)
+            if not files or offset >= response.get("total_items", 0):
+                break
+
+    async def hash_remote_file(self, url: str) -> str:
+        """
+        Returns the SHA-256 hex digest of a File Manager file, streamed from its public URL.
+        """
+        client = self._get_client()
+        digest = hashlib.sha256()
+        async with self._semaphore:
+            # The files are public; the API credentials must not be sent to the content host
+            async with client.stream("GET", url, auth=None, follow_redirects=True) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+
+mailchimp = AsyncMailchimpClient()
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file, read in 1 MB chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileIndex:
+    """
+    Local SQLite index of the files in the Mailchimp File Manager, keyed by content hash.
+
+    Before an image is uploaded, its SHA-256 is looked up here; if the same content is
+    already in the File Manager, its file id and full_size_url are reused and nothing is
+    uploaded. When the index does not exist yet, or was last synced more than ttl seconds
+    ago, it is rebuilt in bulk from the fileManager listing (one request per 1000 files), so
+    files deleted from the File Manager stop being reused. The listing has no content
+    hashes, so listed files are only downloaded and hashed when a local image of the same
+    size is looked up.
+
+    Args:
+        path (str): Path of the SQLite database file. Parent folders are created on first use.
+        ttl (float): Seconds after which the index is re-synced from the listing.
+
+    Example:
+        >>> await file_index.ensure(mailchimp)
+        >>> await file_index.lookup(mailchimp, hash_file("cover.png"), os.path.getsize("cover.png"))
+        ('12345', 'https://mcusercontent.com/.../cover.png')
+    """
+
+    def __init__(self, path: str, ttl: float = MAILCHIMP_FILE_INDEX_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._connection: sqlite3.Connection | None = None
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    file_id TEXT PRIMARY KEY,
+                    full_size_url TEXT NOT NULL,
+                    name TEXT,
+                    size INTEGER,
+                    sha256 TEXT
+                );
+                CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+                CREATE INDEX IF NOT EXISTS files_size ON files (size);
+                CREATE TABLE IF NOT EXISTS metadata (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                """
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def ensure(self, mailchimp_client: AsyncMailchimpClient):
+        """
+        Rebuilds the index from the File Manager listing if it was never built or is older than the TTL.
+        """
+        async with self._get_lock():
+            built = self._connect().execute("SELECT value FROM metadata WHERE key = 'rebuilt_at'").fetchone()
+            if built is None or time.time() - float(built[0]) > self.ttl:
+                await self.rebuild(mailchimp_client)
+
+    async def rebuild(self, mailchimp_client: AsyncMailchimpClient) -> int:
+        """
+        Re-reads the File Manager listing: adds new files and drops files that were deleted,
+        keeping the hashes already known. Returns the number of listed files.
+
+        The whole listing is read before the index is written, in a single transaction, so a
+        listing that fails halfway leaves the index as it was. Other coroutines share the
+        connection and commit while this one waits for the API, so writing during the listing
+        could persist part of it.
+        """
+        listed_files = [file async for file in mailchimp_client.list_files()]
+        connection = self._connect()
+        try:
+            connection.executemany(
+                "INSERT INTO files (file_id, full_size_url, name, size) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (file_id) DO UPDATE SET full_size_url = excluded.full_size_url, "
+                "name = excluded.name, size = excluded.size",
+                [(str(file["id"]), file["full_size_url"], file.get("name"), file.get("size")) for file in listed_files]
+            )
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS listed_files (file_id TEXT PRIMARY KEY)")
+            connection.execute("DELETE FROM listed_files")
+            connection.executemany(
+                "INSERT OR IGNORE INTO listed_files (file_id) VALUES (?)",
+                [(str(file["id"]),) for file in listed_files]
+            )
+            connection.execute("DELETE FROM files WHERE file_id NOT IN (SELECT file_id FROM listed_files)")
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata (key, value) VALUES ('rebuilt_at', ?)",
+                (str(time.time()),)
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        print(f"✓ Rebuilt the Mailchimp file index from {len(listed_files)} files")
+        return len(listed_files)
+
+    async def lookup(self, mailchimp_client: AsyncMailchimpClient, sha256: str, size: int) -> tuple[str, str] | None:
+        """
+        Returns the file id and full_size_url of a File Manager file with this content, or None.
+        """
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT file_id, full_size_url FROM files WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        if row is None:
+            # Hash the listed files of the same size that have not been hashed yet
+            candidates = connection.execute(
+                "SELECT file_id, full_size_url FROM files WHERE size = ? AND sha256 IS NULL", (size,)
+            ).fetchall()
+            for file_id, full_size_url in candidates:
+                try:
+                    candidate_sha256 = await mailchimp_client.hash_remote_file(full_size_url)
+                except httpx.HTTPError as e:
+                    print(f"⚠️ Could not hash {full_size_url}: {e}")
+                    continue
+                connection.execute("UPDATE files SET sha256 = ? WHERE file_id = ?", (candidate_sha256, file_id))
+                connection.commit()
+                if candidate_sha256 == sha256:
+                    row = (file_id, full_size_url)
+                    break
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row
+
+    def add(self, sha256: str, size: int, name: str, file_id: str, full_size_url: str):
+        """
+        Records a file that was just uploaded.
+        """
+        connection = self._connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO files (file_id, full_size_url, name, size, sha256) VALUES (?, ?, ?, ?, ?)",
+            (file_id, full_size_url, name, size, sha256)
+        )
+        connection.commit()
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and the number of indexed files.
+        """
+        entries, hashed = self._connect().execute("SELECT COUNT(*), COUNT(sha256) FROM files").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "hashed_entries": hashed
+        }
+
+
+file_index = FileIndex(MAILCHIMP_FILE_INDEX_PATH)
+
+
+async def upload_image_deduplicated(
+    file_name: str,
+    file_path: str,
+    sha256: str | None = None,
+    mailchimp_client: AsyncMailchimpClient | None = None
+) -> tuple[str, str, bool]:
+    """
+    Uploads an image to the File Manager unless a file with the same content is already there.
+
+    Args:
+        file_name (str): Name of the file in the File Manager.
+        file_path (str): Path of the image.
+        sha256 (str | None): The `hash_file` digest of the image, if already computed.
+        mailchimp_client (AsyncMailchimpClient | None): Client to use; the shared one by default.
+
+    Returns:
+        tuple[str, str, bool]: The file id, its full size URL, and whether it was uploaded.
+    """
+    mailchimp_client = mailchimp_client or mailchimp
+    try:
+        await file_index.ensure(mailchimp_client)
+    except MailchimpError as e:
+        print(f"⚠️ Could not rebuild the Mailchimp file index from the File Manager: {e}")
+    if sha256 is None:
+        sha256 = await asyncio.to_thread(hash_file, file_path)
+    size = os.path.getsize(file_path)
+    existing = await file_index.lookup(mailchimp_client, sha256, size)
+    if existing is not None:
+        return (*existing, False)
+
+    file_id, full_size_url = await mailchimp_client.upload_file(file_name, file_path)
+    file_index.add(sha256, size, file_name, file_id, full_size_url)
+    return (file_id, full_size_url, True)
+
+
+async def upload_images(file_paths: list[str]) -> dict:
+    """
+    Uploads the images of a post to the Mailchimp File Manager concurrently.
+
+    Images whose content is already in the File Manager (see `FileIndex`) are not uploaded
+    again, and identical images in the list are uploaded once. Uploads share one pooled
+    session and run as many at once as Mailchimp allows (MAILCHIMP_MAX_CONNECTIONS); each
+    image is base64-encoded while it is sent.
+
+    Args:
+        file_paths (list[str]): Paths of the images to upload.
+
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether every image was uploaded
+            - message (str): Summary of the uploads
+            - files (dict): Maps each path to {"id", "full_size_url", "uploaded"}
+            - failed (dict): Maps each failed path to its error
+            - uploaded (int): Number of upload calls made
+            - reused (int): Number of images found in the File Manager
+
+    Example:
+        >>> result = await upload_images(["./images/cover.png", "./images/chart.png"])
+        ✓ Uploaded 1 images to Mailchimp, reused 1 already in the File Manager
+        >>> result["files"]["./images/cover.png"]["full_size_url"]
+        'https://mcusercontent.com/.../cover.png'
+    """
+    # Hash every image once, off the event loop; identical images in the list are uploaded once
+    hashes = await asyncio.gather(
+        *(asyncio.to_thread(hash_file, file_path) for file_path in file_paths),
+        return_exceptions=True
+    )
+    files = {}
+    failed = {}
+    paths_by_content = {}
+    for file_path, sha256 in zip(file_paths, hashes):
+        if isinstance(sha256, BaseException):
+            failed[file_path] = str(sha256)
+            print(f"❌ Error reading {file_path}: {sha256}")
+        else:
+            paths_by_content.setdefault(sha256, []).append(file_path)
+
+    outcomes = await asyncio.gather(
+        *(
+            upload_image_deduplicated(os.path.basename(paths[0]), paths[0], sha256)
+            for sha256, paths in paths_by_content.items()
+        ),
+        return_exceptions=True
+    )
+
+    for paths, outcome in zip(paths_by_content.values(), outcomes):
+        for file_path in paths:
+            if isinstance(outcome, BaseException):
+                failed[file_path] = str(outcome)
+                print(f"❌ Error uploading {file_path}: {outcome}")
+            else:
+                file_id, full_size_url, uploaded = outcome
+                files[file_path] = {"id": file_id, "full_size_url": full_size_url, "uploaded": uploaded and file_path == paths[0]}
+
+    uploaded = sum(1 for outcome in outcomes if not isinstance(outcome, BaseException) and outcome[2])
+    reused = len(files) - uploaded
+    message = (
+        f"Uploaded {uploaded} images to Mailchimp"
+        + (f", reused {reused} already in the File Manager" if reused else "")
+        + (f", {len(failed)} failed" if failed else "")
+    )
+    print(f"{'❌' if failed else '✓'} {message}")
+    return {
+        "success": not failed,
+        "message": message,
+        "files": files,
+        "failed": failed,
+        "uploaded": uploaded,
+        "reused": reused
+    }
+
+
+async def create_campaign_async(subject: str, title_slug_str: str, image_paths: list[str] | None = None) -> dict:
+    """
+    Creates a campaign from the latest one and uploads the post's images, concurrently.
+
+    The images are uploaded while the latest campaign is looked up and replicated. Once
+    the replica exists, its settings update and its content are sent at the same time,
+    instead of the three sequential blocking calls made by `create_campagin`.
+
+    Args:
+        subject (str): Subject line of the campaign.
+        title_slug_str (str): Internal title of the campaign.
+        image_paths (list[str] | None): Images to upload to the File Manager.
+
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether the campaign was created and every image uploaded
+            - message (str): Description of the result
+            - campaign_id (str): ID of the new campaign
+            - images (dict): The result of `upload_images`, if images were given
+    """
+    uploads = asyncio.create_task(upload_images(image_paths)) if image_paths else None
+    try:
+        campaign_id = await mailchimp.replicate_campaign(await mailchimp.get_latest_campaign_id())
+        await asyncio.gather(
+            mailchimp.update_campaign(campaign_id, {
+                "subject_line": subject,
+                "title": title_slug_str
+            }),
+            mailchimp.set_campaign_content(campaign_id, {
+                "template": {
+                    "id": MAILCHIMP_TEMPLATE_ID,
+                    "sections": {
+                    }
+                }
+            })
+        )
+    except MailchimpError as error:
+        print("Error: {}".format(error.detail))
+        return {
+            "success": False,
+            "message": f"Error creating campaign: {error}",
+            "images": await uploads if uploads is not None else None
+        }
+    except BaseException:
+        # Do not leave the uploads running unobserved when the campaign fails unexpectedly
+        if uploads is not None:
+            uploads.cancel()
+        raise
+
+    images = await uploads if uploads is not None else None
+    message = f"Created campaign {campaign_id}" + (f"; {images['message']}" if images else "")
+    return {
+        "success": images is None or images["success"],
+        "message": message,
+        "campaign_id": campaign_id,
+        "images": images
+    }
@@ -0,0 +1,299 @@
+"""
+Benchmark of the concurrent Mailchimp campaign flow against a local fake Marketing API.
+
+Run from the `mailchimp_sender` folder, for example:
+
+    python benchmark.py campaign
+    python benchmark.py campaign --images 30 --latency 0.2
+
+The fake API answers the campaign and File Manager endpoints used by `agent.py`, serves
+the uploaded files from a public content URL, and answers 429 above Mailchimp's limit of
+simultaneous connections, so no API key is needed. The images are sent three times: a
+first send, a repeat send that must reuse every image, and a send after the local file
+index was lost, which must rebuild it from the File Manager listing instead of uploading.
+"""
+import os
+import sys
+import json
+import time
+import base64
+import shutil
+import asyncio
+import argparse
+import itertools
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Mailchimp's limit of simultaneous connections per API key
+MAILCHIMP_CONNECTION_LIMIT = 10
+
+
+class FakeMailchimpServer(ThreadingHTTPServer):
+    """
+    Local fake of the Marketing API endpoints used by `agent.py`.
+
+    Every API call waits latency seconds, so concurrency shows in the timings. Requests
+    beyond connection_limit in flight are answered with 429, like Mailchimp does.
+
+    Args:
+        latency (float): Seconds every API call takes.
+        connection_limit (int): Requests in flight above which 429 is answered.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.2, connection_limit: int = MAILCHIMP_CONNECTION_LIMIT):
+        super().__init__(("127.0.0.1", 0), _FakeMailchimpHandler)
+        self.latency = latency
+        self.connection_limit = connection_limit
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.throttled = 0
+        self.credentials_leaked = False
+        self.calls: list[tuple[str, str]] = []
+        # File Manager contents: name -> (id, raw bytes)
+        self.files: dict[str, tuple[int, bytes]] = {}
+        self._file_ids = itertools.count(1)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def reset_counters(self):
+        with self.lock:
+            self.peak_in_flight = 0
+            self.throttled = 0
+            self.calls = []
+
+    def uploads(self) -> int:
+        return sum(1 for method, path in self.calls if method == "POST" and path == "/file-manager/files")
+
+
+class _FakeMailchimpHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeMailchimpServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: dict, headers: dict | None = None):
+        self._send(status, json.dumps(data).encode(), headers=headers)
+
+    def _file_json(self, name: str) -> dict:
+        file_id, raw = self.server.files[name]
+        return {"id": file_id, "name": name, "size": len(raw), "full_size_url": f"{self.server.url}/content/{name}"}
+
+    def _handle(self, method: str):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            over_limit = server.in_flight > server.connection_limit
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            url = urlparse(self.path)
+            with server.lock:
+                server.calls.append((method, url.path))
+
+            if url.path.startswith("/content/"):
+                # Uploaded files are public; the API key must never be sent here
+                if "Authorization" in self.headers:
+                    server.credentials_leaked = True
+                name = url.path[len("/content/"):]
+                if name not in server.files:
+                    return self._send_json(404, {"detail": "Not found"})
+                return self._send(200, server.files[name][1], "application/octet-stream")
+
+            if not self.headers.get("Authorization", "").startswith("Basic "):
+                return self._send_json(401, {"detail": "API key missing"})
+            if over_limit:
+                with server.lock:
+                    server.throttled += 1
+                return self._send_json(429, {"detail": "Too many simultaneous connections"}, {"Retry-After": "1"})
+            time.sleep(server.latency)
+
+            if method == "GET" and url.path == "/campaigns":
+                return self._send_json(200, {"campaigns": [{"id": "latest"}]})
+            if method == "POST" and url.path.endswith("/actions/replicate"):
+                return self._send_json(200, {"id": "replica"})
+            if method == "PATCH" and url.path.startswith("/campaigns/"):
+                return self._send_json(200, {"id": "replica", "settings": json.loads(body)["settings"]})
+            if method == "PUT" and url.path.endswith("/content"):
+                return self._send_json(200, {"html": ""})
+            if method == "POST" and url.path == "/file-manager/files":
+                data = json.loads(body)
+                with server.lock:
+                    server.files[data["name"]] = (next(server._file_ids), base64.b64decode(data["file_data"]))
+                return self._send_json(200, self._file_json(data["name"]))
+            if method == "GET" and url.path == "/file-manager/files":
+                query = parse_qs(url.query)
+                count, offset = int(query["count"][0]), int(query["offset"][0])
+                files = [self._file_json(name) for name in list(server.files)]
+                return self._send_json(200, {"files": files[offset:offset + count], "total_items": len(files)})
+            self._send_json(404, {"detail": "Not found"})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+
+def _write_images(folder: str, count: int) -> list[str]:
+    """
+    Writes count images of random content and different sizes, plus one duplicate of the first.
+    """
+    paths = []
+    for index in range(count):
+        path = os.path.join(folder, f"image_{index}.png")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(20 * 1024 + 997 * index))
+        paths.append(path)
+    duplicate_path = os.path.join(folder, "image_0_copy.png")
+    with open(paths[0], 'rb') as source, open(duplicate_path, 'wb') as f:
+        f.write(source.read())
+    return [*paths, duplicate_path]
+
+
+def benchmark_campaign(image_count: int = 30, latency: float = 0.2) -> tuple[list[dict], list[tuple[str, bool]]]:
+    """
+    Creates a campaign with image_count images three times against the fake API.
+
+    Returns:
+        tuple: One result per send, and the (description, passed) checks of the flow.
+    """
+    server = FakeMailchimpServer(latency=latency)
+    server.start()
+    work_folder = tempfile.mkdtemp(prefix="mailchimp_benchmark_")
+    index_path = os.path.join(work_folder, "file_index.sqlite3")
+    # agent.py reads its configuration when it is imported
+    os.environ.update({
+        "MAILCHIMP_API_URL": server.url,
+        "MAILCHIMP_API_KEY": "benchmark-us1",
+        "MAILCHIMP_SERVER": "us1",
+        "MAILCHIMP_MAX_CONNECTIONS": str(MAILCHIMP_CONNECTION_LIMIT),
+        "MAILCHIMP_FILE_INDEX_PATH": index_path
+    })
+    import agent
+
+    image_paths = _write_images(work_folder, image_count)
+    results = []
+    checks = []
+
+    async def send_campaigns():
+        for send in ["first send", "repeat send", "index lost"]:
+            if send == "index lost":
+                agent.file_index._connection.close()
+                os.remove(index_path)
+                agent.file_index = agent.FileIndex(index_path)
+            server.reset_counters()
+            start_time = time.perf_counter()
+            result = await agent.create_campaign_async("Benchmark", "benchmark", image_paths)
+            results.append({
+                "send": send,
+                "seconds": time.perf_counter() - start_time,
+                "requests": len(server.calls),
+                "uploads": server.uploads(),
+                "reused": result["images"]["reused"],
+                "peak_in_flight": server.peak_in_flight,
+                "throttled": server.throttled
+            })
+
+            campaign_calls = [call for call in server.calls if call[1].startswith("/campaigns")]
+            checks.append((f"{send}: campaign created", result["success"] and result.get("campaign_id") == "replica"))
+            checks.append((
+                f"{send}: campaign looked up, replicated, then updated",
+                campaign_calls[:2] == [("GET", "/campaigns"), ("POST", "/campaigns/latest/actions/replicate")]
+                and sorted(campaign_calls[2:]) == [("PATCH", "/campaigns/replica"), ("PUT", "/campaigns/replica/content")]
+            ))
+            checks.append((
+                f"{send}: at most {MAILCHIMP_CONNECTION_LIMIT} requests in flight",
+                server.peak_in_flight <= MAILCHIMP_CONNECTION_LIMIT and server.throttled == 0
+            ))
+            expected_uploads = image_count if send == "first send" else 0
+            checks.append((f"{send}: {expected_uploads} uploads", server.uploads() == expected_uploads))
+        await agent.mailchimp.aclose()
+
+    asyncio.run(send_campaigns())
+
+    uploaded = {name: raw for name, (_, raw) in server.files.items()}
+    identical = True
+    for path in image_paths[:image_count]:
+        with open(path, 'rb') as f:
+            identical = identical and uploaded.get(os.path.basename(path)) == f.read()
+    checks.append(("uploaded files are byte-identical to the images", identical))
+    checks.append(("API key never sent to the content URLs", not server.credentials_leaked))
+
+    server.shutdown()
+    agent.file_index._connection.close()
+    shutil.rmtree(work_folder, ignore_errors=True)
+    return results, checks
+
+
+def _print_table(headers: list[str], rows: list[list]):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, ["-" * width for width in widths], *rows]:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    campaign_parser = subparsers.add_parser("campaign", help="Create a campaign with images three times against the fake API")
+    campaign_parser.add_argument("--images", type=int, default=30, help="Number of distinct images to send")
+    campaign_parser.add_argument("--latency", type=float, default=0.2, help="Seconds every fake API call takes")
+
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "campaign":
+        results, checks = benchmark_campaign(args.images, args.latency)
+        print()
+        _print_table(
+            ["send", "total", "requests", "uploads", "reused", "peak in flight", "429s"],
+            [
+                [
+                    result["send"],
+                    f"{result['seconds']:.2f}s",
+                    result["requests"],
+                    result["uploads"],
+                    result["reused"],
+                    result["peak_in_flight"],
+                    result["throttled"]
+                ]
+                for result in results
+            ]
+        )
+        print()
+        for description, passed in checks:
+            print(f"{'✓' if passed else '❌'} {description}")
+        if not all(passed for _, passed in checks):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import math
+import time
+import email.utils
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Returns the seconds to wait from a Retry-After header value, or None if it can't be parsed.
+
+    The header holds either a number of seconds or an HTTP-date (RFC 9110, section 10.2.3).
+    A date in the past gives 0.
+
+    Example:
+        >>> parse_retry_after("120")
+        120.0
+        >>> parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT")
+        0.0
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -1,9 +1,12 @@
 # Imports
-from .file_downloader import download_image
+from .file_downloader import download_image, download_images
 from .github_operations import (
     create_github_file,
     create_github_image,
-    upload_folder_to_github
+    upload_folder_to_github,
+    start_github_batch,
+    commit_github_batch,
+    discard_github_batch
 )
 from .notion_operations import (
     extract_uuid_from_page_url,
@@ -44,17 +47,14 @@ When given a Notion page ID to publish, follow this systematic approach:
     - Example:
         - Title: "我是如何解决AI应用开发图书的写作难题的"
         - Blog ID: "2025-11-02-how-i-solve-the-writing-problems-of-ai-application-development-book"
-- Download all images from the markdown content with the following steps:
-    - Capture the image caption and url first. The images are in the markdown content, and the url is like this: ![caption](url).
-    - Decide the file name: The file name should be the caption of the image in english in slug string. If the caption is empty, use incrementing number to name the file.
-    - Download the images to the `blog/images/[blog_id]` folder.
-    - Example:
-        - Caption: "AI应用开发图书的封面"
-        - File name: "ai-application-development-book-cover.jpg"
-        - Caption: ""
-        - File name: "1.jpg"
-    - After downloading the images, you need to update the markdown content to replace the image url with the new url. The new url is like this: `![caption](../images/[blog_id]/[file_name])`
+- Download all images from the markdown content with the `download_images` tool, passing the markdown content, the blog ID and the file names:
+    - Capture the image captions first. The images are in the markdown content, and they are like this: ![caption](url).
+    - Decide the file names: The file name should be the caption of the image in english. If the caption was chinese (or any other language), you need to translate it to english first. Pass the file names as a mapping from each caption to its english file name.
+    - The tool downloads all images at once to the `blog/images/[blog_id]` folder, and turns each file name into a slug string. If the caption is empty, an incrementing number is used to name the file.
+    - It returns the new markdown content, where each image url is replaced with the new url like this: `![caption](../images/[blog_id]/[file_name])`. Use the returned markdown content from now on.
         - Example:
+            - Caption: "AI应用开发图书的封面"
+            - File names: {"AI应用开发图书的封面": "ai-application-development-book-cover"}
             - Markdown content:
                 ```markdown
                 ![AI应用开发图书的封面](https://example.com/image.jpg)
@@ -63,6 +63,7 @@ When given a Notion page ID to publish, follow this systematic approach:
                 ```markdown
                 ![AI应用开发图书的封面](../images/2025-11-02-how-i-solve-the-writing-problems-of-ai-application-development-book/ai-application-development-book-cover.jpg)
                 ```
+    - If some images failed to download, download them again one by one with the `download_image` tool to the `blog/images/[blog_id]` folder, and replace their urls in the markdown content the same way.
     - Delete the last image tag from the markdown content.
 - Analyse the markdown content, and pick max 2 tags from the tag options I shared with you. Here are the tag options: 'ai', 'angular', 'architecture', 'backend', 'book', 'code', 'design', 'css', 'flux', 'frontend', 'interview', 'javascript', 'jquery', 'leadership', 'mobx', 'mvc', 'nodejs', 'other', 'performance', 'principle', 'react', 'redux', 'serverless', 'sql', 'vue', 'xss'
 - Generate meta info for the Jekyll blog post. The meta info should looks like this:
@@ -76,8 +77,10 @@ When given a Notion page ID to publish, follow this systematic approach:
     ```
 - Insert the meta info at the beginning of the markdown content.
 - Create a new file in the blog folder `blog/_posts` with the blog ID. The file name is the blog ID. Write the markdown content updated in the last step to the file.
+- Start a GitHub batch with the commit message "Publish [blog_id]", so the post and all of its images are published together in a single commit. If a batch is already open from an earlier, interrupted run, discard it with `discard_github_batch` and start the batch again.
 - Upload the file which created into the GitHub Jekyll blog repo, the repo is https://github.com/hh54188/horace-jekyll-theme-v1.2.0, and the targett path is `_posts/[blog_id].md`
 - Upload the images which downloaded in the prevous step which exists in the `blog/images/[blog_id]` folder into the GitHub Jekyll blog repo, the repo is https://github.com/hh54188/horace-jekyll-theme-v1.2.0, and the target path is `images/[blog_id]`
+- Commit the GitHub batch. Nothing is published to GitHub before this step; if the commit fails, nothing has been published and the uploads can be retried.
 - If the agent has successfully published all the blog content to GitHub, it should inform the user that the content has been successfully published to the GitHub repository.
 """,
     tools=[
@@ -86,7 +89,11 @@ When given a Notion page ID to publish, follow this systematic approach:
         cleanup_blog_folders,
         create_github_file,
         create_github_image,
+        start_github_batch,
+        commit_github_batch,
+        discard_github_batch,
         download_image,
+        download_images,
         extract_title_from_page,
         convert_to_markdown,
     ]
@@ -0,0 +1,1095 @@
+"""
+Benchmarks for the Notion article publisher.
+
+Run from the `archived` folder, for example:
+
+    python -m notion_article_publisher.benchmark fetch
+    python -m notion_article_publisher.benchmark fetch --blocks 1000 10000 --latency 0.1
+    python -m notion_article_publisher.benchmark render --blocks 100000
+    python -m notion_article_publisher.benchmark memory --blocks 10000 100000
+    python -m notion_article_publisher.benchmark publish --images 20
+    python -m notion_article_publisher.benchmark download --images 100
+
+The Notion API is replaced by `FakeNotionServer`, a local HTTP server that serves a
+synthetic page of paginated blocks to the notion_client AsyncClient with a fixed latency
+per request, so no API key is needed. The render benchmark runs the block renderer on the
+same synthetic page without any I/O, and the memory benchmark converts it in a fresh
+process per run, so peak memory is not affected by an earlier run. The publish benchmark
+runs the GitHub uploads against `FakeGitHubServer`, a local fake of the GitHub REST API,
+and the download benchmark fetches images from `FakeImageServer`, a local HTTP server.
+"""
+import io
+import os
+import sys
+import json
+import time
+import base64
+import shutil
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Top-level blocks of the synthetic page, in a repeating cycle; every toggle has TOGGLE_CHILDREN children
+SYNTHETIC_BLOCK_TYPES = [
+    "heading_2", "paragraph", "paragraph", "bulleted_list_item", "bulleted_list_item",
+    "numbered_list_item", "to_do", "quote", "code", "toggle"
+]
+TOGGLE_CHILDREN = 9
+SYNTHETIC_PAGE_ID = "synthetic-page"
+
+
+def _peak_memory_bytes() -> int | None:
+    """
+    Returns the peak resident memory of the current process, if the platform reports it.
+    """
+    if sys.platform == "win32":
+        # Only Windows reports the peak working set through psutil; elsewhere rss is the current size
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rich_text(text: str, bold: bool = False, italic: bool = False, code: bool = False, href: str | None = None) -> dict:
+    return {
+        "type": "text",
+        "plain_text": text,
+        "href": href,
+        "annotations": {
+            "bold": bold,
+            "italic": italic,
+            "strikethrough": False,
+            "underline": False,
+            "code": code,
+            "color": "default"
+        }
+    }
+
+
+def _synthetic_block(block_id: str, block_type: str, index: int) -> dict:
+    """
+    Returns a block shaped like a `blocks.children.list` result, with a few rich text runs.
+    """
+    rich_text = [
+        _rich_text(f"Block {index} explains one step of the article. "),
+        _rich_text("This part is bold", bold=True),
+        _rich_text(", this part is ", italic=True),
+        _rich_text("a link", href=f"https://example.com/{index}")
+    ]
+    content = {"rich_text": rich_text}
+    if block_type == "to_do":
+        content["checked"] = index % 2 == 0
+    elif block_type == "code":
+        content = {"rich_text": [_rich_text(f"print({index})")], "language": "python"}
+    return {
+        "object": "block",
+        "id": block_id,
+        "type": block_type,
+        "has_children": block_type == "toggle",
+        "last_edited_time": "2025-01-01T00:00:00.000Z",
+        block_type: content
+    }
+
+
+def _top_level_count(block_count: int) -> int:
+    """
+    Returns the number of top-level blocks of a synthetic page with about block_count blocks.
+    """
+    blocks_per_cycle = len(SYNTHETIC_BLOCK_TYPES) + TOGGLE_CHILDREN
+    return max(1, block_count * len(SYNTHETIC_BLOCK_TYPES) // blocks_per_cycle)
+
+
+def _synthetic_children(block_id: str, top_level_count: int) -> tuple[int, Callable[[int], dict]]:
+    """
+    Returns the child count of a synthetic block, and a factory for its child at an index.
+    """
+    if block_id == SYNTHETIC_PAGE_ID:
+        def make_top_level(index: int) -> dict:
+            block_type = SYNTHETIC_BLOCK_TYPES[index % len(SYNTHETIC_BLOCK_TYPES)]
+            return _synthetic_block(f"block-{index}", block_type, index)
+        return top_level_count, make_top_level
+
+    def make_toggle_child(index: int) -> dict:
+        block_type = "paragraph" if index % 3 else "bulleted_list_item"
+        return _synthetic_block(f"{block_id}-{index}", block_type, index)
+    return TOGGLE_CHILDREN, make_toggle_child
+
+
+class FakeNotionServer(ThreadingHTTPServer):
+    """
+    Local fake of the Notion API that serves one synthetic page at /v1/blocks/{id}/children.
+
+    The page has about block_count blocks: top-level blocks of SYNTHETIC_BLOCK_TYPES, where
+    every toggle has TOGGLE_CHILDREN nested children. Blocks are generated and encoded as
+    JSON for every response, so the server holds no block tree in memory, and the client
+    pays for HTTP, connection pooling and JSON decoding as it would against the real API.
+    Every response starts after latency seconds. The server counts the requests, the TCP
+    connections opened and the most requests in flight at once.
+
+    Args:
+        block_count (int): Approximate number of blocks on the page, nested ones included.
+        latency (float): Seconds before every response starts.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, block_count: int, latency: float = 0.02):
+        super().__init__(("127.0.0.1", 0), _FakeNotionHandler)
+        self.top_level_count = _top_level_count(block_count)
+        self.block_count = self.top_level_count + self.top_level_count // len(SYNTHETIC_BLOCK_TYPES) * TOGGLE_CHILDREN
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.connections: set[tuple[str, int]] = set()
+            self.in_flight = 0
+            self.peak_in_flight = 0
+
+
+class _FakeNotionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs add ~40ms per response
+    disable_nagle_algorithm = True
+    server: FakeNotionServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._send_json(401, {"object": "error", "status": 401, "code": "unauthorized", "message": "API token is invalid."})
+            if len(parts) != 4 or parts[:2] != ["v1", "blocks"] or parts[3] != "children":
+                return self._send_json(404, {"object": "error", "status": 404, "code": "object_not_found", "message": "Not found."})
+
+            query = parse_qs(url.query)
+            child_count, make_child = _synthetic_children(unquote(parts[2]), server.top_level_count)
+            start = int(query.get("start_cursor", ["0"])[0])
+            end = min(start + int(query.get("page_size", ["100"])[0]), child_count)
+            self._send_json(200, {
+                "object": "list",
+                "results": [make_child(index) for index in range(start, end)],
+                "has_more": end < child_count,
+                "next_cursor": str(end) if end < child_count else None
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+def synthetic_block_tree(block_count: int) -> list[dict]:
+    """
+    Returns the synthetic page of FakeNotionServer as a fetched block tree, with children attached.
+    """
+    top_level_count = _top_level_count(block_count)
+    _, make_top_level = _synthetic_children(SYNTHETIC_PAGE_ID, top_level_count)
+    blocks = []
+    for index in range(top_level_count):
+        block = make_top_level(index)
+        if block["has_children"]:
+            child_count, make_child = _synthetic_children(block["id"], top_level_count)
+            block["children"] = [make_child(child_index) for child_index in range(child_count)]
+        blocks.append(block)
+    return blocks
+
+
+def _count_blocks(blocks: list[dict]) -> int:
+    return sum(1 + _count_blocks(block.get("children", [])) for block in blocks)
+
+
+async def _benchmark_fetch(server: FakeNotionServer, max_concurrency: int) -> dict:
+    from notion_client import AsyncClient
+    from . import notion_operations
+
+    server.reset_counters()
+    # A client per run, since its connection pool belongs to the event loop of the run
+    notion_operations.notion = AsyncClient(auth="benchmark", base_url=server.url)
+    try:
+        start_time = time.perf_counter()
+        blocks = await notion_operations.fetch_block_tree(SYNTHETIC_PAGE_ID, max_concurrency, cache=None)
+        fetch_seconds = time.perf_counter() - start_time
+        fetched_blocks = _count_blocks(blocks)
+        fetch_requests = server.requests
+        fetch_connections = len(server.connections)
+        fetch_peak_in_flight = server.peak_in_flight
+
+        first_chunk_seconds = None
+        start_time = time.perf_counter()
+        async for _ in notion_operations.stream_markdown(SYNTHETIC_PAGE_ID, max_concurrency, cache=None):
+            if first_chunk_seconds is None:
+                first_chunk_seconds = time.perf_counter() - start_time
+        stream_seconds = time.perf_counter() - start_time
+    finally:
+        await notion_operations.notion.aclose()
+
+    return {
+        "blocks": server.block_count,
+        "fetched_blocks": fetched_blocks,
+        "max_concurrency": max_concurrency,
+        "requests": fetch_requests,
+        "connections": fetch_connections,
+        "peak_in_flight": fetch_peak_in_flight,
+        "fetch_seconds": fetch_seconds,
+        "first_chunk_seconds": first_chunk_seconds,
+        "stream_seconds": stream_seconds
+    }
+
+
+def benchmark_fetch(block_counts: list[int] | None = None, concurrency_levels: list[int] | None = None, latency: float = 0.02) -> list[dict]:
+    """
+    Measures fetching and streaming synthetic pages of several sizes from the fake Notion API.
+
+    The requests go through the notion_client AsyncClient to a local `FakeNotionServer`, so
+    HTTP, connection reuse and JSON decoding are part of the timings. For every page size and
+    concurrency level, reports the number of `blocks.children.list` requests, the connections
+    opened, the time `fetch_block_tree` takes to fetch every block, and the time until
+    `stream_markdown` yields its first chunk and until it finishes.
+    """
+    from .notion_operations import NOTION_MAX_CONCURRENCY
+
+    results = []
+    for block_count in block_counts or [1000, 10000, 50000]:
+        server = FakeNotionServer(block_count, latency)
+        server.start()
+        try:
+            for max_concurrency in concurrency_levels or sorted({1, NOTION_MAX_CONCURRENCY}):
+                results.append(asyncio.run(_benchmark_fetch(server, max_concurrency)))
+        finally:
+            server.shutdown()
+            server.server_close()
+    return results
+
+
+def benchmark_render(block_count: int = 100000, repeats: int = 3) -> list[dict]:
+    """
+    Measures rendering throughput, in blocks per second, on a synthetic block tree.
+
+    Compares rendering the whole tree at once (`render_blocks`, as convert_to_markdown does)
+    with rendering it block by block and draining the output after every top-level block
+    (as stream_markdown does). Each mode is run repeats times and the fastest run is reported.
+    """
+    from .block_renderer import RenderContext, render_block, render_blocks
+
+    blocks = synthetic_block_tree(block_count)
+    rendered_blocks = _count_blocks(blocks)
+
+    def render_streamed() -> int:
+        context = RenderContext()
+        characters = 0
+        for block in blocks:
+            render_block(block, context)
+            characters += len(context.drain())
+        return characters
+
+    results = []
+    for mode, render in [("render_blocks", lambda: len(render_blocks(blocks))), ("streamed", render_streamed)]:
+        timings = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            characters = render()
+            timings.append(time.perf_counter() - start_time)
+        results.append({
+            "mode": mode,
+            "blocks": rendered_blocks,
+            "characters": characters,
+            "seconds": min(timings),
+            "blocks_per_second": rendered_blocks / min(timings)
+        })
+    return results
+
+
+# Markdown prefix of every text block type the pre-streaming converter rendered
+BASELINE_TEXT_PREFIXES = {
+    "paragraph": "", "heading_1": "# ", "heading_2": "## ", "heading_3": "### ",
+    "bulleted_list_item": "- ", "numbered_list_item": "1. ", "quote": "> "
+}
+
+
+def _baseline_rich_text_to_markdown(rich_text_list: list) -> str:
+    """
+    The rich text conversion of the converter before block_renderer, kept as a baseline.
+    """
+    markdown_parts = []
+    for rt in rich_text_list:
+        text = rt.get("plain_text", "")
+        if not text:
+            continue
+        annotations = rt.get("annotations", {})
+        if annotations.get("code"):
+            text = f"`{text}`"
+        else:
+            is_bold = annotations.get("bold", False)
+            is_italic = annotations.get("italic", False)
+            if is_bold and is_italic:
+                text = f"***{text}***"
+            elif is_bold:
+                text = f"**{text}**"
+            elif is_italic:
+                text = f"*{text}*"
+            if annotations.get("strikethrough"):
+                text = f"~~{text}~~"
+            if annotations.get("underline"):
+                text = f"<u>{text}</u>"
+        if rt.get("href"):
+            text = f"[{text}]({rt.get('href')})"
+        markdown_parts.append(text)
+    return "".join(markdown_parts)
+
+
+async def _baseline_convert_to_markdown(notion, block_id: str) -> str:
+    """
+    The convert_to_markdown of the baseline commit, kept to measure the streaming renderer against.
+
+    Like the original, it fetches children one request at a time, renders every child list
+    into a string, splits it back into lines and joins them again one level up. The only
+    change is that it follows `next_cursor`, where the original read the first 100 children
+    of every block and would have skipped most of a large page.
+    """
+    markdown_lines: list[str] = []
+    blocks = []
+    start_cursor = None
+    while True:
+        block_result = await notion.blocks.children.list(block_id=block_id, page_size=100, start_cursor=start_cursor)
+        blocks.extend(block_result.get("results"))
+        start_cursor = block_result.get("next_cursor")
+        if not block_result.get("has_more"):
+            break
+
+    previous_block_type: str | None = None
+    for block in blocks:
+        block_type = block.get("type")
+
+        if block_type in BASELINE_TEXT_PREFIXES:
+            rich_text = block.get(block_type, {}).get("rich_text", [])
+            text = _baseline_rich_text_to_markdown(rich_text)
+            if text:
+                if previous_block_type and (previous_block_type != block_type or block_type == "paragraph"):
+                    markdown_lines.append("")
+                markdown_lines.append(f"{BASELINE_TEXT_PREFIXES[block_type]}{text}")
+                previous_block_type = block_type
+
+        elif block_type == "image":
+            image_block = block.get("image", {})
+            caption = _baseline_rich_text_to_markdown(image_block.get("caption", []))
+            image_url = (image_block.get("file") or image_block.get("external") or {}).get("url", "")
+            if previous_block_type and previous_block_type != block_type:
+                markdown_lines.append("")
+            markdown_lines.append(f"![{caption or 'Image'}]({image_url})")
+            previous_block_type = "image"
+
+        elif block_type == "divider":
+            if previous_block_type and previous_block_type != block_type:
+                markdown_lines.append("")
+            markdown_lines.append("---")
+            previous_block_type = "divider"
+
+        elif block_type == "code":
+            text = _baseline_rich_text_to_markdown(block.get("code", {}).get("rich_text", []))
+            if text:
+                if previous_block_type and previous_block_type != block_type:
+                    markdown_lines.append("")
+                markdown_lines.extend([f"```{block.get('code', {}).get('language', '')}", text, "```"])
+                previous_block_type = "code"
+
+        if block.get("has_children"):
+            child_markdown = await _baseline_convert_to_markdown(notion, block.get("id"))
+            child_lines = child_markdown.split("\n") if child_markdown else []
+            while child_lines and child_lines[0] == "":
+                child_lines.pop(0)
+            while child_lines and child_lines[-1] == "":
+                child_lines.pop()
+            if child_lines:
+                if previous_block_type and markdown_lines and markdown_lines[-1] != "":
+                    markdown_lines.append("")
+                markdown_lines.extend(child_lines)
+
+    return "\n".join(markdown_lines)
+
+
+async def _convert(mode: str, server: FakeNotionServer) -> int:
+    from notion_client import AsyncClient
+    from . import notion_operations
+
+    notion_operations.notion = AsyncClient(auth="benchmark", base_url=server.url)
+    try:
+        if mode == "baseline":
+            return len(await _baseline_convert_to_markdown(notion_operations.notion, SYNTHETIC_PAGE_ID))
+        if mode == "convert_to_markdown":
+            return len(await notion_operations.convert_to_markdown(SYNTHETIC_PAGE_ID))
+        with open(os.devnull, 'w', encoding='utf-8') as output:
+            return await notion_operations.write_markdown(SYNTHETIC_PAGE_ID, output)
+    finally:
+        await notion_operations.notion.aclose()
+
+
+def _benchmark_memory(mode: str, block_count: int) -> dict:
+    server = FakeNotionServer(block_count, latency=0)
+    server.start()
+    baseline_bytes = _peak_memory_bytes()
+
+    start_time = time.perf_counter()
+    characters = asyncio.run(_convert(mode, server))
+    seconds = time.perf_counter() - start_time
+
+    peak_bytes = _peak_memory_bytes()
+    server.shutdown()
+    server.server_close()
+    return {
+        "mode": mode,
+        "blocks": server.block_count,
+        "characters": characters,
+        "requests": server.requests,
+        "seconds": seconds,
+        "peak_memory_bytes": peak_bytes,
+        "peak_growth_bytes": peak_bytes - baseline_bytes if peak_bytes is not None else None
+    }
+
+
+def benchmark_memory(block_counts: list[int] | None = None) -> list[dict]:
+    """
+    Measures time and peak memory of converting synthetic pages end to end.
+
+    Compares the converter of the baseline commit (`_baseline_convert_to_markdown`) with
+    `convert_to_markdown`, which joins the streamed chunks into one string, and
+    `write_markdown`, which writes every chunk to the output as soon as its blocks are
+    fetched. The baseline skips to-dos and toggles, as the original did, so it writes fewer
+    characters. The blocks come from a `FakeNotionServer` without latency, running in the
+    same process; it builds every response on demand, so it adds little to the peak. Peak
+    growth is the increase of the peak memory over the process after imports.
+    """
+    results = []
+    for block_count in block_counts or [10000, 100000]:
+        for mode in ["baseline", "convert_to_markdown", "write_markdown"]:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results.append(executor.submit(_benchmark_memory, mode, block_count).result())
+    return results
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    """
+    Local fake of the GitHub REST endpoints used by github_operations, with an in-memory git store.
+
+    Serves the repository, the branch ref, the Git Data API (blobs, trees and commits) and
+    the contents API used by repo.create_file. Trees are flat maps of paths to blob SHAs.
+    Every request waits latency seconds, like a round trip to GitHub. Blob uploads with
+    content in failing_blobs are answered with 422, to test that a failed batch publishes
+    nothing.
+
+    Args:
+        latency (float): Seconds every request takes.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.05):
+        super().__init__(("127.0.0.1", 0), _FakeGitHubHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.failing_blobs: set[bytes] = set()
+        self.reset()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def reset(self):
+        """
+        Resets the repository to a single commit with a README.
+        """
+        with self.lock:
+            self.calls: list[tuple[str, str]] = []
+            self.blobs: dict[str, bytes] = {}
+            self.trees: dict[str, dict[str, str]] = {}
+            self.commits: dict[str, dict] = {}
+            readme_sha = self.store_blob(b"# Blog\n")
+            self.head = self.store_commit("Initial commit", self.store_tree({"README.md": readme_sha}), [])
+
+    def store_blob(self, content: bytes) -> str:
+        from .github_operations import git_blob_sha
+
+        sha = git_blob_sha(content)
+        self.blobs[sha] = content
+        return sha
+
+    def store_tree(self, entries: dict[str, str]) -> str:
+        sha = hashlib.sha1(json.dumps(entries, sort_keys=True).encode()).hexdigest()
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def store_commit(self, message: str, tree_sha: str, parents: list[str]) -> str:
+        sha = hashlib.sha1(f"{tree_sha}:{parents}:{message}:{len(self.commits)}".encode()).hexdigest()
+        self.commits[sha] = {"message": message, "tree": tree_sha, "parents": parents}
+        return sha
+
+    def head_files(self) -> dict[str, bytes]:
+        """
+        Returns the content of every file on the branch head, by path.
+        """
+        tree = self.trees[self.commits[self.head]["tree"]]
+        return {path: self.blobs[sha] for path, sha in tree.items()}
+
+    def count_calls(self, method: str, path_suffix: str) -> int:
+        return sum(1 for call_method, path in self.calls if call_method == method and path.endswith(path_suffix))
+
+    def commits_after(self, commit_sha: str) -> int:
+        """
+        Returns the number of commits between commit_sha and the branch head.
+        """
+        count = 0
+        sha = self.head
+        while sha != commit_sha:
+            count += 1
+            sha = self.commits[sha]["parents"][0]
+        return count
+
+
+class _FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeGitHubServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _commit_json(self, repo_url: str, sha: str) -> dict:
+        commit = self.server.commits[sha]
+        return {
+            "sha": sha,
+            "url": f"{repo_url}/git/commits/{sha}",
+            "html_url": f"https://github.com/fake/commit/{sha}",
+            "message": commit["message"],
+            "tree": {"sha": commit["tree"], "url": f"{repo_url}/git/trees/{commit['tree']}"},
+            "parents": [{"sha": parent, "url": f"{repo_url}/git/commits/{parent}"} for parent in commit["parents"]]
+        }
+
+    def _tree_json(self, repo_url: str, sha: str) -> dict:
+        entries = self.server.trees[sha]
+        return {
+            "sha": sha,
+            "url": f"{repo_url}/git/trees/{sha}",
+            "tree": [
+                {"path": path, "mode": "100644", "type": "blob", "sha": blob_sha, "size": len(self.server.blobs[blob_sha])}
+                for path, blob_sha in sorted(entries.items())
+            ],
+            "truncated": False
+        }
+
+    def _ref_json(self, repo_url: str, ref: str) -> dict:
+        return {
+            "ref": f"refs/{ref}",
+            "url": f"{repo_url}/git/refs/{ref}",
+            "object": {"sha": self.server.head, "type": "commit", "url": f"{repo_url}/git/commits/{self.server.head}"}
+        }
+
+    def _handle(self, method: str):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        data = json.loads(body) if body else {}
+        url = urlparse(self.path)
+        time.sleep(server.latency)
+
+        parts = url.path.strip("/").split("/")
+        if len(parts) < 3 or parts[0] != "repos":
+            return self._send_json(404, {"message": "Not Found"})
+        repo_url = f"{server.url}/repos/{parts[1]}/{parts[2]}"
+        resource = parts[3:]
+
+        with server.lock:
+            server.calls.append((method, url.path))
+            if not resource and method == "GET":
+                return self._send_json(200, {
+                    "id": 1,
+                    "name": parts[2],
+                    "full_name": f"{parts[1]}/{parts[2]}",
+                    "url": repo_url,
+                    "default_branch": "master"
+                })
+            if resource[:2] in (["git", "ref"], ["git", "refs"]):
+                ref = "/".join(resource[2:])
+                if method == "PATCH":
+                    if not data.get("force") and server.commits[data["sha"]]["parents"][:1] != [server.head]:
+                        return self._send_json(422, {"message": "Update is not a fast forward"})
+                    server.head = data["sha"]
+                return self._send_json(200, self._ref_json(repo_url, ref))
+            if resource[:2] == ["git", "commits"]:
+                if method == "POST":
+                    sha = server.store_commit(data["message"], data["tree"], data["parents"])
+                    return self._send_json(201, self._commit_json(repo_url, sha))
+                return self._send_json(200, self._commit_json(repo_url, resource[2]))
+            if resource[:2] == ["git", "trees"]:
+                if method == "POST":
+                    entries = dict(server.trees[data["base_tree"]]) if data.get("base_tree") else {}
+                    entries.update({element["path"]: element["sha"] for element in data["tree"]})
+                    return self._send_json(201, self._tree_json(repo_url, server.store_tree(entries)))
+                return self._send_json(200, self._tree_json(repo_url, resource[2]))
+            if resource[:2] == ["git", "blobs"] and method == "POST":
+                content = base64.b64decode(data["content"])
+                if content in server.failing_blobs:
+                    return self._send_json(422, {"message": "Blob rejected by the fake API"})
+                sha = server.store_blob(content)
+                return self._send_json(201, {"sha": sha, "url": f"{repo_url}/git/blobs/{sha}"})
+            if resource[:1] == ["contents"] and method == "PUT":
+                path = unquote("/".join(resource[1:]))
+                entries = dict(server.trees[server.commits[server.head]["tree"]])
+                entries[path] = server.store_blob(base64.b64decode(data["content"]))
+                server.head = server.store_commit(data["message"], server.store_tree(entries), [server.head])
+                return self._send_json(201, {
+                    "content": {"name": path.rsplit("/", 1)[-1], "path": path, "sha": entries[path], "type": "file"},
+                    "commit": self._commit_json(repo_url, server.head)
+                })
+        self._send_json(404, {"message": "Not Found"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+
+def _write_post(folder: str, image_count: int) -> tuple[str, list[str]]:
+    """
+    Writes the markdown of a synthetic post and image_count images of random content.
+    """
+    markdown = "# Benchmark post\n\n" + "\n\n".join(
+        f"![Figure {index}](../images/benchmark-post/figure-{index}.png)" for index in range(image_count)
+    )
+    image_paths = []
+    for index in range(image_count):
+        image_path = os.path.join(folder, f"figure-{index}.png")
+        with open(image_path, 'wb') as f:
+            f.write(os.urandom(30 * 1024 + index))
+        image_paths.append(image_path)
+    return markdown, image_paths
+
+
+def benchmark_publish(image_count: int = 20, latency: float = 0.05) -> tuple[list[dict], list[tuple[str, bool]]]:
+    """
+    Publishes a post with image_count images to the fake GitHub API, file by file and as one batch.
+
+    The runs are: one create_file commit per file (the flow without a batch), one batch
+    commit, the same batch again with nothing changed, and a batch in which one image upload
+    is rejected. The GitHub request rate limiter is disabled, since the fake API has no
+    secondary rate limit; timings still include the pause PyGithub itself keeps between
+    two write requests.
+
+    Returns:
+        tuple: One result per run, and the (description, passed) checks of the flow.
+    """
+    from . import github_operations
+
+    server = FakeGitHubServer(latency)
+    server.start()
+    github_operations.github_rate_limiter = github_operations.TokenBucket(1e9, 1 << 30)
+    post_folder = tempfile.mkdtemp(prefix="github_benchmark_")
+    markdown, image_paths = _write_post(post_folder, image_count)
+    post_path = "_posts/2025-01-01-benchmark-post.md"
+    image_targets = [f"images/benchmark-post/{os.path.basename(image_path)}" for image_path in image_paths]
+
+    def publish(batched: bool) -> dict:
+        if batched:
+            github_operations.start_github_batch("Publish benchmark-post")
+        outcomes = [github_operations.create_github_file(markdown, post_path)]
+        outcomes += [
+            github_operations.create_github_image(image_path, target)
+            for image_path, target in zip(image_paths, image_targets)
+        ]
+        if batched:
+            return github_operations.commit_github_batch()
+        return {"success": all(outcome["success"] for outcome in outcomes)}
+
+    results = []
+    checks = []
+    expected_files = {post_path: markdown.encode('utf-8')}
+    for image_path, target in zip(image_paths, image_targets):
+        with open(image_path, 'rb') as f:
+            expected_files[target] = f.read()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for run in ["one commit per file", "batch", "batch, unchanged", "batch, failed upload"]:
+            if run in ("one commit per file", "batch"):
+                server.reset()
+                github_operations.publisher = github_operations.GitHubPublisher(token="benchmark", base_url=server.url)
+            if run == "batch, failed upload":
+                # Change the post and one image, and have the fake API reject the changed image
+                markdown += "\nEdited\n"
+                with open(image_paths[-1], 'ab') as f:
+                    f.write(b"edited")
+                with open(image_paths[-1], 'rb') as f:
+                    server.failing_blobs = {f.read()}
+            head_before = server.head
+            server.calls = []
+            start_time = time.perf_counter()
+            result = publish(batched=run != "one commit per file")
+            results.append({
+                "run": run,
+                "seconds": time.perf_counter() - start_time,
+                "requests": len(server.calls),
+                "blobs": server.count_calls("POST", "/git/blobs"),
+                "commits": server.commits_after(head_before),
+                "success": result["success"]
+            })
+            files = server.head_files()
+            if run == "one commit per file":
+                checks.append((f"{run}: {image_count + 1} commits", results[-1]["commits"] == image_count + 1))
+            elif run == "batch":
+                checks.append((f"{run}: one commit", result["success"] and results[-1]["commits"] == 1))
+                checks.append((
+                    f"{run}: every file on the branch is byte-identical",
+                    all(files.get(path) == content for path, content in expected_files.items())
+                ))
+            elif run == "batch, unchanged":
+                checks.append((f"{run}: no blob uploaded and no commit", results[-1]["blobs"] == 0 and results[-1]["commits"] == 0))
+            else:
+                checks.append((f"{run}: reported as failed", not result["success"]))
+                checks.append((f"{run}: branch left untouched", server.head == head_before))
+
+    server.shutdown()
+    shutil.rmtree(post_folder, ignore_errors=True)
+    return results, checks
+
+
+class FakeImageServer(ThreadingHTTPServer):
+    """
+    Local HTTP server that serves the same random image under any path, with keep-alive.
+
+    Every response starts after latency seconds, like a round trip to a CDN. The server
+    counts the TCP connections opened and the most requests in flight at once.
+
+    Args:
+        image_size (int): Size of the served image in bytes.
+        latency (float): Seconds before every response starts.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, image_size: int = 200 * 1024, latency: float = 0.05):
+        super().__init__(("127.0.0.1", 0), _FakeImageHandler)
+        self.image = os.urandom(image_size)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def reset_counters(self):
+        with self.lock:
+            self.connections: set[tuple[str, int]] = set()
+            self.in_flight = 0
+            self.peak_in_flight = 0
+
+
+class _FakeImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeImageServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(server.image)))
+            self.end_headers()
+            for start in range(0, len(server.image), 64 * 1024):
+                self.wfile.write(server.image[start:start + 64 * 1024])
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+async def _run_downloads(server: FakeImageServer, target_folder: str, image_count: int, concurrent: bool) -> dict:
+    from . import file_downloader
+
+    # The longest the event loop was blocked, measured by a task that wakes up every 10 ms
+    max_loop_lag = 0.0
+
+    async def measure_loop_lag():
+        nonlocal max_loop_lag
+        while True:
+            start_time = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_loop_lag = max(max_loop_lag, time.perf_counter() - start_time - 0.01)
+
+    urls = [f"{server.url}/images/{index}.png" for index in range(image_count)]
+    lag_task = asyncio.create_task(measure_loop_lag())
+    start_time = time.perf_counter()
+    try:
+        if concurrent:
+            paths = await asyncio.gather(*(
+                file_downloader.download_image(url, target_folder, f"image-{index}") for index, url in enumerate(urls)
+            ))
+        else:
+            paths = [
+                await file_downloader.download_image(url, target_folder, f"image-{index}") for index, url in enumerate(urls)
+            ]
+        seconds = time.perf_counter() - start_time
+    finally:
+        lag_task.cancel()
+        await file_downloader.download_client.aclose()
+
+    identical = True
+    for path in paths:
+        with open(path, 'rb') as f:
+            identical = identical and f.read() == server.image
+    return {
+        "seconds": seconds,
+        "max_loop_lag_seconds": max_loop_lag,
+        "identical": identical
+    }
+
+
+def benchmark_download(image_count: int = 100, image_size: int = 200 * 1024, latency: float = 0.05) -> tuple[list[dict], list[tuple[str, bool]]]:
+    """
+    Downloads image_count images from a local HTTP server, one at a time and concurrently.
+
+    Every run starts with an empty image cache, so every image is downloaded. Reports the
+    throughput, the TCP connections opened (reused with keep-alive), the most requests in
+    flight to the host and the longest time the event loop was blocked.
+
+    Returns:
+        tuple: One result per run, and the (description, passed) checks of the downloads.
+    """
+    from . import file_downloader
+    from .image_cache import ImageCache
+
+    server = FakeImageServer(image_size, latency)
+    server.start()
+    per_host_limit = file_downloader.download_client.max_connections_per_host
+    results = []
+    checks = []
+    for run in ["one at a time", "concurrent"]:
+        work_folder = tempfile.mkdtemp(prefix="download_benchmark_")
+        file_downloader.image_cache = ImageCache(os.path.join(work_folder, "cache"), max_bytes=1 << 40)
+        server.reset_counters()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = asyncio.run(_run_downloads(server, os.path.join(work_folder, "images"), image_count, run == "concurrent"))
+        results.append({
+            "run": run,
+            "images": image_count,
+            "seconds": result["seconds"],
+            "megabytes_per_second": image_count * image_size / result["seconds"] / (1024 * 1024),
+            "connections": len(server.connections),
+            "peak_in_flight": server.peak_in_flight,
+            "max_loop_lag_seconds": result["max_loop_lag_seconds"]
+        })
+        checks.append((f"{run}: downloaded files are byte-identical", result["identical"]))
+        connection_limit = per_host_limit if run == "concurrent" else 1
+        checks.append((
+            f"{run}: connections reused with keep-alive (at most {connection_limit})",
+            len(server.connections) <= connection_limit
+        ))
+        checks.append((f"{run}: at most {per_host_limit} requests in flight to the host", server.peak_in_flight <= per_host_limit))
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+    server.shutdown()
+    return results, checks
+
+
+def _format_bytes(size: int | None) -> str:
+    return "n/a" if size is None else f"{size / (1024 * 1024):.0f} MB"
+
+
+def _print_table(headers: list[str], rows: list[list]):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, ["-" * width for width in widths], *rows]:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+
+def _print_checks(checks: list[tuple[str, bool]]):
+    for description, passed in checks:
+        print(f"{'✓' if passed else '❌'} {description}")
+    if not all(passed for _, passed in checks):
+        sys.exit(1)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    fetch_parser = subparsers.add_parser("fetch", help="Fetch and stream synthetic pages from a fake paginated Notion API")
+    fetch_parser.add_argument("--blocks", type=int, nargs="+", help="Page sizes in blocks (1000, 10000 and 50000 by default)")
+    fetch_parser.add_argument("--concurrency", type=int, nargs="+", help="Maximum requests in flight to compare")
+    fetch_parser.add_argument("--latency", type=float, default=0.02, help="Seconds every fake API request takes")
+
+    render_parser = subparsers.add_parser("render", help="Measure blocks/second of the renderer on a synthetic block tree")
+    render_parser.add_argument("--blocks", type=int, default=100000, help="Blocks in the synthetic tree")
+    render_parser.add_argument("--repeats", type=int, default=3, help="Runs per mode; the fastest is reported")
+
+    memory_parser = subparsers.add_parser("memory", help="Compare time and peak memory of converting and streaming synthetic pages")
+    memory_parser.add_argument("--blocks", type=int, nargs="+", help="Page sizes in blocks (10000 and 100000 by default)")
+
+    publish_parser = subparsers.add_parser("publish", help="Publish a post file by file and as one batch to a fake GitHub API")
+    publish_parser.add_argument("--images", type=int, default=20, help="Number of images in the post")
+    publish_parser.add_argument("--latency", type=float, default=0.05, help="Seconds every fake API request takes")
+
+    download_parser = subparsers.add_parser("download", help="Download images from a local HTTP server, one at a time and concurrently")
+    download_parser.add_argument("--images", type=int, default=100, help="Number of images to download")
+    download_parser.add_argument("--image-size", type=int, default=200 * 1024, help="Size of every image in bytes")
+    download_parser.add_argument("--latency", type=float, default=0.05, help="Seconds before every response starts")
+
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "fetch":
+        results = benchmark_fetch(args.blocks, args.concurrency, args.latency)
+        _print_table(
+            ["blocks", "fetched", "concurrency", "requests", "connections", "peak in flight", "fetch", "first chunk", "stream"],
+            [
+                [
+                    result["blocks"],
+                    result["fetched_blocks"],
+                    result["max_concurrency"],
+                    result["requests"],
+                    result["connections"],
+                    result["peak_in_flight"],
+                    f"{result['fetch_seconds']:.2f}s",
+                    f"{result['first_chunk_seconds']:.2f}s",
+                    f"{result['stream_seconds']:.2f}s"
+                ]
+                for result in results
+            ]
+        )
+
+    elif args.benchmark == "render":
+        results = benchmark_render(args.blocks, args.repeats)
+        _print_table(
+            ["mode", "blocks", "characters", "time", "blocks/s"],
+            [
+                [
+                    result["mode"],
+                    result["blocks"],
+                    result["characters"],
+                    f"{result['seconds']:.2f}s",
+                    f"{result['blocks_per_second']:,.0f}"
+                ]
+                for result in results
+            ]
+        )
+
+    elif args.benchmark == "memory":
+        results = benchmark_memory(args.blocks)
+        _print_table(
+            ["mode", "blocks", "characters", "requests", "time", "peak memory", "peak growth"],
+            [
+                [
+                    result["mode"],
+                    result["blocks"],
+                    result["characters"],
+                    result["requests"],
+                    f"{result['seconds']:.2f}s",
+                    _format_bytes(result["peak_memory_bytes"]),
+                    _format_bytes(result["peak_growth_bytes"])
+                ]
+                for result in results
+            ]
+        )
+
+    elif args.benchmark == "publish":
+        results, checks = benchmark_publish(args.images, args.latency)
+        _print_table(
+            ["run", "total", "requests", "blobs", "commits", "success"],
+            [
+                [
+                    result["run"],
+                    f"{result['seconds']:.2f}s",
+                    result["requests"],
+                    result["blobs"],
+                    result["commits"],
+                    result["success"]
+                ]
+                for result in results
+            ]
+        )
+        print()
+        _print_checks(checks)
+
+    elif args.benchmark == "download":
+        results, checks = benchmark_download(args.images, args.image_size, args.latency)
+        _print_table(
+            ["run", "images", "total", "throughput", "connections", "peak in flight", "max loop lag"],
+            [
+                [
+                    result["run"],
+                    result["images"],
+                    f"{result['seconds']:.2f}s",
+                    f"{result['megabytes_per_second']:.1f} MB/s",
+                    result["connections"],
+                    result["peak_in_flight"],
+                    f"{result['max_loop_lag_seconds'] * 1000:.0f} ms"
+                ]
+                for result in results
+            ]
+        )
+        print()
+        _print_checks(checks)
+
+
+if __name__ == "__main__":
+    main()
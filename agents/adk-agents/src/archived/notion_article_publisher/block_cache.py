@@ -0,0 +1,106 @@
+import json
+import time
+from datetime import datetime
+
+from .sqlite_cache import SqliteLruCache
+
+
+# Signed Notion file URLs are treated as expired this many seconds before their expiry_time
+EXPIRY_MARGIN_SECONDS = 60
+
+
+def _earliest_expiry(value) -> float | None:
+    """
+    Returns the earliest `expiry_time` (as a UNIX timestamp) found anywhere in a block tree.
+
+    Notion-hosted files carry signed URLs that expire, so a cached subtree containing them
+    is only valid until the first of those URLs expires.
+    """
+    earliest = None
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            expiry_time = item.get("expiry_time")
+            if isinstance(expiry_time, str):
+                try:
+                    timestamp = datetime.fromisoformat(expiry_time.replace("Z", "+00:00")).timestamp()
+                except ValueError:
+                    timestamp = None
+                if timestamp is not None and (earliest is None or timestamp < earliest):
+                    earliest = timestamp
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return earliest
+
+
+class BlockCache(SqliteLruCache):
+    """
+    On-disk SQLite cache of Notion block subtrees, keyed by block ID and `last_edited_time`.
+
+    A cached subtree is returned only while the block's `last_edited_time` still matches the
+    one it was stored with, and while none of the signed file URLs inside it have expired.
+    The cache is bounded by the total size of the stored JSON; the least recently used
+    entries are evicted first.
+
+    Args:
+        path (str): Path of the SQLite database file. Parent folders are created on first use.
+        max_bytes (int): Maximum total size of the cached JSON, in bytes.
+
+    Example:
+        >>> cache = BlockCache("./.cache/notion_blocks.sqlite3", max_bytes=64 * 1024 * 1024)
+        >>> cache.put("abc123", "2025-01-01T00:00:00.000Z", children)
+        >>> cache.get("abc123", "2025-01-01T00:00:00.000Z") == children
+        True
+        >>> cache.stats()
+        {'hits': 1, 'misses': 0, 'entries': 1, 'size_bytes': 2048, 'max_bytes': 67108864}
+    """
+
+    table = "blocks"
+    key_columns = ("block_id",)
+    columns = "block_id TEXT NOT NULL, last_edited_time TEXT NOT NULL, children TEXT NOT NULL, expires_at REAL"
+
+    def get(self, block_id: str, last_edited_time: str | None) -> list[dict] | None:
+        """
+        Returns the cached children of a block, or None on a miss.
+        """
+        if not last_edited_time:
+            self.misses += 1
+            return None
+
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT children, expires_at FROM blocks WHERE block_id = ? AND last_edited_time = ?",
+            (block_id, last_edited_time)
+        ).fetchone()
+
+        if row is None or (row[1] is not None and row[1] - EXPIRY_MARGIN_SECONDS <= time.time()):
+            self.misses += 1
+            return None
+
+        self._touch(connection, (block_id,))
+        connection.commit()
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, block_id: str, last_edited_time: str | None, children: list[dict]):
+        """
+        Stores the children of a block, then evicts least recently used entries over max_bytes.
+        """
+        if not last_edited_time:
+            return
+
+        children_json = json.dumps(children, ensure_ascii=False, separators=(",", ":"))
+        size = len(children_json.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        connection = self._connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO blocks (block_id, last_edited_time, children, size, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (block_id, last_edited_time, children_json, size, _earliest_expiry(children), time.time())
+        )
+        self._evict(connection)
+        connection.commit()
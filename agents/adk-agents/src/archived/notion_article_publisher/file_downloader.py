@@ -1,18 +1,359 @@
 import os
-import requests
+import re
+import asyncio
+import hashlib
+import contextlib
+import httpx
+import dotenv
+dotenv.load_dotenv()
+
 from urllib.parse import urlparse
 from pathlib import Path
+from typing import AsyncIterator
+
+from .image_cache import ImageCache, image_source_key
+from .image_optimizer import IMAGE_OPTIMIZE, optimize_images
+from .retry_after import parse_retry_after
+
+# Connection pool shared by every download; connections are kept alive between images
+IMAGE_DOWNLOAD_MAX_CONNECTIONS = int(os.getenv("IMAGE_DOWNLOAD_MAX_CONNECTIONS", "32"))
+# Notion serves every file from the same S3 host, so cap the connections opened to one host
+IMAGE_DOWNLOAD_MAX_CONNECTIONS_PER_HOST = int(os.getenv("IMAGE_DOWNLOAD_MAX_CONNECTIONS_PER_HOST", "8"))
+IMAGE_DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("IMAGE_DOWNLOAD_CONNECT_TIMEOUT", "10"))
+IMAGE_DOWNLOAD_READ_TIMEOUT = float(os.getenv("IMAGE_DOWNLOAD_READ_TIMEOUT", "60"))
+IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Maximum number of images download_images fetches at once
+IMAGE_DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_DOWNLOAD_CONCURRENCY", "8"))
+# Interrupted downloads are resumed up to IMAGE_DOWNLOAD_RETRIES attempts in total, waiting
+# IMAGE_DOWNLOAD_BACKOFF seconds before the first retry and twice as long before each next one
+IMAGE_DOWNLOAD_RETRIES = int(os.getenv("IMAGE_DOWNLOAD_RETRIES", "5"))
+IMAGE_DOWNLOAD_BACKOFF = float(os.getenv("IMAGE_DOWNLOAD_BACKOFF", "0.5"))
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+MIME_TO_EXTENSION = {
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/bmp': '.bmp',
+    'image/svg+xml': '.svg',
+    'image/tiff': '.tiff',
+    'image/x-icon': '.ico',
+    'image/avif': '.avif'
+}
+VALID_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.tiff', '.ico', '.avif']
+
+image_cache = ImageCache(
+    path=os.getenv(
+        "IMAGE_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "images")
+    ),
+    max_bytes=int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+)
+
+# Markdown image tag: ![caption](url)
+IMAGE_TAG_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)\)')
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class IncompleteDownloadError(Exception):
+    """
+    Raised when a response body does not match its Content-Length, Content-Range or checksum.
+    """
+
+
+async def _close_when_cancelled(client: httpx.AsyncClient):
+    """
+    Waits until cancelled, then closes the client's connection pool.
+
+    Started on the event loop that owns the pool: asyncio.run cancels the tasks still pending
+    when its main coroutine returns, so the pool is closed on its own loop before that loop is.
+    """
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await client.aclose()
+
+
+class DownloadClient:
+    """
+    Shared async HTTP client used for every download.
+
+    Wraps one `httpx.AsyncClient` so that all downloads reuse the same connection pool
+    (HTTP keep-alive instead of a new TCP/TLS handshake per image), with connect/read
+    timeouts and a cap on concurrent requests per host. Connections cannot be shared between
+    event loops, so a fresh pool is created the first time the client is used on a new loop,
+    and each pool is closed when asyncio.run finishes the loop it belongs to.
+
+    Args:
+        max_connections (int): Maximum number of open connections across all hosts.
+        max_connections_per_host (int): Maximum number of requests in flight to a single host.
+        connect_timeout (float): Seconds to wait for a connection to be established.
+        read_timeout (float): Seconds to wait between two chunks of a response.
+
+    Example:
+        >>> async with download_client.stream('https://example.com/image.jpg') as response:
+        ...     async for chunk in response.aiter_bytes():
+        ...         output.write(chunk)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = IMAGE_DOWNLOAD_MAX_CONNECTIONS,
+        max_connections_per_host: int = IMAGE_DOWNLOAD_MAX_CONNECTIONS_PER_HOST,
+        connect_timeout: float = IMAGE_DOWNLOAD_CONNECT_TIMEOUT,
+        read_timeout: float = IMAGE_DOWNLOAD_READ_TIMEOUT
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        # Tasks that close the pool of each loop; the loop itself only keeps weak references
+        self._closers: list[asyncio.Task] = []
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                # Images are already compressed; an unencoded body also keeps byte ranges and
+                # Content-Length comparable with what is written to disk
+                headers={'Accept-Encoding': 'identity'},
+                follow_redirects=True
+            )
+            self._loop = loop
+            self._host_semaphores = {}
+            self._closers = [task for task in self._closers if not task.done()]
+            self._closers.append(loop.create_task(_close_when_cancelled(self._client)))
+        return self._client
+
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_semaphores[host]
+
+    @contextlib.asynccontextmanager
+    async def stream(self, url: str, headers: dict | None = None) -> AsyncIterator[httpx.Response]:
+        """
+        Sends a GET request and yields the response without reading its body.
+
+        Raises httpx.HTTPStatusError for 4xx/5xx responses.
+        """
+        client = self._get_client()
+        async with self._get_host_semaphore(url):
+            async with client.stream('GET', url, headers=headers) as response:
+                response.raise_for_status()
+                yield response
+
+    async def aclose(self):
+        """
+        Closes the pooled connections. The next download opens a new pool.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+        for task in self._closers:
+            if task.get_loop() is self._loop:
+                task.cancel()
+        self._client = None
+        self._loop = None
+        self._host_semaphores = {}
+
+
+download_client = DownloadClient()
+
+
+def _resolve_target_folder(target_folder: str) -> str:
+    """
+    Resolves a folder relative to the script directory unless it is already absolute.
+    """
+    if os.path.isabs(target_folder):
+        return target_folder
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, target_folder)
+
+
+def _detect_extension(content_type: str, image_url: str) -> str:
+    """
+    Returns the image extension from the Content-Type header, the URL, or `.jpg` as a fallback.
+    """
+    # Extract base MIME type (handle charset, etc.)
+    base_content_type = content_type.split(';')[0].strip().lower()
+    extension = MIME_TO_EXTENSION.get(base_content_type, '')
+    if extension:
+        return extension
+
+    # If no extension from Content-Type, try to extract from URL
+    url_ext = os.path.splitext(urlparse(image_url).path)[1].lower()
+    if url_ext in VALID_IMAGE_EXTENSIONS:
+        return url_ext
+
+    # Default to .jpg if no extension found
+    return '.jpg'
+
+
+def _retry_delay(error: Exception, attempt: int) -> float | None:
+    """
+    Returns how long to wait before retrying a failed download, or None if it should not be retried.
+    
+    Honors a Retry-After header given in seconds or as an HTTP-date, and falls back to
+    exponential backoff from IMAGE_DOWNLOAD_BACKOFF.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        if error.response.status_code not in RETRYABLE_STATUSES:
+            return None
+        retry_after = parse_retry_after(error.response.headers.get('retry-after'))
+        if retry_after is not None:
+            return retry_after
+    elif not isinstance(error, (httpx.TransportError, IncompleteDownloadError)):
+        return None
+    return IMAGE_DOWNLOAD_BACKOFF * 2 ** (attempt - 1)
+
+
+def _expected_md5(response: httpx.Response) -> str | None:
+    """
+    Returns the MD5 checksum of the whole file if the response carries one.
+
+    S3 (which hosts Notion files) uses the MD5 of the object as ETag for objects that were
+    not uploaded in parts and are unencrypted or encrypted with SSE-S3. Objects encrypted
+    with SSE-KMS or SSE-C have ETags that look the same but are not an MD5 of the content.
+    """
+    if 'x-amz-request-id' not in response.headers and response.headers.get('server') != 'AmazonS3':
+        return None
+    if response.headers.get('x-amz-server-side-encryption', '').lower().startswith('aws:kms'):
+        return None
+    if 'x-amz-server-side-encryption-customer-algorithm' in response.headers:
+        return None
+    etag = response.headers.get('etag', '').strip('"').lower()
+    if re.fullmatch(r'[0-9a-f]{32}', etag):
+        return etag
+    return None
+
+
+async def _download_to_file(image_url: str, part_path: str, resolved_target_folder: str, filename: str) -> str:
+    """
+    Downloads image_url through part_path and atomically moves it into the target folder.
+
+    Bytes already in part_path (left by an interrupted attempt or run) are resumed with an
+    HTTP Range request; if the server ignores the range, the download starts over. The
+    received size is validated against Content-Length / Content-Range, and against the S3
+    MD5 checksum when there is one, before the file is renamed to its final path.
+    Returns the final path.
+    """
+    validator = None
+    attempt = 0
+    while True:
+        attempt += 1
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            if validator:
+                # Only resume if the file did not change since the previous attempt
+                headers['If-Range'] = validator
+        
+        try:
+            async with download_client.stream(image_url, headers=headers) as response:
+                etag = response.headers.get('etag')
+                validator = etag if etag and not etag.startswith('W/') else response.headers.get('last-modified')
+                
+                if response.status_code == 206:
+                    match = CONTENT_RANGE_PATTERN.fullmatch(response.headers.get('content-range', ''))
+                    if match is None or int(match.group(1)) != offset:
+                        os.remove(part_path)
+                        raise IncompleteDownloadError(f"Unexpected Content-Range: {response.headers.get('content-range')}")
+                    expected_size = int(match.group(3)) if match.group(3) != '*' else None
+                    mode = 'ab'
+                else:
+                    # The server sent the whole file, so start over
+                    content_length = response.headers.get('content-length', '')
+                    expected_size = int(content_length) if content_length.isdigit() else None
+                    mode = 'wb'
+                
+                with open(part_path, mode) as f:
+                    async for chunk in response.aiter_bytes(IMAGE_DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                
+                size = os.path.getsize(part_path)
+                if expected_size is not None and size != expected_size:
+                    if size > expected_size:
+                        os.remove(part_path)
+                    raise IncompleteDownloadError(f"Received {size} of {expected_size} bytes")
+                
+                expected_md5 = _expected_md5(response)
+                if expected_md5 is not None:
+                    digest = hashlib.md5()
+                    with open(part_path, 'rb') as f:
+                        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                            digest.update(chunk)
+                    if digest.hexdigest() != expected_md5:
+                        os.remove(part_path)
+                        raise IncompleteDownloadError(f"Checksum mismatch: expected MD5 {expected_md5}")
+                
+                # Determine file extension from Content-Type header or URL
+                extension = _detect_extension(response.headers.get('content-type', ''), image_url)
+        except Exception as e:
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 416 and offset:
+                # The partial file does not fit the current file, so start over right away
+                os.remove(part_path)
+                delay = 0.0
+            else:
+                delay = _retry_delay(e, attempt)
+            if delay is None or attempt >= IMAGE_DOWNLOAD_RETRIES:
+                raise
+            if delay:
+                print(f"⚠️ Retrying download of {image_url} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+            continue
+        
+        # Use provided filename, append extension if not present
+        if os.path.splitext(filename)[1]:
+            # Filename has extension, use it as is
+            final_filename = filename
+        else:
+            # Filename doesn't have extension, append the detected extension
+            final_filename = f"{filename}{extension}"
+        
+        # Rename into place, so the final path never holds a truncated file (this replaces
+        # rather than overwrites an existing file, which may be hard-linked to the image cache)
+        file_path = os.path.join(resolved_target_folder, final_filename)
+        os.replace(part_path, file_path)
+        return file_path
+
+
+def _slugify(text: str) -> str:
+    """
+    Lowercases text and joins its ASCII letters and digits with hyphens.
+    """
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
 
 
 async def download_image(image_url: str, target_folder: str, filename: str) -> str:
     """
     Downloads an image file from a URL to a target folder.
     
+    The image is streamed to disk in chunks over the shared connection pool, so other
+    tools keep running on the event loop while it downloads. Images already in the local
+    image cache (see `ImageCache`) are linked into the target folder instead.
+    
+    The download goes to a hidden `.part` file first. Failed attempts are retried with
+    exponential backoff, resuming with an HTTP Range request where the server supports it,
+    and the file is only renamed to its final path once its size (and S3 checksum, if any)
+    has been validated.
+    
     Args:
         image_url (str): The URL of the image to download.
         target_folder (str): The folder path where the image should be saved.
             Can be absolute or relative to the script directory.
-        filename (str): The filename to save the image as. If the filename doesn't 
+        filename (str): The filename to save the image as. If the filename doesn't
             have an extension, the detected extension will be appended.
     
     Returns:
@@ -43,66 +384,27 @@ async def download_image(image_url: str, target_folder: str, filename: str) -> s
             raise ValueError('Filename is required and must be a string')
         
         # Resolve target folder path
-        if os.path.isabs(target_folder):
-            resolved_target_folder = target_folder
-        else:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            resolved_target_folder = os.path.join(script_dir, target_folder)
+        resolved_target_folder = _resolve_target_folder(target_folder)
         
         # Create target directory if it doesn't exist
         os.makedirs(resolved_target_folder, exist_ok=True)
         
-        # Download the image
-        response = requests.get(image_url, stream=True)
-        response.raise_for_status()
-        
-        # Determine file extension from Content-Type header or URL
-        content_type = response.headers.get('content-type', '')
-        extension = ''
-        
-        if content_type:
-            mime_to_ext = {
-                'image/jpeg': '.jpg',
-                'image/jpg': '.jpg',
-                'image/png': '.png',
-                'image/gif': '.gif',
-                'image/webp': '.webp',
-                'image/bmp': '.bmp',
-                'image/svg+xml': '.svg',
-                'image/tiff': '.tiff',
-                'image/x-icon': '.ico',
-                'image/avif': '.avif'
-            }
-            # Extract base MIME type (handle charset, etc.)
-            base_content_type = content_type.split(';')[0].strip().lower()
-            extension = mime_to_ext.get(base_content_type, '')
-        
-        # If no extension from Content-Type, try to extract from URL
-        if not extension:
-            parsed_url = urlparse(image_url)
-            url_path = parsed_url.path
-            url_ext = os.path.splitext(url_path)[1].lower()
-            valid_image_exts = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.tiff', '.ico', '.avif']
-            if url_ext in valid_image_exts:
-                extension = url_ext
-            else:
-                # Default to .jpg if no extension found
-                extension = '.jpg'
-        
-        # Use provided filename, append extension if not present
-        if os.path.splitext(filename)[1]:
-            # Filename has extension, use it as is
-            final_filename = filename
-        else:
-            # Filename doesn't have extension, append the detected extension
-            final_filename = f"{filename}{extension}"
+        # Reuse the image if it was already downloaded, for this post or another one
+        source_key = image_source_key(image_url)
+        file_path = image_cache.link(source_key, os.path.join(resolved_target_folder, filename))
+        if file_path is not None:
+            print(f"Image reused from cache: {file_path}")
+            return file_path
         
-        file_path = os.path.join(resolved_target_folder, final_filename)
+        # Download the image through a hidden partial file that survives interrupted runs
+        source_digest = hashlib.sha256(source_key.encode('utf-8')).hexdigest()[:16]
+        part_path = os.path.join(resolved_target_folder, f".{filename}.{source_digest}.part")
+        file_path = await _download_to_file(image_url, part_path, resolved_target_folder, filename)
         
-        # Save the image
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        try:
+            image_cache.put(source_key, file_path)
+        except Exception as e:
+            print(f"⚠️ Could not add image to the cache: {e}")
         
         print(f"Image downloaded successfully: {file_path}")
         return file_path
@@ -111,3 +413,148 @@ async def download_image(image_url: str, target_folder: str, filename: str) -> s
         print(f"Error downloading image: {error}")
         raise
 
+
+async def download_images(markdown: str, blog_id: str, file_names: dict[str, str] | None = None) -> dict:
+    """
+    Downloads every image of a markdown article concurrently and rewrites the image URLs.
+    
+    All `![caption](url)` tags are collected in one pass and downloaded through a bounded
+    pool of IMAGE_DOWNLOAD_CONCURRENCY downloads into the `blog/images/[blog_id]` folder.
+    Each image tag is then rewritten to `![caption](../images/[blog_id]/[file_name])`.
+    
+    File names are derived deterministically from the caption: the English name given for
+    the caption in file_names, or else the caption itself, is turned into a lowercase slug
+    string. Images without a usable name (an empty caption, the default "Image" caption, or
+    a caption with non-ASCII characters such as Chinese that has no entry in file_names)
+    are numbered 1, 2, 3... in document order. Repeated names get a `-2`, `-3`... suffix, and an image URL used
+    more than once is only downloaded once. Images found in the local image cache are
+    not downloaded at all. When IMAGE_OPTIMIZE is on, the images are then resized and
+    re-encoded (see `optimize_images`) and the URLs point to the optimized files.
+    
+    Args:
+        markdown (str): The markdown content of the article.
+        blog_id (str): The blog ID, used as the image folder name.
+        file_names (dict[str, str] | None): Maps image captions to English file names, e.g.
+            {"AI应用开发图书的封面": "AI application development book cover"}. Captions that
+            are not in English should be translated here, since only ASCII letters and
+            digits are kept in file names.
+    
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether every image was downloaded
+            - message (str): Success or error message
+            - markdown (str): The markdown content with the downloaded image URLs rewritten.
+              Images that failed to download keep their original URL.
+            - images (list): Manifest with one entry per unique image URL, in document order,
+              each with caption, url, file_name, file_path, new_url, success and error
+            - cache (dict): Statistics of the local image cache (hits, misses, hit_rate,
+              bytes_saved, entries, size_bytes, max_bytes)
+            - optimization (dict | None): The `optimize_images` report with the bytes saved,
+              or None when IMAGE_OPTIMIZE is off
+    
+    Example:
+        >>> result = await download_images(
+        ...     "![Book cover](https://example.com/cover.png)\\n\\n![](https://example.com/a.jpg)",
+        ...     "2025-11-02-my-post"
+        ... )
+        >>> print(result["markdown"])
+        ![Book cover](../images/2025-11-02-my-post/book-cover.png)
+        
+        ![](../images/2025-11-02-my-post/1.jpg)
+        >>> result = await download_images(
+        ...     "![AI应用开发图书的封面](https://example.com/cover.png)",
+        ...     "2025-11-02-my-post",
+        ...     {"AI应用开发图书的封面": "ai-application-development-book-cover"}
+        ... )
+        >>> print(result["markdown"])
+        ![AI应用开发图书的封面](../images/2025-11-02-my-post/ai-application-development-book-cover.png)
+    """
+    target_folder = os.path.join('blog', 'images', blog_id)
+    
+    # Collect the unique images in document order and decide their file names
+    images = {}
+    used_names = set()
+    unnamed_count = 0
+    for match in IMAGE_TAG_PATTERN.finditer(markdown):
+        caption, image_url = match.group(1), match.group(2)
+        if image_url in images:
+            continue
+        
+        if file_names and file_names.get(caption):
+            name = _slugify(file_names[caption])
+        elif caption.strip() == 'Image' or not caption.isascii():
+            # A slug of a partly non-ASCII caption would only keep fragments like "ai"
+            name = ''
+        else:
+            name = _slugify(caption)
+        if not name:
+            unnamed_count += 1
+            name = str(unnamed_count)
+        unique_name = name
+        suffix = 2
+        while unique_name in used_names:
+            unique_name = f"{name}-{suffix}"
+            suffix += 1
+        used_names.add(unique_name)
+        
+        images[image_url] = {
+            "caption": caption,
+            "url": image_url,
+            "file_name": unique_name,
+            "file_path": None,
+            "new_url": None,
+            "success": False,
+            "error": None
+        }
+    
+    semaphore = asyncio.Semaphore(max(1, IMAGE_DOWNLOAD_CONCURRENCY))
+    
+    async def download(image: dict):
+        async with semaphore:
+            try:
+                file_path = await download_image(image["url"], target_folder, image["file_name"])
+            except Exception as e:
+                image["error"] = str(e)
+                return
+        image["file_path"] = file_path
+        image["success"] = True
+    
+    await asyncio.gather(*(download(image) for image in images.values()))
+    
+    # Optionally resize and re-encode the downloaded images before they are published
+    downloaded = [image for image in images.values() if image["success"]]
+    optimization = None
+    if IMAGE_OPTIMIZE and downloaded:
+        optimization = await optimize_images([image["file_path"] for image in downloaded])
+        for image in downloaded:
+            image["file_path"] = optimization["files"][image["file_path"]]
+    
+    for image in downloaded:
+        image["file_name"] = os.path.basename(image["file_path"])
+        image["new_url"] = f"../images/{blog_id}/{image['file_name']}"
+    
+    def rewrite(match: re.Match) -> str:
+        image = images[match.group(2)]
+        if not image["success"]:
+            return match.group(0)
+        return f"![{match.group(1)}]({image['new_url']})"
+    
+    new_markdown = IMAGE_TAG_PATTERN.sub(rewrite, markdown)
+    manifest = list(images.values())
+    failed = [image for image in manifest if not image["success"]]
+    
+    if failed:
+        message = f"Downloaded {len(manifest) - len(failed)} of {len(manifest)} images, {len(failed)} failed"
+        print(f"❌ {message}")
+    else:
+        message = f"Downloaded {len(manifest)} images to {target_folder}"
+        print(f"✓ {message}")
+    
+    return {
+        "success": not failed,
+        "message": message,
+        "markdown": new_markdown,
+        "images": manifest,
+        "cache": image_cache.stats(),
+        "optimization": optimization
+    }
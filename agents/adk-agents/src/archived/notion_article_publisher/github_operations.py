@@ -1,14 +1,838 @@
 import os
+import time
 import base64
+import hashlib
 import pathlib
+import threading
 import dotenv
 dotenv.load_dotenv()
 
+from concurrent.futures import ThreadPoolExecutor
 from github import Github
 from github import Auth
+from github import GithubException
+from github import InputGitTreeElement
 
-auth = Auth.Token(os.getenv("GITHUB_API_KEY"))
-g = Github(auth=auth)
+from .retry_after import parse_retry_after
+
+# Repository and branch the blog is published to
+GITHUB_REPO = os.getenv("GITHUB_REPO", "hh54188/horace-jekyll-theme-v1.2.0")
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH", "master")
+# GITHUB_API_URL can point the client at GitHub Enterprise or a local fake API for testing
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# Number of files read, hashed and uploaded in parallel by GitHubBatch.commit
+GITHUB_UPLOAD_WORKERS = int(os.getenv("GITHUB_UPLOAD_WORKERS", "4"))
+# Attempts per blob upload before the batch is given up
+GITHUB_UPLOAD_RETRIES = int(os.getenv("GITHUB_UPLOAD_RETRIES", "3"))
+# GitHub's secondary rate limit allows about 80 content-creating requests per minute
+GITHUB_REQUESTS_PER_MINUTE = int(os.getenv("GITHUB_REQUESTS_PER_MINUTE", "80"))
+GITHUB_REQUEST_BURST = int(os.getenv("GITHUB_REQUEST_BURST", "10"))
+# Size of the pooled HTTP session shared by the upload workers
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", str(GITHUB_UPLOAD_WORKERS + 2)))
+
+# HTTP statuses worth retrying: secondary rate limits (403/429) and transient server errors
+RETRYABLE_STATUSES = {403, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every upload worker.
+    
+    Each request takes one token; tokens refill at a fixed rate up to `capacity`. When
+    GitHub answers with Retry-After, pause() holds back every worker until it has passed,
+    not only the one that got the response.
+    
+    Args:
+        rate_per_second (float): Tokens added per second.
+        capacity (int): Maximum number of tokens, i.e. the allowed burst.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a token is available and takes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+                    self._updated_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        Stops handing out tokens for the given number of seconds.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+github_rate_limiter = TokenBucket(GITHUB_REQUESTS_PER_MINUTE / 60, GITHUB_REQUEST_BURST)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float | None:
+    """
+    Returns how long to wait before retrying a failed request, or None if it should not be retried.
+    
+    Honors the Retry-After and x-ratelimit-reset headers GitHub sends with rate limit errors,
+    and falls back to exponential backoff (1s, 2s, 4s...).
+    """
+    if isinstance(error, GithubException):
+        if error.status not in RETRYABLE_STATUSES:
+            return None
+        headers = {key.lower(): value for key, value in (error.headers or {}).items()}
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        if retry_after is not None:
+            return retry_after
+        if headers.get("x-ratelimit-remaining") == "0" and headers.get("x-ratelimit-reset"):
+            return max(0.0, float(headers["x-ratelimit-reset"]) - time.time())
+        if error.status == 403:
+            # A 403 without rate limit headers is a permission error
+            return None
+    elif not isinstance(error, OSError):
+        # Network errors (including those raised by requests) are OSErrors
+        return None
+    return float(2 ** (attempt - 1))
+
+
+def git_blob_sha(content: bytes) -> str:
+    """
+    Computes the SHA-1 that git assigns to a blob with the given content.
+    
+    Example:
+        >>> git_blob_sha(b"hello\\n")
+        'ce013625030ba8dba906f756967f9e9ca394464a'
+    """
+    header = f"blob {len(content)}\0".encode('utf-8')
+    return hashlib.sha1(header + content).hexdigest()
+
+
+class GitHubBatch:
+    """
+    Collects files and publishes all of them to the GitHub repository in a single commit.
+    
+    Files are only read and sent to GitHub when commit() is called. It fetches the tree of
+    the branch head once, then a pool of worker threads reads and hashes every file, skips
+    those whose git blob SHA-1 already matches the remote entry and uploads the rest as
+    blobs. Blob uploads share the github_rate_limiter token bucket, wait out Retry-After
+    responses and are retried up to GITHUB_UPLOAD_RETRIES times. Finally one tree on top of
+    the branch head, one commit and a single (non-forced) update of the branch ref are
+    created. Nothing becomes visible on the branch until that last step succeeds, so a
+    failure halfway leaves the branch untouched.
+    
+    Args:
+        publisher (GitHubPublisher): The publisher whose repository, branch and cached
+            branch head are used.
+        message (str): The commit message.
+        max_workers (int): Number of files processed in parallel.
+            Defaults to the GITHUB_UPLOAD_WORKERS environment variable (4).
+    
+    Example:
+        >>> batch = publisher.batch("Publish 2025-11-02-my-post")
+        >>> batch.add_file("_posts/2025-11-02-my-post.md", "# My Blog Post")
+        >>> batch.add_local_file("blog/images/2025-11-02-my-post/cover.jpg", "images/2025-11-02-my-post/cover.jpg")
+        >>> batch.commit()
+        {'success': True, 'message': 'Committed 2 files (1 created, 1 updated, 0 skipped)', 'commit': {...}, ...}
+    """
+
+    def __init__(self, publisher: "GitHubPublisher", message: str, max_workers: int = GITHUB_UPLOAD_WORKERS):
+        self.publisher = publisher
+        self.message = message
+        self.max_workers = max_workers
+        # Target path -> file content, or the local path to read it from at commit time
+        self.files: dict[str, bytes | str] = {}
+
+    def add_file(self, target_file_path: str, content: str | bytes):
+        """
+        Adds (or replaces) a file in the batch. Text content is encoded as UTF-8.
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        self.files[target_file_path.replace('\\', '/')] = content
+
+    def add_local_file(self, local_file_path: str, target_file_path: str):
+        """
+        Adds a local file to the batch. Relative paths are resolved against the folder of this file.
+        """
+        if not os.path.isabs(local_file_path):
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            local_file_path = os.path.join(script_dir, local_file_path)
+        
+        if not os.path.isfile(local_file_path):
+            raise FileNotFoundError(f"Local file does not exist: {local_file_path}")
+        
+        self.files[target_file_path.replace('\\', '/')] = local_file_path
+
+    def _upload_file(self, repo, target_file_path: str, remote_sha: str | None) -> dict:
+        """
+        Reads and hashes one file and uploads it as a blob unless the remote copy is identical.
+        Runs on a worker thread; never raises, errors are reported in the returned dict.
+        """
+        result = {"path": target_file_path, "status": "failed", "attempts": 0, "blob_sha": None, "error": None}
+        try:
+            content = self.files[target_file_path]
+            if isinstance(content, str):
+                with open(content, 'rb') as file:
+                    content = file.read()
+            
+            if remote_sha is not None and remote_sha == git_blob_sha(content):
+                result["status"] = "skipped"
+                return result
+            
+            content_base64 = base64.b64encode(content).decode('utf-8')
+            while True:
+                result["attempts"] += 1
+                github_rate_limiter.acquire()
+                try:
+                    blob = repo.create_git_blob(content_base64, "base64")
+                    break
+                except Exception as e:
+                    delay = _retry_delay(e, result["attempts"])
+                    if delay is None or result["attempts"] >= GITHUB_UPLOAD_RETRIES:
+                        raise
+                    print(f"⚠️ Retrying {target_file_path} in {delay:.1f}s: {e}")
+                    github_rate_limiter.pause(delay)
+            
+            result["blob_sha"] = blob.sha
+            result["status"] = "created" if remote_sha is None else "updated"
+        except Exception as e:
+            result["error"] = str(e)
+            print(f"❌ Error uploading {target_file_path}: {e}")
+        return result
+
+    def _publish(self, retry_on_stale_head: bool) -> dict:
+        """
+        Diffs, uploads and commits the batch on top of the (cached) branch head.
+        """
+        repo = self.publisher.repo
+        ref, head_commit = self.publisher.get_head(refresh=not retry_on_stale_head)
+        
+        # Compare local blob hashes with the remote tree, uploading new and changed files in parallel
+        remote_blob_shas = {
+            element.path: element.sha
+            for element in repo.get_git_tree(head_commit.tree.sha, recursive=True).tree
+            if element.type == "blob"
+        }
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            results = list(executor.map(
+                lambda target_file_path: self._upload_file(repo, target_file_path, remote_blob_shas.get(target_file_path)),
+                self.files
+            ))
+        
+        created = [result["path"] for result in results if result["status"] == "created"]
+        updated = [result["path"] for result in results if result["status"] == "updated"]
+        skipped = [result["path"] for result in results if result["status"] == "skipped"]
+        failed = [result["path"] for result in results if result["status"] == "failed"]
+        
+        if failed:
+            return {
+                "success": False,
+                "message": f"Failed to upload {len(failed)} files, nothing was committed: {', '.join(failed)}",
+                "commit": None,
+                "files": [],
+                "created": [],
+                "updated": [],
+                "skipped": [],
+                "results": results
+            }
+        
+        files = created + updated
+        if not files:
+            print(f"✓ Skipped {len(skipped)} unchanged files, nothing to commit")
+            return {
+                "success": True,
+                "message": f"Nothing to commit, all {len(skipped)} files are unchanged",
+                "commit": None,
+                "files": [],
+                "created": [],
+                "updated": [],
+                "skipped": skipped,
+                "results": results
+            }
+        
+        # Build a single tree with every uploaded blob on top of the head tree
+        tree_elements = [
+            InputGitTreeElement(
+                path=result["path"],
+                mode="100644",
+                type="blob",
+                sha=result["blob_sha"]
+            )
+            for result in results
+            if result["blob_sha"]
+        ]
+        tree = repo.create_git_tree(tree_elements, base_tree=head_commit.tree)
+        
+        # Create the commit and move the branch to it (fails if the branch moved meanwhile)
+        commit = repo.create_git_commit(self.message, tree, [head_commit])
+        try:
+            ref.edit(commit.sha, force=False)
+        except GithubException as e:
+            if e.status != 422 or not retry_on_stale_head:
+                raise
+            # The cached head was stale because someone else pushed; start over from the real head
+            self.publisher.invalidate_head()
+            return self._publish(retry_on_stale_head=False)
+        self.publisher.set_head(ref, commit)
+        
+        summary = f"{len(created)} created, {len(updated)} updated, {len(skipped)} skipped"
+        print(f"✓ Committed {len(files)} files in {commit.sha} ({summary})")
+        return {
+            "success": True,
+            "message": f"Committed {len(files)} files ({summary})",
+            "commit": {
+                "sha": commit.sha,
+                "html_url": commit.html_url
+            },
+            "files": files,
+            "created": created,
+            "updated": updated,
+            "skipped": skipped,
+            "results": results
+        }
+
+    def commit(self) -> dict:
+        """
+        Publishes every new or changed file in the batch as one commit on the branch.
+        
+        Returns:
+            dict: A dictionary containing:
+                - success (bool): Whether the batch was published (or had nothing to change)
+                - message (str): Success or error message
+                - commit (dict | None): Commit sha and html_url, or None if every file was unchanged
+                - files (list): Repository paths of the committed files
+                - created (list): Paths of files that did not exist in the repository
+                - updated (list): Paths of existing files whose content changed
+                - skipped (list): Paths of files whose content was already in the repository
+                - results (list): Per-file report in the order the files were added, each with
+                  path, status (created/updated/skipped/failed), attempts, blob_sha and error
+        """
+        if not self.files:
+            return {
+                "success": False,
+                "message": "No files to commit",
+                "commit": None,
+                "files": [],
+                "created": [],
+                "updated": [],
+                "skipped": [],
+                "results": []
+            }
+        
+        try:
+            return self._publish(retry_on_stale_head=True)
+        except Exception as e:
+            print(f"❌ Error committing batch to GitHub: {e}")
+            return {
+                "success": False,
+                "message": f"Failed to commit batch: {str(e)}",
+                "commit": None,
+                "files": [],
+                "created": [],
+                "updated": [],
+                "skipped": [],
+                "results": []
+            }
+
+
+class GitHubPublisher:
+    """
+    Publishes files to one GitHub repository and branch through a reused client.
+    
+    The repository handle is resolved once and cached, and so is the head of the branch,
+    which is kept up to date by every batch commit. The underlying PyGithub client keeps a
+    pooled HTTP session with keep-alive, so consecutive calls reuse connections. The
+    module-level tool functions (create_github_file, create_github_image,
+    upload_folder_to_github and the batch functions) are thin wrappers around the module
+    `publisher` instance.
+    
+    Args:
+        repo_name (str): Full name of the repository. Defaults to the GITHUB_REPO environment
+            variable ("hh54188/horace-jekyll-theme-v1.2.0").
+        branch (str): Branch to publish to. Defaults to GITHUB_BRANCH ("master").
+        token (str | None): GitHub token. Defaults to GITHUB_API_KEY.
+        base_url (str): GitHub API URL. Defaults to GITHUB_API_URL ("https://api.github.com").
+        pool_size (int): Size of the HTTP connection pool. Defaults to GITHUB_POOL_SIZE
+            (GITHUB_UPLOAD_WORKERS + 2).
+    
+    Example:
+        >>> blog = GitHubPublisher("hh54188/horace-jekyll-theme-v1.2.0", branch="master")
+        >>> blog.create_file("# My Blog Post", "_posts/2025-01-01-new-post.md")
+        {'success': True, 'message': 'File created successfully', 'commit': {...}}
+        >>> blog.stats()
+        {'repo_lookups': 1, 'repo_cache_hits': 0, 'head_lookups': 0, 'head_cache_hits': 0}
+    """
+
+    def __init__(
+        self,
+        repo_name: str = GITHUB_REPO,
+        branch: str = GITHUB_BRANCH,
+        token: str | None = None,
+        base_url: str = GITHUB_API_URL,
+        pool_size: int = GITHUB_POOL_SIZE
+    ):
+        self.repo_name = repo_name
+        self.branch = branch
+        self.github = Github(
+            auth=Auth.Token(token or os.getenv("GITHUB_API_KEY")),
+            base_url=base_url,
+            pool_size=pool_size
+        )
+        # Batch joined by create_file, create_image and upload_folder while it is open
+        self.active_batch: GitHubBatch | None = None
+        self._repo = None
+        self._head: tuple | None = None
+        self._lock = threading.Lock()
+        self._counters = {
+            "repo_lookups": 0,
+            "repo_cache_hits": 0,
+            "head_lookups": 0,
+            "head_cache_hits": 0
+        }
+
+    @property
+    def repo(self):
+        """
+        The repository handle, looked up on first use only.
+        """
+        with self._lock:
+            if self._repo is None:
+                self._counters["repo_lookups"] += 1
+                self._repo = self.github.get_repo(self.repo_name)
+            else:
+                self._counters["repo_cache_hits"] += 1
+            return self._repo
+
+    def get_head(self, refresh: bool = False) -> tuple:
+        """
+        Returns the (GitRef, GitCommit) pair of the branch head, from the cache unless refresh is True.
+        """
+        repo = self.repo
+        with self._lock:
+            if self._head is None or refresh:
+                self._counters["head_lookups"] += 1
+                ref = repo.get_git_ref(f"heads/{self.branch}")
+                self._head = (ref, repo.get_git_commit(ref.object.sha))
+            else:
+                self._counters["head_cache_hits"] += 1
+            return self._head
+
+    def set_head(self, ref, commit):
+        """
+        Records a commit the branch ref was just moved to as the cached head.
+        """
+        with self._lock:
+            self._head = (ref, commit)
+
+    def invalidate_head(self):
+        """
+        Forgets the cached branch head, e.g. after the branch was moved by another API call.
+        """
+        with self._lock:
+            self._head = None
+
+    def stats(self) -> dict:
+        """
+        Returns the repository and branch head lookup counters.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def batch(self, message: str) -> "GitHubBatch":
+        """
+        Creates a new GitHubBatch committing to this publisher's repository and branch.
+        """
+        return GitHubBatch(self, message)
+
+    def start_batch(self, commit_message: str) -> dict:
+        """
+        See start_github_batch.
+        """
+        if self.active_batch is not None:
+            return {
+                "success": False,
+                "message": (
+                    f"A GitHub batch is already open with {len(self.active_batch.files)} files; "
+                    "commit it with commit_github_batch or drop it with discard_github_batch"
+                )
+            }
+        self.active_batch = self.batch(commit_message)
+        return {
+            "success": True,
+            "message": "GitHub batch started"
+        }
+
+    def commit_batch(self) -> dict:
+        """
+        See commit_github_batch.
+        """
+        if self.active_batch is None:
+            return {
+                "success": False,
+                "message": "No GitHub batch is open",
+                "commit": None,
+                "files": [],
+                "created": [],
+                "updated": [],
+                "skipped": [],
+                "results": []
+            }
+        batch, self.active_batch = self.active_batch, None
+        return batch.commit()
+
+    def discard_batch(self) -> dict:
+        """
+        See discard_github_batch.
+        """
+        if self.active_batch is None:
+            return {
+                "success": True,
+                "message": "No GitHub batch is open",
+                "files": []
+            }
+        batch, self.active_batch = self.active_batch, None
+        return {
+            "success": True,
+            "message": f"Discarded the GitHub batch with {len(batch.files)} files",
+            "files": list(batch.files)
+        }
+
+    def create_file(self, file_content: str, file_path: str) -> dict:
+        """
+        See create_github_file.
+        """
+        try:
+            if self.active_batch is not None:
+                self.active_batch.add_file(file_path, file_content)
+                return {
+                    "success": True,
+                    "message": "File added to the GitHub batch"
+                }
+            
+            repo = self.repo
+            
+            # Create the file
+            result = repo.create_file(
+                path=file_path,
+                message=f"Create {file_path}",
+                content=file_content,
+                branch=self.branch
+            )
+            # create_file moved the branch, so the cached head is stale
+            self.invalidate_head()
+            
+            return {
+                "success": True,
+                "message": "File created successfully",
+                "commit": {
+                    "sha": result["commit"].sha,
+                    "html_url": result["commit"].html_url
+                }
+            }
+        except Exception as e:
+            print(f"❌ Error creating GitHub file: {e}")
+            return {
+                "success": False,
+                "message": f"Failed to create file: {str(e)}"
+            }
+
+    def create_image(self, local_image_path: str, target_file_path: str) -> dict:
+        """
+        See create_github_image.
+        """
+        try:
+            # Convert to absolute path if relative
+            if not os.path.isabs(local_image_path):
+                script_dir = os.path.dirname(os.path.abspath(__file__))
+                local_image_path = os.path.join(script_dir, local_image_path)
+            
+            # Check if the file exists
+            if not os.path.exists(local_image_path):
+                error_msg = f"Local image file does not exist: {local_image_path}"
+                print(f"❌ Error creating GitHub image: {error_msg}")
+                return {
+                    "success": False,
+                    "message": error_msg
+                }
+            
+            # Check if it's a file (not a directory)
+            if not os.path.isfile(local_image_path):
+                error_msg = f"Path is not a file: {local_image_path}"
+                print(f"❌ Error creating GitHub image: {error_msg}")
+                return {
+                    "success": False,
+                    "message": error_msg
+                }
+            
+            if self.active_batch is not None:
+                self.active_batch.add_local_file(local_image_path, target_file_path)
+                return {
+                    "success": True,
+                    "message": "Image added to the GitHub batch"
+                }
+            
+            # Read the local image file in binary mode
+            with open(local_image_path, 'rb') as image_file:
+                image_binary = image_file.read()
+            
+            repo = self.repo
+            
+            # Create the file
+            result = repo.create_file(
+                path=target_file_path,
+                message=f"Create {target_file_path}",
+                content=image_binary,
+                branch=self.branch
+            )
+            # create_file moved the branch, so the cached head is stale
+            self.invalidate_head()
+            
+            return {
+                "success": True,
+                "message": "Image created successfully",
+                "commit": {
+                    "sha": result["commit"].sha,
+                    "html_url": result["commit"].html_url
+                }
+            }
+        except Exception as e:
+            print(f"❌ Error creating GitHub image: {e}")
+            return {
+                "success": False,
+                "message": f"Failed to create image: {str(e)}"
+            }
+
+    def upload_folder(self, local_folder_path: str, target_repo_path: str) -> dict:
+        """
+        See upload_folder_to_github.
+        """
+        try:
+            # Convert to pathlib.Path for easier handling
+            local_path = pathlib.Path(local_folder_path)
+            
+            if not local_path.exists():
+                return {
+                    "success": False,
+                    "message": f"Local folder does not exist: {local_folder_path}",
+                    "files_uploaded": 0,
+                    "files_updated": 0,
+                    "files_skipped": 0,
+                    "files_failed": 0,
+                    "failed_files": [],
+                    "commits": []
+                }
+            
+            if not local_path.is_dir():
+                return {
+                    "success": False,
+                    "message": f"Path is not a directory: {local_folder_path}",
+                    "files_uploaded": 0,
+                    "files_updated": 0,
+                    "files_skipped": 0,
+                    "files_failed": 0,
+                    "failed_files": [],
+                    "commits": []
+                }
+            
+            files_failed = 0
+            failed_files = []
+            batch = self.active_batch if self.active_batch is not None else self.batch(f"Upload {target_repo_path}")
+            batched_files = []
+            
+            # Recursively iterate through all files in the folder
+            for local_file_path in local_path.rglob('*'):
+                # Skip directories and hidden files
+                if local_file_path.is_dir() or local_file_path.name.startswith('.'):
+                    continue
+                
+                try:
+                    # Calculate the relative path from the local folder
+                    relative_path = local_file_path.relative_to(local_path)
+                    
+                    # Construct the target path in the repository
+                    target_file_path = str(pathlib.Path(target_repo_path) / relative_path).replace('\\', '/')
+                    
+                    batch.add_local_file(str(local_file_path.resolve()), target_file_path)
+                    batched_files.append((str(local_file_path), target_file_path))
+                    
+                except Exception as e:
+                    files_failed += 1
+                    failed_files.append(str(local_file_path))
+                    print(f"❌ Error reading {local_file_path}: {e}")
+            
+            if batch is self.active_batch:
+                return {
+                    "success": True,
+                    "message": f"Folder added to the GitHub batch: {len(batched_files)} files added, {files_failed} files failed",
+                    "files_uploaded": 0,
+                    "files_updated": 0,
+                    "files_skipped": 0,
+                    "files_failed": files_failed,
+                    "failed_files": failed_files,
+                    "commits": []
+                }
+            
+            if not batched_files:
+                return {
+                    "success": True,
+                    "message": f"Folder uploaded successfully: 0 files uploaded, {files_failed} files failed",
+                    "files_uploaded": 0,
+                    "files_updated": 0,
+                    "files_skipped": 0,
+                    "files_failed": files_failed,
+                    "failed_files": failed_files,
+                    "commits": []
+                }
+            
+            result = batch.commit()
+            if not result["success"]:
+                failed_targets = {item["path"] for item in result["results"] if item["status"] == "failed"}
+                if not failed_targets:
+                    # The commit itself failed, so none of the files were published
+                    failed_targets = {target_file_path for _, target_file_path in batched_files}
+                failed_files += [
+                    local_file for local_file, target_file_path in batched_files
+                    if target_file_path in failed_targets
+                ]
+                return {
+                    "success": False,
+                    "message": f"Failed to upload folder: {result['message']}",
+                    "files_uploaded": 0,
+                    "files_updated": 0,
+                    "files_skipped": 0,
+                    "files_failed": len(failed_files),
+                    "failed_files": failed_files,
+                    "commits": []
+                }
+            
+            for target_file_path in result["created"]:
+                print(f"✓ Uploaded: {target_file_path}")
+            for target_file_path in result["updated"]:
+                print(f"✓ Updated: {target_file_path}")
+            for target_file_path in result["skipped"]:
+                print(f"✓ Skipped (unchanged): {target_file_path}")
+            
+            return {
+                "success": True,
+                "message": (
+                    f"Folder uploaded successfully: {len(result['created'])} files uploaded, "
+                    f"{len(result['updated'])} files updated, {len(result['skipped'])} files skipped, "
+                    f"{files_failed} files failed"
+                ),
+                "files_uploaded": len(result["created"]),
+                "files_updated": len(result["updated"]),
+                "files_skipped": len(result["skipped"]),
+                "files_failed": files_failed,
+                "failed_files": failed_files,
+                "commits": [
+                    {**result["commit"], "file": target_file_path}
+                    for target_file_path in result["files"]
+                ]
+            }
+            
+        except Exception as e:
+            print(f"❌ Error uploading folder to GitHub: {e}")
+            return {
+                "success": False,
+                "message": f"Failed to upload folder: {str(e)}",
+                "files_uploaded": 0,
+                "files_updated": 0,
+                "files_skipped": 0,
+                "files_failed": 0,
+                "failed_files": [],
+                "commits": []
+            }
+
+
+publisher = GitHubPublisher()
+
+
+def start_github_batch(commit_message: str):
+    """
+    Starts collecting GitHub uploads into a single commit.
+    
+    While a batch is open, create_github_file, create_github_image and upload_folder_to_github
+    only add their files to the batch. Nothing is published until commit_github_batch is called,
+    which publishes every collected file in one commit on the configured branch (GITHUB_BRANCH).
+    
+    Args:
+        commit_message (str): The message of the commit created by commit_github_batch.
+    
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether the batch was started
+            - message (str): Success or error message
+    
+    Example:
+        >>> start_github_batch("Publish 2025-11-02-my-post")
+        {'success': True, 'message': 'GitHub batch started'}
+    """
+    return publisher.start_batch(commit_message)
+
+
+def commit_github_batch():
+    """
+    Publishes every file collected since start_github_batch in a single commit.
+    
+    Files whose content is already in the repository are skipped; if nothing changed, no
+    commit is created.
+    
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether the batch was published (or had nothing to change)
+            - message (str): Success or error message
+            - commit (dict | None): Commit sha and html_url, or None if nothing changed
+            - files (list): Repository paths of the committed files
+            - created (list): Paths of files that did not exist in the repository
+            - updated (list): Paths of existing files whose content changed
+            - skipped (list): Paths of files whose content was already in the repository
+            - results (list): Per-file report with path, status, attempts, blob_sha and error
+    
+    Example:
+        >>> commit_github_batch()
+        {'success': True, 'message': 'Committed 3 files (3 created, 0 updated, 0 skipped)', 'commit': {...}, ...}
+    
+    Note:
+        - The batch is closed whether or not the commit succeeds; on failure nothing is
+          published and the uploads can be retried in a new batch
+    """
+    return publisher.commit_batch()
+
+
+def discard_github_batch():
+    """
+    Drops the open GitHub batch without publishing any of its files.
+    
+    Use it to recover from a batch left open by an interrupted run, which would otherwise make
+    every start_github_batch fail. Nothing has been written to the branch for a batch that was
+    not committed, so discarding it leaves the repository unchanged.
+    
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Always True; discarding when no batch is open is not an error
+            - message (str): What was discarded
+            - files (list): Repository paths of the files that were in the batch
+    
+    Example:
+        >>> discard_github_batch()
+        {'success': True, 'message': 'Discarded the GitHub batch with 3 files', 'files': [...]}
+    """
+    return publisher.discard_batch()
 
 
 def create_github_file(file_content: str, file_path: str):
@@ -16,8 +840,8 @@ def create_github_file(file_content: str, file_path: str):
     Creates a new file in the GitHub repository.
     
     This function uses the PyGithub library to create a new file in the
-    GitHub repository at https://github.com/hh54188/horace-jekyll-theme-v1.2.0
-    on the master branch.
+    configured GitHub repository and branch (GITHUB_REPO and GITHUB_BRANCH, by
+    default hh54188/horace-jekyll-theme-v1.2.0 on master).
     
     Args:
         file_content (str): The content to write to the file.
@@ -36,44 +860,21 @@ def create_github_file(file_content: str, file_path: str):
     
     Note:
         - Requires GITHUB_API_KEY environment variable to be set
+        - The repository and branch can be changed with GITHUB_REPO and GITHUB_BRANCH
         - Folders are created automatically if they don't exist
-        - The file will be committed to the master branch
+        - The file will be committed to the configured branch
+        - While a batch is open (see start_github_batch), the file is only added to the batch
     """
-    try:
-        # Get the repository
-        repo = g.get_repo("hh54188/horace-jekyll-theme-v1.2.0")
-        
-        # Create the file
-        result = repo.create_file(
-            path=file_path,
-            message=f"Create {file_path}",
-            content=file_content,
-            branch="master"
-        )
-        
-        return {
-            "success": True,
-            "message": "File created successfully",
-            "commit": {
-                "sha": result["commit"].sha,
-                "html_url": result["commit"].html_url
-            }
-        }
-    except Exception as e:
-        print(f"❌ Error creating GitHub file: {e}")
-        return {
-            "success": False,
-            "message": f"Failed to create file: {str(e)}"
-        }
+    return publisher.create_file(file_content, file_path)
 
 
 def create_github_image(local_image_path: str, target_file_path: str):
     """
     Uploads an image file from local filesystem to the GitHub repository.
     
-    This function reads a local image file, encodes it to base64, and uploads it
-    to the GitHub repository at https://github.com/hh54188/horace-jekyll-theme-v1.2.0
-    on the master branch.
+    This function reads a local image file and uploads it to the configured GitHub
+    repository and branch (GITHUB_REPO and GITHUB_BRANCH, by default
+    hh54188/horace-jekyll-theme-v1.2.0 on master).
     
     Args:
         local_image_path (str): The local file path to the image to upload.
@@ -93,75 +894,25 @@ def create_github_image(local_image_path: str, target_file_path: str):
     
     Note:
         - Requires GITHUB_API_KEY environment variable to be set
+        - The repository and branch can be changed with GITHUB_REPO and GITHUB_BRANCH
         - Requires the local image file to exist
         - Folders are created automatically if they don't exist
-        - The image will be committed to the master branch
+        - The image will be committed to the configured branch
+        - While a batch is open (see start_github_batch), the image is only added to the batch
     """
-    try:
-        # Convert to absolute path if relative
-        if not os.path.isabs(local_image_path):
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            local_image_path = os.path.join(script_dir, local_image_path)
-        
-        # Check if the file exists
-        if not os.path.exists(local_image_path):
-            error_msg = f"Local image file does not exist: {local_image_path}"
-            print(f"❌ Error creating GitHub image: {error_msg}")
-            return {
-                "success": False,
-                "message": error_msg
-            }
-        
-        # Check if it's a file (not a directory)
-        if not os.path.isfile(local_image_path):
-            error_msg = f"Path is not a file: {local_image_path}"
-            print(f"❌ Error creating GitHub image: {error_msg}")
-            return {
-                "success": False,
-                "message": error_msg
-            }
-        
-        # Read the local image file in binary mode
-        with open(local_image_path, 'rb') as image_file:
-            image_binary = image_file.read()
-        
-        # Encode the binary image to base64
-        image_base64 = base64.b64encode(image_binary).decode('utf-8')
-        
-        # Get the repository
-        repo = g.get_repo("hh54188/horace-jekyll-theme-v1.2.0")
-        
-        # Create the file
-        result = repo.create_file(
-            path=target_file_path,
-            message=f"Create {target_file_path}",
-            content=image_base64,
-            branch="master"
-        )
-        
-        return {
-            "success": True,
-            "message": "Image created successfully",
-            "commit": {
-                "sha": result["commit"].sha,
-                "html_url": result["commit"].html_url
-            }
-        }
-    except Exception as e:
-        print(f"❌ Error creating GitHub image: {e}")
-        return {
-            "success": False,
-            "message": f"Failed to create image: {str(e)}"
-        }
+    return publisher.create_image(local_image_path, target_file_path)
 
 
 def upload_folder_to_github(local_folder_path: str, target_repo_path: str):
     """
     Uploads all files from a local folder to the GitHub repository.
     
-    This function recursively reads all files from a local folder, encodes them to base64,
-    and uploads them to the GitHub repository at https://github.com/hh54188/horace-jekyll-theme-v1.2.0
-    on the master branch. The folder structure is preserved in the repository.
+    This function recursively reads all files from a local folder and uploads them to the
+    configured GitHub repository and branch (GITHUB_REPO and GITHUB_BRANCH) in a single
+    commit (see GitHubBatch). The folder structure is preserved in the repository. Files
+    whose content is already in the repository are skipped, and existing files whose
+    content changed are updated, so re-publishing an edited post only moves the changed
+    bytes.
     
     Args:
         local_folder_path (str): The local file path to the folder to upload (e.g., "./local/blog").
@@ -172,10 +923,12 @@ def upload_folder_to_github(local_folder_path: str, target_repo_path: str):
         dict: A dictionary containing success status and result information.
             - success (bool): Whether the operation was successful
             - message (str): Success or error message
-            - files_uploaded (int): Number of files successfully uploaded
+            - files_uploaded (int): Number of new files uploaded
+            - files_updated (int): Number of existing files whose content was updated
+            - files_skipped (int): Number of files skipped because they are unchanged
             - files_failed (int): Number of files that failed to upload
             - failed_files (list): List of file paths that failed to upload
-            - commits (list): List of commit information for successfully uploaded files
+            - commits (list): Commit information for each uploaded or updated file (all files share one commit)
     
     Example:
         >>> result = upload_folder_to_github("./local/blog", "blog")
@@ -184,103 +937,13 @@ def upload_folder_to_github(local_folder_path: str, target_repo_path: str):
     
     Note:
         - Requires GITHUB_API_KEY environment variable to be set
+        - The repository and branch can be changed with GITHUB_REPO and GITHUB_BRANCH
         - Requires the local folder to exist
         - Folders are created automatically if they don't exist
-        - All files will be committed to the master branch
+        - All files will be committed to the configured branch
         - Ignores hidden files and directories (starting with .)
-        - Uses a single commit per file upload
+        - Uses a single commit for the whole folder; if the commit fails, nothing is uploaded
+        - Files are read, hashed and uploaded in parallel (see GitHubBatch)
+        - While a batch is open (see start_github_batch), the files are only added to the batch
     """
-    try:
-        # Get the repository
-        repo = g.get_repo("hh54188/horace-jekyll-theme-v1.2.0")
-        
-        # Convert to pathlib.Path for easier handling
-        local_path = pathlib.Path(local_folder_path)
-        
-        if not local_path.exists():
-            return {
-                "success": False,
-                "message": f"Local folder does not exist: {local_folder_path}",
-                "files_uploaded": 0,
-                "files_failed": 0,
-                "failed_files": [],
-                "commits": []
-            }
-        
-        if not local_path.is_dir():
-            return {
-                "success": False,
-                "message": f"Path is not a directory: {local_folder_path}",
-                "files_uploaded": 0,
-                "files_failed": 0,
-                "failed_files": [],
-                "commits": []
-            }
-        
-        files_uploaded = 0
-        files_failed = 0
-        failed_files = []
-        commits = []
-        
-        # Recursively iterate through all files in the folder
-        for local_file_path in local_path.rglob('*'):
-            # Skip directories and hidden files
-            if local_file_path.is_dir() or local_file_path.name.startswith('.'):
-                continue
-            
-            try:
-                # Read the file in binary mode
-                with open(local_file_path, 'rb') as file:
-                    file_binary = file.read()
-                
-                # Encode the binary file to base64
-                file_base64 = base64.b64encode(file_binary).decode('utf-8')
-                
-                # Calculate the relative path from the local folder
-                relative_path = local_file_path.relative_to(local_path)
-                
-                # Construct the target path in the repository
-                target_file_path = str(pathlib.Path(target_repo_path) / relative_path).replace('\\', '/')
-                
-                # Create the file
-                result = repo.create_file(
-                    path=target_file_path,
-                    message=f"Upload {target_file_path}",
-                    content=file_base64,
-                    branch="master"
-                )
-                
-                files_uploaded += 1
-                commits.append({
-                    "sha": result["commit"].sha,
-                    "html_url": result["commit"].html_url,
-                    "file": target_file_path
-                })
-                
-                print(f"✓ Uploaded: {target_file_path}")
-                
-            except Exception as e:
-                files_failed += 1
-                failed_files.append(str(local_file_path))
-                print(f"❌ Error uploading {local_file_path}: {e}")
-        
-        return {
-            "success": True,
-            "message": f"Folder uploaded successfully: {files_uploaded} files uploaded, {files_failed} files failed",
-            "files_uploaded": files_uploaded,
-            "files_failed": files_failed,
-            "failed_files": failed_files,
-            "commits": commits
-        }
-        
-    except Exception as e:
-        print(f"❌ Error uploading folder to GitHub: {e}")
-        return {
-            "success": False,
-            "message": f"Failed to upload folder: {str(e)}",
-            "files_uploaded": 0,
-            "files_failed": 0,
-            "failed_files": [],
-            "commits": []
-        }
-
+    return publisher.upload_folder(local_folder_path, target_repo_path)
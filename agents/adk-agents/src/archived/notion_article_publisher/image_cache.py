@@ -0,0 +1,208 @@
+import os
+import time
+import shutil
+import hashlib
+import sqlite3
+from urllib.parse import urlparse, parse_qsl
+
+from .sqlite_cache import SqliteLruCache
+
+
+# Query parameters that sign a Notion-hosted file URL and change on every fetch
+SIGNED_URL_PARAMETERS = ("x-amz-", "signature", "expirationtimestamp")
+
+
+def image_source_key(image_url: str) -> str:
+    """
+    Returns a key that identifies the image behind a URL across fetches.
+
+    Notion-hosted files are served from signed URLs whose query string changes every time
+    the page is fetched, while the path (which contains the ID of the uploaded file) stays
+    the same until the image in the block is replaced. Signed URLs are therefore keyed by
+    host and path only; any other URL is keyed by the URL itself.
+    """
+    parsed = urlparse(image_url)
+    query_names = [name.lower() for name, _ in parse_qsl(parsed.query)]
+    if any(name.startswith(SIGNED_URL_PARAMETERS) for name in query_names):
+        return f"{parsed.netloc}{parsed.path}"
+    return image_url
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file, read in 1 MB chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source_path: str, target_path: str):
+    """
+    Hard-links source_path to target_path, copying when hard links are not possible.
+
+    An existing target is removed first, so writing to the target later can never
+    modify the source through a shared inode.
+    """
+    if os.path.lexists(target_path):
+        os.remove(target_path)
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copyfile(source_path, target_path)
+
+
+class ImageCache(SqliteLruCache):
+    """
+    Content-addressed on-disk store of downloaded images, shared by every post.
+
+    Image files are stored once under their SHA-256 hash, and an SQLite index maps the
+    source key of each image URL (see `image_source_key`) to that hash. Images that were
+    already downloaded, or that appear in several posts, are hard-linked (or copied) into
+    the post's image folder instead of being downloaded again. The store is bounded by the
+    total size of the stored files; the least recently used files are evicted first.
+
+    Args:
+        path (str): Folder of the store. It is created on first use.
+        max_bytes (int): Maximum total size of the stored files, in bytes.
+
+    Example:
+        >>> cache = ImageCache("./.cache/images", max_bytes=512 * 1024 * 1024)
+        >>> cache.put(image_source_key(url), "./blog/images/post/cover.png")
+        '9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08'
+        >>> cache.link(image_source_key(url), "./blog/images/other-post/cover")
+        './blog/images/other-post/cover.png'
+        >>> cache.stats()
+        {'hits': 1, 'misses': 0, 'hit_rate': 1.0, 'bytes_saved': 48213, 'entries': 1, 'size_bytes': 48213, 'max_bytes': 536870912}
+    """
+
+    table = "objects"
+    key_columns = ("sha256",)
+    columns = "sha256 TEXT NOT NULL, extension TEXT NOT NULL"
+
+    def __init__(self, path: str, max_bytes: int):
+        super().__init__(path, max_bytes)
+        self.bytes_saved = 0
+
+    def _database_path(self) -> str:
+        return os.path.join(self.path, "index.sqlite3")
+
+    def _create_tables(self, connection: sqlite3.Connection):
+        super()._create_tables(connection)
+        os.makedirs(os.path.join(self.path, "objects"), exist_ok=True)
+        connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sources (
+                source_key TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sources_sha256 ON sources (sha256);
+            """
+        )
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.path, "objects", sha256[:2], sha256)
+
+    def _delete(self, connection: sqlite3.Connection, keys: list[tuple]):
+        super()._delete(connection, keys)
+        connection.executemany("DELETE FROM sources WHERE sha256 = ?", keys)
+        for (sha256,) in keys:
+            try:
+                os.remove(self._object_path(sha256))
+            except FileNotFoundError:
+                pass
+
+    def link(self, source_key: str, target_path: str) -> str | None:
+        """
+        Places the cached image for a source key at target_path, or returns None on a miss.
+
+        If target_path has no extension, the extension of the cached image is appended.
+        Returns the path the image was placed at.
+        """
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT objects.sha256, objects.extension, objects.size FROM sources "
+            "JOIN objects ON objects.sha256 = sources.sha256 WHERE sources.source_key = ?",
+            (source_key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        sha256, extension, size = row
+        object_path = self._object_path(sha256)
+        if not os.path.isfile(object_path) or os.path.getsize(object_path) != size:
+            # The stored file is missing or was modified, so it can't be trusted anymore
+            self._delete(connection, [(sha256,)])
+            connection.commit()
+            self.misses += 1
+            return None
+
+        if not os.path.splitext(target_path)[1]:
+            target_path = f"{target_path}{extension}"
+        os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok=True)
+        _link_or_copy(object_path, target_path)
+
+        self._touch(connection, (sha256,))
+        connection.commit()
+        self.hits += 1
+        self.bytes_saved += size
+        return target_path
+
+    def put(self, source_key: str, file_path: str) -> str:
+        """
+        Stores a downloaded image under its SHA-256 hash and indexes it by source key.
+
+        Returns the hash. Files that are already stored (for example the same image
+        uploaded to several posts) are kept only once.
+        """
+        sha256 = hash_file(file_path)
+        size = os.path.getsize(file_path)
+        if size > self.max_bytes:
+            return sha256
+
+        connection = self._connect()
+        object_path = self._object_path(sha256)
+        if not os.path.isfile(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            # Copy through a temporary file so a crash never leaves a partial object behind
+            temporary_path = f"{object_path}.tmp"
+            shutil.copyfile(file_path, temporary_path)
+            os.replace(temporary_path, object_path)
+
+        connection.execute(
+            "INSERT OR REPLACE INTO objects (sha256, extension, size, accessed_at) VALUES (?, ?, ?, ?)",
+            (sha256, os.path.splitext(file_path)[1].lower(), size, time.time())
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO sources (source_key, sha256) VALUES (?, ?)",
+            (source_key, sha256)
+        )
+        self._evict(connection)
+        connection.commit()
+        return sha256
+
+    def clear(self):
+        """
+        Removes every stored image and resets the statistics.
+        """
+        super().clear()
+        self.bytes_saved = 0
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters, the bytes not downloaded thanks to the cache, and its size.
+        """
+        stats = super().stats()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "entries": stats["entries"],
+            "size_bytes": stats["size_bytes"],
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,231 @@
+import os
+import asyncio
+import dotenv
+dotenv.load_dotenv()
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .image_cache import ImageCache, hash_file
+
+# Pillow is only needed when image optimization is enabled
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+# Set IMAGE_OPTIMIZE=1 to resize and re-encode downloaded images before they are published
+IMAGE_OPTIMIZE = os.getenv("IMAGE_OPTIMIZE", "0").lower() in ("1", "true", "yes")
+IMAGE_MAX_WIDTH = int(os.getenv("IMAGE_MAX_WIDTH", "1600"))
+# One of webp, avif or jpeg (AVIF needs a Pillow build with AVIF support)
+IMAGE_OUTPUT_FORMAT = os.getenv("IMAGE_OUTPUT_FORMAT", "webp").lower()
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+IMAGE_OPTIMIZE_WORKERS = int(os.getenv("IMAGE_OPTIMIZE_WORKERS", str(os.cpu_count() or 1)))
+
+OUTPUT_FORMATS = {
+    'webp': ('WEBP', '.webp'),
+    'avif': ('AVIF', '.avif'),
+    'jpeg': ('JPEG', '.jpg'),
+    'jpg': ('JPEG', '.jpg')
+}
+# Optimized images are kept in their own store, so they neither count towards the hit rate
+# of the download cache nor take up its space
+optimized_image_cache = ImageCache(
+    path=os.getenv(
+        "IMAGE_OPTIMIZE_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "optimized_images")
+    ),
+    max_bytes=int(os.getenv("IMAGE_OPTIMIZE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+)
+
+# Animated GIFs, SVGs and icons are published as they are
+OPTIMIZABLE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.avif']
+
+
+def _optimize_file(source_path: str, output_path: str, max_width: int, output_format: str, quality: int) -> bool:
+    """
+    Resizes and re-encodes one image in a worker process, without any metadata.
+
+    Returns False (and writes nothing) when the result would not be smaller than the source.
+    """
+    pil_format, _ = OUTPUT_FORMATS[output_format]
+    with Image.open(source_path) as image:
+        # Apply the EXIF orientation before the metadata is dropped
+        image = ImageOps.exif_transpose(image)
+        resized = image.width > max_width
+        if resized:
+            image = image.resize(
+                (max_width, max(1, round(image.height * max_width / image.width))),
+                Image.Resampling.LANCZOS
+            )
+
+        if pil_format == 'JPEG':
+            if image.mode in ('RGBA', 'LA', 'P'):
+                # JPEG has no transparency, so flatten onto a white background
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+            image.save(output_path, pil_format, quality=quality, optimize=True, progressive=True)
+        else:
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+            image.save(output_path, pil_format, quality=quality)
+
+    if not resized and os.path.getsize(output_path) >= os.path.getsize(source_path):
+        os.remove(output_path)
+        return False
+    return True
+
+
+async def optimize_images(
+    file_paths: list[str],
+    cache: ImageCache | None = optimized_image_cache,
+    max_width: int = IMAGE_MAX_WIDTH,
+    output_format: str = IMAGE_OUTPUT_FORMAT,
+    quality: int = IMAGE_QUALITY,
+    max_workers: int = IMAGE_OPTIMIZE_WORKERS
+) -> dict:
+    """
+    Resizes downloaded images to a maximum width and re-encodes them, in place.
+
+    Images wider than max_width are scaled down, then every image is re-encoded as WebP,
+    AVIF or optimized JPEG with its metadata stripped. The work runs in a process pool
+    across all cores. An image is replaced by its optimized version (whose extension may
+    differ, e.g. `cover.png` becomes `cover.webp`) only if that version is smaller or was
+    resized. Results are stored in a cache of optimized images (separate from the download
+    cache) keyed by the SHA-256 of the source file and the settings, so an image is only
+    optimized once.
+
+    Args:
+        file_paths (list[str]): Paths of the downloaded images.
+        cache (ImageCache | None): Cache for optimized images, or None to always optimize.
+            Defaults to `optimized_image_cache`.
+        max_width (int): Maximum width in pixels.
+        output_format (str): One of webp, avif or jpeg.
+        quality (int): Encoder quality from 1 to 100.
+        max_workers (int): Number of worker processes.
+
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether every image could be processed
+            - message (str): Summary including the bytes saved
+            - files (dict): Maps every input path to the path of the image to publish
+            - images (list): Per-image report with source_path, file_path, original_bytes,
+              optimized_bytes, cached and error
+            - bytes_before (int): Total size of the input images
+            - bytes_after (int): Total size of the images to publish
+            - bytes_saved (int): bytes_before minus bytes_after
+            - cache (dict | None): Statistics of the optimized image cache, or None without one
+
+    Example:
+        >>> result = await optimize_images(["blog/images/my-post/cover.png"])
+        >>> result["files"]
+        {'blog/images/my-post/cover.png': 'blog/images/my-post/cover.webp'}
+        >>> result["bytes_saved"]
+        2315841
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported image output format: {output_format}")
+    _, output_extension = OUTPUT_FORMATS[output_format]
+    settings = f"{output_format}:{max_width}:{quality}"
+
+    reports = []
+    pending = []
+    for source_path in file_paths:
+        report = {
+            "source_path": source_path,
+            "file_path": source_path,
+            "original_bytes": os.path.getsize(source_path),
+            "optimized_bytes": os.path.getsize(source_path),
+            "cached": False,
+            "error": None
+        }
+        reports.append(report)
+        if Image is None or os.path.splitext(source_path)[1].lower() not in OPTIMIZABLE_EXTENSIONS:
+            continue
+
+        # Reuse an earlier result for the same source image and settings
+        report["cache_key"] = f"{hash_file(source_path)}:{settings}"
+        base_path = os.path.splitext(source_path)[0]
+        file_path = cache.link(report["cache_key"], base_path) if cache is not None else None
+        if file_path is not None:
+            if file_path != source_path:
+                os.remove(source_path)
+            report["file_path"] = file_path
+            report["optimized_bytes"] = os.path.getsize(file_path)
+            report["cached"] = True
+        else:
+            pending.append(report)
+
+    if Image is None and file_paths:
+        print("⚠️ Pillow is not installed, images are published without optimization")
+
+    if pending:
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            outcomes = await asyncio.gather(*(
+                loop.run_in_executor(
+                    executor,
+                    _optimize_file,
+                    report["source_path"],
+                    f"{os.path.splitext(report['source_path'])[0]}.optimized{output_extension}",
+                    max_width,
+                    output_format,
+                    quality
+                )
+                for report in pending
+            ), return_exceptions=True)
+
+        for report, outcome in zip(pending, outcomes):
+            source_path = report["source_path"]
+            if isinstance(outcome, BaseException):
+                report["error"] = str(outcome)
+                try:
+                    os.remove(f"{os.path.splitext(source_path)[0]}.optimized{output_extension}")
+                except FileNotFoundError:
+                    pass
+                print(f"❌ Error optimizing {source_path}: {outcome}")
+                continue
+
+            if outcome:
+                # os.replace swaps the directory entry, so a hard-linked cache object is untouched
+                file_path = f"{os.path.splitext(source_path)[0]}{output_extension}"
+                os.replace(f"{os.path.splitext(source_path)[0]}.optimized{output_extension}", file_path)
+                if file_path != source_path:
+                    os.remove(source_path)
+                report["file_path"] = file_path
+                report["optimized_bytes"] = os.path.getsize(file_path)
+
+            if cache is not None:
+                try:
+                    cache.put(report["cache_key"], report["file_path"])
+                except Exception as e:
+                    print(f"⚠️ Could not add optimized image to the cache: {e}")
+
+    for report in reports:
+        report.pop("cache_key", None)
+
+    bytes_before = sum(report["original_bytes"] for report in reports)
+    bytes_after = sum(report["optimized_bytes"] for report in reports)
+    bytes_saved = bytes_before - bytes_after
+    failed = [report for report in reports if report["error"]]
+    percent = f" ({bytes_saved / bytes_before:.0%})" if bytes_before else ""
+    message = (
+        f"Optimized {len(reports) - len(failed)} images, saved {bytes_saved / 1024:.1f} KB{percent}"
+        + (f", {len(failed)} failed" if failed else "")
+    )
+    print(f"{'❌' if failed else '✓'} {message}")
+
+    return {
+        "success": not failed,
+        "message": message,
+        "files": {report["source_path"]: report["file_path"] for report in reports},
+        "images": reports,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_saved,
+        "cache": cache.stats() if cache is not None else None
+    }
@@ -1,12 +1,36 @@
 import os
+import sys
+import asyncio
+import contextlib
 import dotenv
 dotenv.load_dotenv()
 
 from notion_client import AsyncClient
-from typing import TypedDict
+from typing import AsyncIterator, TextIO, TypedDict
+
+from .block_cache import BlockCache
+from .block_renderer import RenderContext, convert_rich_text_to_markdown, render_block
 
 notion = AsyncClient(auth=os.getenv("NOTION_API_KEY"))
 
+# Maximum number of `blocks.children.list` requests in flight at once
+NOTION_MAX_CONCURRENCY = int(os.getenv("NOTION_MAX_CONCURRENCY", "8"))
+
+# Set NOTION_BLOCK_CACHE=1 to reuse cached subtrees of the top-level blocks. Notion does not
+# bump a block's last_edited_time when a block nested below it is edited, so a cached subtree
+# can hide such edits; the cache is therefore off by default
+NOTION_BLOCK_CACHE = os.getenv("NOTION_BLOCK_CACHE", "0").lower() in ("1", "true", "yes")
+
+block_cache = BlockCache(
+    path=os.getenv(
+        "NOTION_BLOCK_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "notion_blocks.sqlite3")
+    ),
+    max_bytes=int(os.getenv("NOTION_BLOCK_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+)
+# Cache used by fetch_block_tree and stream_markdown unless another one is passed
+default_block_cache = block_cache if NOTION_BLOCK_CACHE else None
+
 
 class BlockTextMap(TypedDict):
     id: str
@@ -79,44 +103,162 @@ async def validate_page_exist(page_id: str) -> bool:
         return False
 
 
-async def extract_text_with_block_id(block_id: str) -> list[BlockTextMap]:
+async def iter_block_children(block_id: str, semaphore: asyncio.Semaphore | None = None):
     """
-    Recursively extracts text content from a Notion block and all its children blocks.
+    Iterates over the children of a Notion block one page at a time.
     
-    This function retrieves all text content from various Notion block types including 
-    paragraphs, headings (h1, h2, h3), bulleted lists, numbered lists, and quotes. 
-    It automatically traverses nested blocks recursively to capture all content in 
-    the hierarchy.
+    This async generator follows `next_cursor` until `has_more` is false, yielding each
+    page of blocks as soon as it arrives so callers can start processing it while the
+    next page is still being fetched.
     
     Args:
-        block_id (str): The ID of the Notion block or page to extract text from.
-            This can be either a page ID or a specific block ID.
+        block_id (str): The ID of the Notion block or page whose children should be listed.
+        semaphore (asyncio.Semaphore | None): Optional semaphore held around each API request,
+            used to share a concurrency limit with other requests.
+    
+    Yields:
+        list[dict]: A page of up to 100 child blocks, in document order.
+    
+    Example:
+        >>> async for page in iter_block_children("2270cda410a68005b731fec98ea8500a"):
+        ...     print(len(page))
+        100
+        37
+    """
+    start_cursor = None
+    while True:
+        request = {"block_id": block_id, "page_size": 100}
+        if start_cursor:
+            request["start_cursor"] = start_cursor
+        
+        async with semaphore or contextlib.nullcontext():
+            blockResult = await notion.blocks.children.list(**request)
+        
+        yield blockResult.get("results")
+        
+        if not blockResult.get("has_more") or not blockResult.get("next_cursor"):
+            break
+        start_cursor = blockResult.get("next_cursor")
+
+
+def _start_subtree_fetch(
+    block: dict,
+    semaphore: asyncio.Semaphore,
+    cache: BlockCache | None
+) -> asyncio.Task | None:
+    """
+    Attaches the cached subtree of a block, or starts a task fetching it.
+    
+    Returns None when the block has no children or its subtree was found in the cache.
+    """
+    if not block.get("has_children"):
+        return None
+    if cache is not None:
+        cached_children = cache.get(block.get("id"), block.get("last_edited_time"))
+        if cached_children is not None:
+            block["children"] = cached_children
+            return None
+    return asyncio.create_task(_fetch_children(block.get("id"), semaphore))
+
+
+def _attach_subtree(block: dict, children: list[dict], cache: BlockCache | None):
+    """
+    Attaches a fetched subtree to its block and stores it in the cache.
+    """
+    block["children"] = children
+    if cache is not None:
+        cache.put(block.get("id"), block.get("last_edited_time"), children)
+
+
+async def _fetch_children(
+    block_id: str,
+    semaphore: asyncio.Semaphore,
+    cache: BlockCache | None = None
+) -> list[dict]:
+    """
+    Fetches all children of a block and, concurrently, the subtrees of every child that has children.
+    
+    Subtree requests are started as soon as the page containing their parent arrives, so they
+    overlap with fetching the remaining pages. The semaphore is only held around the API
+    requests themselves, so a parent waiting for its children never blocks the requests it is
+    waiting on. When a cache is given, the subtrees of the direct children are looked up in and
+    stored to it; nested levels are covered by the cached subtree of their top-level ancestor.
+    """
+    blocks: list[dict] = []
+    subtree_tasks: list[tuple[dict, asyncio.Task]] = []
+    try:
+        async for page in iter_block_children(block_id, semaphore):
+            for block in page:
+                task = _start_subtree_fetch(block, semaphore, cache)
+                if task is not None:
+                    subtree_tasks.append((block, task))
+            blocks.extend(page)
+        
+        subtrees = await asyncio.gather(*(task for _, task in subtree_tasks))
+    except BaseException:
+        for _, task in subtree_tasks:
+            task.cancel()
+        raise
+    
+    for (block, _), children in zip(subtree_tasks, subtrees):
+        _attach_subtree(block, children, cache)
+    
+    return blocks
+
+
+async def fetch_block_tree(
+    block_id: str,
+    max_concurrency: int = NOTION_MAX_CONCURRENCY,
+    cache: BlockCache | None = default_block_cache
+) -> list[dict]:
+    """
+    Fetches the whole block tree under a Notion block or page.
+    
+    Sibling subtrees are fetched concurrently through the shared AsyncClient, so the number
+    of sequential API round trips grows with the depth of the tree instead of the number of
+    nested blocks. The returned blocks keep their original order, and every block with
+    `has_children` gets its fetched child blocks attached under the `children` key.
+    
+    When a block cache is given, the children of `block_id` are still listed, but the subtree
+    of each of them is reused from the cache while its `last_edited_time` is unchanged, so
+    re-converting an edited article only downloads the subtrees that changed.
+    
+    Args:
+        block_id (str): The ID of the Notion block or page to fetch.
+        max_concurrency (int): Maximum number of Notion API requests in flight at once.
+            Defaults to the NOTION_MAX_CONCURRENCY environment variable (8).
+        cache (BlockCache | None): Cache used for the subtrees of the top-level blocks.
+            Defaults to the module block cache when NOTION_BLOCK_CACHE is set, and to None
+            (always fetch everything) otherwise.
     
     Returns:
-        list[BlockTextMap]: A list of dictionaries, each containing:
-            - id (str): The unique identifier of the block
-            - text (str): The plain text content extracted from the block
+        list[dict]: The child blocks of `block_id`, with nested children attached.
     
     Example:
-        >>> blocks = await extract_text_with_block_id("2270cda410a68005b731fec98ea8500a")
-        >>> print(blocks)
-        [
-            {"id": "abc123", "text": "This is a paragraph"},
-            {"id": "def456", "text": "This is a heading"}
-        ]
+        >>> blocks = await fetch_block_tree("2270cda410a68005b731fec98ea8500a", max_concurrency=4, cache=block_cache)
+        >>> blocks[0]["type"]
+        'toggle'
+        >>> blocks[0]["children"][0]["type"]
+        'paragraph'
+        >>> block_cache.stats()
+        {'hits': 0, 'misses': 1, 'entries': 1, 'size_bytes': 1532, 'max_bytes': 67108864}
     
     Note:
-        - Empty blocks (blocks with no text content) are skipped
-        - Only text content is extracted; formatting and other properties are ignored
-        - The function processes up to 100 blocks per level (Notion API limit)
-        - Nested blocks are automatically included in the result
+        - Notion only bumps `last_edited_time` on the block that was edited, not on its
+          ancestors, so an edit nested below a top-level block is missed while its subtree is
+          cached. Only enable the cache for articles whose nested blocks are not edited
+        - Cached subtrees containing Notion-hosted files expire with their signed URLs
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    return await _fetch_children(block_id, semaphore, cache)
+
+
+def _extract_text_from_blocks(blocks: list[dict], block_text_list: list[BlockTextMap]):
+    """
+    Appends the plain text of each block in a fetched block tree to block_text_list, depth first.
     """
-    block_text_list: list[BlockTextMap] = []
-    blockResult = await notion.blocks.children.list(
-        block_id=block_id,
-        page_size=100
-    )
-    blocks = blockResult.get("results")
     for block in blocks:
         text_to_review = ""
         
@@ -141,74 +283,47 @@ async def extract_text_with_block_id(block_id: str) -> list[BlockTextMap]:
                 "text": text_to_review
             })
         
-        if block.get("has_children"):
-            block_text_list.extend(await extract_text_with_block_id(block.get("id")))
-
-    return block_text_list
+        if block.get("children"):
+            _extract_text_from_blocks(block.get("children"), block_text_list)
 
 
-def convert_rich_text_to_markdown(rich_text_list: list) -> str:
+async def extract_text_with_block_id(block_id: str) -> list[BlockTextMap]:
     """
-    Converts Notion rich text objects to markdown with proper formatting.
+    Recursively extracts text content from a Notion block and all its children blocks.
     
-    This function processes rich text annotations (bold, italic, code, strikethrough, underline)
-    and links, converting them to proper markdown syntax.
+    This function retrieves all text content from various Notion block types including 
+    paragraphs, headings (h1, h2, h3), bulleted lists, numbered lists, and quotes. 
+    It automatically traverses nested blocks recursively to capture all content in 
+    the hierarchy.
     
     Args:
-        rich_text_list: List of rich text objects from Notion API
-        
+        block_id (str): The ID of the Notion block or page to extract text from.
+            This can be either a page ID or a specific block ID.
+    
     Returns:
-        str: Markdown formatted text
-        
+        list[BlockTextMap]: A list of dictionaries, each containing:
+            - id (str): The unique identifier of the block
+            - text (str): The plain text content extracted from the block
+    
     Example:
-        >>> rich_text = [
-        ...     {"plain_text": "Hello", "annotations": {"bold": True}},
-        ...     {"plain_text": " world", "annotations": {"italic": True}},
-        ...     {"plain_text": "!", "annotations": {}, "href": "https://example.com"}
-        ... ]
-        >>> convert_rich_text_to_markdown(rich_text)
-        '**Hello** *world*[!](https://example.com)'
-    """
-    markdown_parts = []
-    for rt in rich_text_list:
-        text = rt.get("plain_text", "")
-        if not text:
-            continue
-            
-        annotations = rt.get("annotations", {})
-        href = rt.get("href")
-        
-        # Apply formatting in order: code, bold, italic, strikethrough, underline
-        # Note: Code formatting prevents other formatting, so handle separately
-        if annotations.get("code"):
-            text = f"`{text}`"
-        else:
-            # Handle bold and italic together for nested formatting
-            is_bold = annotations.get("bold", False)
-            is_italic = annotations.get("italic", False)
-            
-            # Combine bold and italic if both are present
-            if is_bold and is_italic:
-                text = f"***{text}***"
-            elif is_bold:
-                text = f"**{text}**"
-            elif is_italic:
-                text = f"*{text}*"
-            
-            if annotations.get("strikethrough"):
-                text = f"~~{text}~~"
-            if annotations.get("underline"):
-                # Markdown doesn't support underline, but HTML does
-                # We'll use HTML as a fallback
-                text = f"<u>{text}</u>"
-        
-        # Apply link if present (wraps the formatted text)
-        if href:
-            text = f"[{text}]({href})"
-            
-        markdown_parts.append(text)
+        >>> blocks = await extract_text_with_block_id("2270cda410a68005b731fec98ea8500a")
+        >>> print(blocks)
+        [
+            {"id": "abc123", "text": "This is a paragraph"},
+            {"id": "def456", "text": "This is a heading"}
+        ]
     
-    return "".join(markdown_parts)
+    Note:
+        - Empty blocks (blocks with no text content) are skipped
+        - Only text content is extracted; formatting and other properties are ignored
+        - All children are fetched, following the Notion API pagination cursor
+        - Nested blocks are automatically included in the result
+        - Sibling subtrees are fetched concurrently (see fetch_block_tree)
+    """
+    block_text_list: list[BlockTextMap] = []
+    blocks = await fetch_block_tree(block_id)
+    _extract_text_from_blocks(blocks, block_text_list)
+    return block_text_list
 
 
 async def convert_to_markdown(block_id: str) -> str:
@@ -216,9 +331,10 @@ async def convert_to_markdown(block_id: str) -> str:
     Recursively converts a Notion article to markdown format.
     
     This function retrieves all content from various Notion block types including 
-    paragraphs, headings (h1, h2, h3), bulleted lists, numbered lists, quotes, and images.
-    It automatically traverses nested blocks recursively to capture all content in 
-    the hierarchy and converts them to markdown format.
+    paragraphs, headings (h1, h2, h3), bulleted and numbered lists, to-dos, toggles,
+    quotes, callouts, code, equations, tables, dividers and images. It automatically
+    traverses nested blocks recursively to capture all content in the hierarchy and
+    converts them to markdown format (see block_renderer.render_block).
     
     Args:
         block_id (str): The ID of the Notion block or page to convert to markdown.
@@ -238,167 +354,117 @@ async def convert_to_markdown(block_id: str) -> str:
     Note:
         - Empty blocks (blocks with no text content) are skipped
         - Images are converted to markdown image tags with caption and URL: ![caption](url)
-        - The function processes up to 100 blocks per level (Notion API limit)
+        - Tables are converted to GitHub-flavored markdown tables
+        - All children are fetched, following the Notion API pagination cursor
         - Nested blocks are automatically included in the result
+        - Sibling subtrees are fetched concurrently (see fetch_block_tree)
+        - The markdown is built from the chunks of stream_markdown, so the fetched block
+          tree is not held in memory next to the article
+    """
+    return "".join([chunk async for chunk in stream_markdown(block_id)])
+
+
+async def stream_markdown(
+    block_id: str,
+    max_concurrency: int = NOTION_MAX_CONCURRENCY,
+    cache: BlockCache | None = default_block_cache
+) -> AsyncIterator[str]:
     """
-    markdown_lines: list[str] = []
-    blockResult = await notion.blocks.children.list(
-        block_id=block_id,
-        page_size=100
-    )
-    blocks = blockResult.get("results")
+    Converts a Notion article to markdown, yielding chunks in document order as blocks are fetched.
     
-    previous_block_type: str | None = None
+    Each top-level block is rendered and yielded as soon as it and its subtree are available,
+    while the subtrees of the following blocks on the same page are still being fetched
+    concurrently. The first chunk is therefore ready after a single page request (plus the
+    subtree of the first block), and only one page of top-level blocks is held in memory at
+    a time, however long the article is. Joining all chunks gives exactly the output of
+    convert_to_markdown.
     
-    for block in blocks:
-        block_type = block.get("type")
-        
-        if block_type == "paragraph":
-            rich_text = block.get("paragraph", {}).get("rich_text", [])
-            if len(rich_text) > 0:
-                text = convert_rich_text_to_markdown(rich_text)
-                if text:
-                    # Add newline before current block if needed
-                    if previous_block_type:
-                        if previous_block_type == "paragraph":
-                            markdown_lines.append("")
-                        elif previous_block_type != block_type:
-                            markdown_lines.append("")
-                    markdown_lines.append(text)
-                    previous_block_type = "paragraph"
-        
-        elif block_type == "heading_1":
-            rich_text = block.get("heading_1", {}).get("rich_text", [])
-            if len(rich_text) > 0:
-                text = convert_rich_text_to_markdown(rich_text)
-                if text:
-                    # Add newline before current block if needed
-                    if previous_block_type and previous_block_type != block_type:
-                        markdown_lines.append("")
-                    markdown_lines.append(f"# {text}")
-                    previous_block_type = "heading_1"
-        
-        elif block_type == "heading_2":
-            rich_text = block.get("heading_2", {}).get("rich_text", [])
-            if len(rich_text) > 0:
-                text = convert_rich_text_to_markdown(rich_text)
-                if text:
-                    # Add newline before current block if needed
-                    if previous_block_type and previous_block_type != block_type:
-                        markdown_lines.append("")
-                    markdown_lines.append(f"## {text}")
-                    previous_block_type = "heading_2"
-        
-        elif block_type == "heading_3":
-            rich_text = block.get("heading_3", {}).get("rich_text", [])
-            if len(rich_text) > 0:
-                text = convert_rich_text_to_markdown(rich_text)
-                if text:
-                    # Add newline before current block if needed
-                    if previous_block_type and previous_block_type != block_type:
-                        markdown_lines.append("")
-                    markdown_lines.append(f"### {text}")
-                    previous_block_type = "heading_3"
-        
-        elif block_type == "bulleted_list_item":
-            rich_text = block.get("bulleted_list_item", {}).get("rich_text", [])
-            if len(rich_text) > 0:
-                text = convert_rich_text_to_markdown(rich_text)
-                if text:
-                    # Add newline before current block if needed (but not for consecutive list items)
-                    if previous_block_type and previous_block_type != "bulleted_list_item":
-                        markdown_lines.append("")
-                    markdown_lines.append(f"- {text}")
-                    previous_block_type = "bulleted_list_item"
-        
-        elif block_type == "numbered_list_item":
-            rich_text = block.get("numbered_list_item", {}).get("rich_text", [])
-            if len(rich_text) > 0:
-                text = convert_rich_text_to_markdown(rich_text)
-                if text:
-                    # Add newline before current block if needed (but not for consecutive list items)
-                    if previous_block_type and previous_block_type != "numbered_list_item":
-                        markdown_lines.append("")
-                    markdown_lines.append(f"1. {text}")
-                    previous_block_type = "numbered_list_item"
-        
-        elif block_type == "quote":
-            rich_text = block.get("quote", {}).get("rich_text", [])
-            if len(rich_text) > 0:
-                text = convert_rich_text_to_markdown(rich_text)
-                if text:
-                    # Add newline before current block if needed
-                    if previous_block_type and previous_block_type != block_type:
-                        markdown_lines.append("")
-                    markdown_lines.append(f"> {text}")
-                    previous_block_type = "quote"
-        
-        elif block_type == "image":
-            image_block = block.get("image", {})
-            caption = ""
-            if image_block.get("caption"):
-                caption = convert_rich_text_to_markdown(image_block.get("caption", []))
-            alt_text = caption if caption else "Image"
-            
-            # Extract image URL (can be from file or external)
-            image_url = ""
-            if image_block.get("file"):
-                image_url = image_block.get("file", {}).get("url", "")
-            elif image_block.get("external"):
-                image_url = image_block.get("external", {}).get("url", "")
-            
-            # Add newline before current block if needed
-            if previous_block_type and previous_block_type != block_type:
-                markdown_lines.append("")
-            # Create markdown image tag with caption and URL
-            markdown_lines.append(f"![{alt_text}]({image_url})")
-            previous_block_type = "image"
-        
-        elif block_type == "divider":
-            # Add newline before current block if needed
-            if previous_block_type and previous_block_type != block_type:
-                markdown_lines.append("")
-            markdown_lines.append("---")
-            previous_block_type = "divider"
-        
-        elif block_type == "code":
-            rich_text = block.get("code", {}).get("rich_text", [])
-            language = block.get("code", {}).get("language", "")
-            if len(rich_text) > 0:
-                text = convert_rich_text_to_markdown(rich_text)
-                if text:
-                    # Add newline before current block if needed
-                    if previous_block_type and previous_block_type != block_type:
-                        markdown_lines.append("")
-                    markdown_lines.append(f"```{language}")
-                    markdown_lines.append(text)
-                    markdown_lines.append("```")
-                    previous_block_type = "code"
+    Args:
+        block_id (str): The ID of the Notion block or page to convert to markdown.
+        max_concurrency (int): Maximum number of Notion API requests in flight at once.
+        cache (BlockCache | None): Cache used for the subtrees of the top-level blocks
+            (see fetch_block_tree).
+    
+    Yields:
+        str: Consecutive chunks of the markdown document.
+    
+    Example:
+        >>> async for chunk in stream_markdown("2270cda410a68005b731fec98ea8500a"):
+        ...     print(chunk, end="")
+        # Heading 1
         
-        # Recursively process children blocks
-        if block.get("has_children"):
-            child_markdown = await convert_to_markdown(block.get("id"))
-            if child_markdown:
-                # Split child markdown into lines
-                child_lines = child_markdown.split("\n")
-                # Remove leading empty lines to avoid double newlines
-                while child_lines and child_lines[0] == "":
-                    child_lines.pop(0)
-                # Remove trailing empty lines
-                while child_lines and child_lines[-1] == "":
-                    child_lines.pop()
-                
-                if child_lines:
-                    # Only add newline before child content if parent block produced content
-                    # and we need spacing (child content handles its own internal spacing)
-                    if previous_block_type and markdown_lines and markdown_lines[-1] != "":
-                        markdown_lines.append("")
-                    # Add child lines
-                    markdown_lines.extend(child_lines)
-                    # Note: previous_block_type remains unchanged as child content
-                    # handles its own internal spacing through recursion
-    
-    return "\n".join(markdown_lines)
+        Some paragraph text
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    context = RenderContext()
+    
+    async for page in iter_block_children(block_id, semaphore):
+        subtree_tasks = [_start_subtree_fetch(block, semaphore, cache) for block in page]
+        try:
+            for block, task in zip(page, subtree_tasks):
+                if task is not None:
+                    _attach_subtree(block, await task, cache)
+                render_block(block, context)
+                chunk = context.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            for task in subtree_tasks:
+                if task is not None and not task.done():
+                    task.cancel()
+
+
+async def write_markdown(block_id: str, output: TextIO) -> int:
+    """
+    Streams a Notion article as markdown into a text stream, chunk by chunk.
+    
+    Args:
+        block_id (str): The ID of the Notion block or page to convert to markdown.
+        output (TextIO): The stream to write to, e.g. an open file or sys.stdout.
+    
+    Returns:
+        int: The number of characters written.
+    
+    Example:
+        >>> with open("article.md", "w", encoding="utf-8") as f:
+        ...     await write_markdown("2270cda410a68005b731fec98ea8500a", f)
+        5230
+    """
+    characters_written = 0
+    async for chunk in stream_markdown(block_id):
+        output.write(chunk)
+        output.flush()
+        characters_written += len(chunk)
+    return characters_written
+
+
+async def save_article_as_markdown(block_id: str, file_name: str) -> str:
+    """
+    Streams a Notion article as markdown straight into a file in the folder where the Python file is running.
+    
+    The markdown is written while it is fetched, so memory use does not grow with the length
+    of the article.
+    
+    Args:
+        block_id (str): The ID of the Notion block or page to convert to markdown.
+        file_name (str): The path of the file to create, relative to the folder of this file
+            (e.g. "blog/_posts/2025-11-02-my-post.md"). Parent folders are created if needed.
+    
+    Returns:
+        str: The full path to the written file.
+    
+    Example:
+        >>> await save_article_as_markdown("2270cda410a68005b731fec98ea8500a", "blog/_posts/2025-11-02-my-post.md")
+        '/path/to/notion_article_publisher/blog/_posts/2025-11-02-my-post.md'
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(script_dir, file_name)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        await write_markdown(block_id, f)
+    return file_path
 
 
 async def extract_title_from_page(page_id: str) -> str | None:
@@ -435,6 +501,9 @@ async def print_article_as_markdown(block_id: str):
     """
     Converts a Notion article to markdown and prints it to the terminal.
     
+    The markdown is printed while it is fetched (see stream_markdown), so the first lines
+    appear after a single Notion API round trip.
+    
     Args:
         block_id (str): The ID of the Notion block or page to convert to markdown.
             This can be either a page ID or a specific block ID.
@@ -442,6 +511,6 @@ async def print_article_as_markdown(block_id: str):
     Example:
         >>> await print_article_as_markdown("2270cda410a68005b731fec98ea8500a")
     """
-    markdown = await convert_to_markdown(block_id)
-    print(markdown)
+    await write_markdown(block_id, sys.stdout)
+    print()
 
@@ -0,0 +1,113 @@
+import os
+import time
+import sqlite3
+
+
+class SqliteLruCache:
+    """
+    Base class of the on-disk SQLite caches bounded by the total size of their entries.
+
+    A subclass names its table, the columns of its primary key and the definitions of its
+    columns; every entry additionally gets a `size` and an `accessed_at` column. After each
+    put, the least recently used entries are evicted until the total size is within
+    max_bytes. The subclass implements get and put on top of `_connect`, `_touch`, `_evict`
+    and the hit/miss counters.
+
+    Args:
+        path (str): Path of the SQLite database file. Parent folders are created on first use.
+        max_bytes (int): Maximum total size of the cached entries, in bytes.
+    """
+
+    # Name of the table, its primary key columns, and the definitions of all other columns
+    table: str = ""
+    key_columns: tuple[str, ...] = ()
+    columns: str = ""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection: sqlite3.Connection | None = None
+
+    def _database_path(self) -> str:
+        return self.path
+
+    def _create_tables(self, connection: sqlite3.Connection):
+        """
+        Creates the table of the cache. Subclasses that need more tables extend this.
+        """
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"{self.columns}, size INTEGER NOT NULL, accessed_at REAL NOT NULL, "
+            f"PRIMARY KEY ({', '.join(self.key_columns)}))"
+        )
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at ON {self.table} (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            database_path = self._database_path()
+            os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+            # Caches may be used from a worker thread of the agent
+            self._connection = sqlite3.connect(database_path, check_same_thread=False)
+            self._create_tables(self._connection)
+            self._connection.commit()
+        return self._connection
+
+    def _key_condition(self) -> str:
+        return " AND ".join(f"{column} = ?" for column in self.key_columns)
+
+    def _touch(self, connection: sqlite3.Connection, key: tuple):
+        """
+        Marks an entry as recently used.
+        """
+        connection.execute(
+            f"UPDATE {self.table} SET accessed_at = ? WHERE {self._key_condition()}",
+            (time.time(), *key)
+        )
+
+    def _delete(self, connection: sqlite3.Connection, keys: list[tuple]):
+        """
+        Removes entries. Subclasses that keep data outside the table remove it here too.
+        """
+        connection.executemany(f"DELETE FROM {self.table} WHERE {self._key_condition()}", keys)
+
+    def _evict(self, connection: sqlite3.Connection):
+        total_size = connection.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        evicted_keys = []
+        for row in connection.execute(
+            f"SELECT {', '.join(self.key_columns)}, size FROM {self.table} ORDER BY accessed_at"
+        ):
+            if total_size <= self.max_bytes:
+                break
+            evicted_keys.append(row[:-1])
+            total_size -= row[-1]
+        self._delete(connection, evicted_keys)
+
+    def clear(self):
+        """
+        Removes every cached entry and resets the hit/miss counters.
+        """
+        connection = self._connect()
+        self._delete(connection, connection.execute(f"SELECT {', '.join(self.key_columns)} FROM {self.table}").fetchall())
+        connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and the current size of the cache.
+        """
+        entries, size_bytes = self._connect().execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "max_bytes": self.max_bytes
+        }
@@ -1,16 +1,14 @@
 import os
-from faster_whisper import WhisperModel
 from google.adk.agents.llm_agent import Agent
 from google.adk.tools.mcp_tool import McpToolset
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from mcp import StdioServerParameters
 
-def format_timestamp(seconds):
-    """Convert seconds to HH:MM:SS format"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+from .profiles import get_profile
+from .prompts import SHOWNOTES_TEMPLATE
+from .summarization import summarize_transcript
+from .transcript_writer import format_timestamp, transcribe_to_file
+from .whisper_models import WHISPER_PRELOAD, preload_whisper_model
 
 def check_audio_file(audio_file_path: str) -> bool:
     """
@@ -38,40 +36,107 @@ def check_audio_file(audio_file_path: str) -> bool:
         raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
     return True
 
-def transcribe_audio(audio_file_path: str) -> list[str]:
+def transcribe_audio(audio_file_path: str, profile: str = "") -> dict:
     """
-    Transcribe an audio file using the Whisper model and return timestamped segments.
+    Transcribe an audio file using the Whisper model into a timestamped transcript text file.
     
-    This function uses the faster-whisper implementation with the 'base' model to transcribe
-    audio files. Each segment is formatted with start/end timestamps and the transcribed text.
+    This function uses the faster-whisper implementation to transcribe audio files. The decoding
+    profile (fast, balanced or accurate) chooses the model size, beam size, temperature fallback,
+    batched inference and word timestamps; WHISPER_PROFILE ('balanced' by default) is used when
+    no profile is given. Each model is loaded once per process and reused by later calls.
+    With WHISPER_PARALLEL_WORKERS above 1, long audio is split at silences and the chunks are
+    transcribed in parallel processes.
+    Each segment is written to a .txt file next to the audio file as soon as it is transcribed,
+    formatted with start/end timestamps and the transcribed text. An interrupted transcription
+    resumes from its last completed segment the next time it is requested. Audio that was
+    transcribed before with the same settings is served from the transcript cache instantly.
     
     Args:
         audio_file_path (str): Path to the audio file to transcribe (supports mp3, wav, etc.)
+        profile (str): Decoding profile: "fast" for the quickest draft, "balanced", or "accurate"
+            for the best quality; empty for the configured default
         
     Returns:
-        list[str]: List of formatted transcript segments, each containing:
-                   "[HH:MM:SS -> HH:MM:SS] Transcribed text"
+        dict: A dictionary containing:
+            - success (bool): Whether the transcription completed
+            - message (str): Description of the result
+            - transcript_file_path (str): Path of the transcript file, whose lines are
+              "[HH:MM:SS -> HH:MM:SS] Transcribed text"
+            - segments (int): Number of transcript lines
+            - language (str): Detected language
+            - resumed_from (float): Seconds into the audio the transcription resumed from
+            - cached (bool): Whether the transcript came from the transcript cache
                    
     Example:
-        >>> transcript = transcribe_audio("podcast_episode.mp3")
+        >>> result = transcribe_audio("podcast_episode.mp3")
         Detected language 'en' with probability 0.987654
         [00:00:00 -> 00:00:05] Welcome to our podcast.
         [00:00:05 -> 00:00:12] Today we'll be discussing AI and machine learning.
-        >>> print(len(transcript))
+        >>> print(result["transcript_file_path"])
+        podcast_episode.txt
+        >>> print(result["segments"])
         2
-        >>> print(transcript[0])
-        [00:00:00 -> 00:00:05] Welcome to our podcast.
     """
-    model_size = "base"
-    model = WhisperModel(model_size, device="cpu")
-    transcript =[]
-    segments, info = model.transcribe(audio_file_path, beam_size=5)
-    print("Detected language '%s' with probability %f" % (info.language, info.language_probability))
-    for segment in segments:
-        formatted_text = "[%s -> %s] %s" % (format_timestamp(segment.start), format_timestamp(segment.end), segment.text)
-        print(formatted_text)
-        transcript.append(formatted_text)
-    return transcript
+    try:
+        selected_profile = get_profile(profile or None)
+    except ValueError as e:
+        return {
+            "success": False,
+            "message": str(e)
+        }
+    
+    try:
+        result = transcribe_to_file(audio_file_path, profile=selected_profile)
+    except Exception as e:
+        print(f"❌ Error transcribing {audio_file_path}: {e}")
+        return {
+            "success": False,
+            "message": f"Error transcribing audio: {str(e)}. Run the transcription again to resume from the last completed segment."
+        }
+    
+    message = f"Transcribed {result['segments']} segments to {result['transcript_file_path']}"
+    if result["cached"]:
+        message = f"Wrote the cached transcript ({result['segments']} segments) to {result['transcript_file_path']}"
+    elif result["resumed_from"]:
+        message += f" (resumed from {format_timestamp(result['resumed_from'])})"
+    print(f"✓ {message}")
+    return {
+        "success": True,
+        "message": message,
+        **result
+    }
+
+def transcribe_folder(folder_path: str) -> dict:
+    """
+    Transcribe every audio file in a folder that does not have a transcript yet.
+    
+    Each audio file gets a transcript text file next to it, like the one written by
+    transcribe_audio. Files that already have a transcript are skipped. The other files are
+    transcribed in parallel worker processes (WHISPER_BATCH_WORKERS), and a report with the
+    real-time factor of every file is saved as transcription_report.json in the folder.
+    
+    Args:
+        folder_path (str): Path to the folder with the audio files
+        
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether no file failed
+            - message (str): Summary of the run
+            - report_file_path (str): Path of the saved report
+            - files (list): Per-file results with the status (transcribed, cached, skipped
+              or failed), transcript path, segment count and real-time factor
+                   
+    Example:
+        >>> result = transcribe_folder("/podcasts")
+        ✓ E22.mp3: 388 segments, RTF 0.079
+        ✓ Transcribed 1 files, skipped 5 with an existing transcript, 0 failed
+    """
+    # Imported here so running `python -m podcast_shownotes_creator.batch` does not import it twice
+    from .batch import transcribe_folder as transcribe_audio_folder
+    return transcribe_audio_folder(folder_path)
+
+if WHISPER_PRELOAD:
+    preload_whisper_model(get_profile().model_size)
 
 ACCESS_FOLDER_PATH = r"C:\Users\ligunagyi\Desktop"
 root_agent = Agent(
@@ -84,47 +149,20 @@ root_agent = Agent(
 - 从用户那里接收到本地音频文件的绝对路径
 - 判断文件是否存在，如果文件不存在则终止整个流程
 - 如果文件存在则继续检测文件类型，如果文件是音频文件则执行下面的子步骤
-    - 使用工具将音频文件转录为文字（包含时间戳以及对应时间区间内的文字）
-    - 将转录内容存储在一个文本（text）文件中，并将文件保存在音频文件所在的文件夹中
-    - 根据上述转录内容生成最终的播客摘要
+    - 使用工具将音频文件转录为文字（包含时间戳以及对应时间区间内的文字）。如果用户要求更快或更准确的转录，分别传入 profile="fast" 或 profile="accurate"，否则不传入 profile。工具会将转录内容逐段写入音频文件所在文件夹中的文本（text）文件，并返回该文件的路径
+    - 如果转录失败，可以再次调用工具，转录会从上次完成的位置继续
+    - 使用 summarize_transcript 工具，传入上述转录文件的路径，生成最终的播客摘要
 - 如果文件是文本文件，检测其中是否存储了音频转录内容。转录内容的格式如下"[00:00:00 -> 00:00:19] XXXXXX, XXXXXX"
-    - 根据上述转录内容生成最终的播客摘要
+    - 使用 summarize_transcript 工具，传入该文本文件的路径，生成最终的播客摘要
 - 如果文件是其他类型则终止整个流程
+- 如果用户提供的是一个文件夹并要求批量转录，使用 transcribe_folder 工具转录其中所有尚未转录的音频文件，并向用户汇报结果（包括每个文件的实时率）；除非用户要求，否则不需要为每个文件生成播客摘要
+- 将工具生成的播客摘要展示给用户；只有当工具失败时，才读取转录文件并根据以下模板自行生成播客摘要
 
-以下是摘要模板，请根据以下结构生成中文播客摘要：
-
-# [节目标题]
-**注意**：标题应该不超过两句话；标题的目标是简洁明了的概括整集节目谈论的话题。同时也要让标题看起来足够吸引人，让听众有点击播放的欲望
-
-## [节目简介]
-**注意**：用不超过两个自然段的篇幅对本期节目做一个简介。简介应该包含本集播客的主题，嘉宾谈论的有关话题以及听众可能在其中学习到的知识点。
-同样的简介也应该自然、亲切、足够吸引人，而不是机械的、生硬的将所有要点全盘托出。最好是用“我们”为人称进行描述
-- 以下是几个反例：
-    - "本期节目深入探讨了技术出版领域中作者与编辑之间的共生关系。我们再次邀请到资深编辑阳老师和技术作者广义，他们分享了从选题、创作到出版过程中的宝贵经验和深刻见解，揭示了技术图书出版背后不为人知的逻辑与挑战。"
-    - "本期嘉宾深入探讨了不同学习媒介的优劣。视频教程因其直观性在初学阶段备受青睐，却也因节奏缓慢而被资深程序员诟病。与此同时，传统的文字阅读仍以其快速、精准的信息获取能力，成为众多程序员持续的首选。"
-- 以下是几个正面例子：
-    - "你有没有萌生过写一本技术图书的想法？如果你觉得自己的选题不错，那么应该如何开始呢？是应该首先联系出版社还是应该立即动笔？你还有没有期望从出版一本技术图书的过程中得到其他方面的收获？放心，所有这些问题都可以在本期节目中找到答案。
-在本期节目中，我们将从作者的视角出发来探索一本技术图书是如何从构思，编写，再到校对，最后上市与读者见面的。我们力图通过分享出版过程中背后的故事，以及挖掘流程背后的挑战，来展现技术图书出版鲜为人知的那一面。同时还会尝试从读者、编辑、作者三个不同的视角来回答一些有关技术出版有关的尖锐问题。在节目的最后我们不禁想问，技术图书出版对个人以及出版社而言都还是个好生意吗？"
-下面同样是一个正面例子：
-    - "你书架上的《人工智能：现代方法（第4版）》《动手学深度学习》等经典图书背后有什么样的故事？为什么有些技术能成为主流，有些却默默无闻？从Go语言到Node.js，出版如何推动技术在中国的发展与普及？
-这期节目我们邀请了一位特殊的嘉宾——你可能从未见过但深受其影响的幕后英雄。杨海玲老师，人民邮电出版社异步社区资深策划编辑，25年IT图书出版经验，她参与责编过《重构（第2版）》《持续交付2.0》《代码整洁之道》等影响无数程序员职业生涯的经典图书。
-杨老师将从编辑的独特视角，分享技术出版如何推动技术发展，揭秘图书选择背后的专业逻辑，并探讨在AI时代，为什么程序员仍然需要系统化阅读。这不仅是一次出版行业内幕的揭秘，更是为程序员提供技术选书和学习路径的专业指南。"
-    - "我相信技术图书翻译对大多数听众来说既熟悉又陌生，之所以熟悉是因为我们每个人都是译本的消费者也同时是收益者，而陌生的地方则在于鲜有人会参与到真实的翻译流程中去，清晰的了解一本外文技术图书是如何从引进到面市的。
-    - 在这期节目中，我们会根据我们的图书翻译经历，聊聊图书翻译的选题、入坑，以及向各位听众展现图书翻译究竟是怎样一个过程。更重要的是，AI的出现给技术图书翻译带来了巨大影响，和前AI时代相比，AI解决哪些问题以及带来了哪些变化，也是我们想着重分享的。"
-
-
-## [时间轴]
-**注意**：在整集播客节目中，嘉宾会谈论好几个话题。时间轴应该作为整集提纲存在，快速帮助听众看到并且可以帮助他定位到想听的话题。时间轴内容应该是一个列表，每一个时间点都是独立一行
-- mm:ss – xxxx
-- mm:ss – xxxx
-- mm:ss – xxxx
-
-其他需要注意的点：
--生成的播客摘要应该完全基于转录文字的内容 
-
-""",
+""" + SHOWNOTES_TEMPLATE,
     tools=[
         transcribe_audio,
+        transcribe_folder,
+        summarize_transcript,
         McpToolset(
             connection_params=StdioConnectionParams(
                 server_params = StdioServerParameters(
@@ -0,0 +1,230 @@
+"""
+Batch transcription of every audio file in a folder.
+
+Run from the `src` folder, for example:
+
+    python -m podcast_shownotes_creator.batch /path/to/episodes --workers 2 --recursive
+
+Transcripts are written next to the audio files, and a report with the real-time factor of
+every file is saved as `transcription_report.json` in the folder.
+"""
+import os
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import av
+
+from .profiles import TranscriptionProfile, get_profile
+from .transcript_writer import get_transcript_path, transcribe_to_file
+from .whisper_models import WHISPER_CPU_THREADS, get_whisper_model
+
+# Number of files transcribed at once; every worker process keeps its own model loaded
+WHISPER_BATCH_WORKERS = int(os.getenv("WHISPER_BATCH_WORKERS", str(max(1, (os.cpu_count() or 1) // 4))))
+
+AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.opus', '.aac', '.wma']
+REPORT_FILE_NAME = "transcription_report.json"
+
+
+def find_audio_files(folder_path: str, recursive: bool = False) -> list[str]:
+    """
+    Returns the audio files in a folder (and its subfolders if recursive), sorted by path.
+    """
+    audio_files = []
+    for root, folders, files in os.walk(folder_path):
+        folders[:] = sorted(folder for folder in folders if not folder.startswith('.'))
+        for file in files:
+            if os.path.splitext(file)[1].lower() in AUDIO_EXTENSIONS:
+                audio_files.append(os.path.join(root, file))
+        if not recursive:
+            break
+    return sorted(audio_files)
+
+
+def get_audio_duration(audio_file_path: str) -> float | None:
+    """
+    Returns the duration of an audio file in seconds from its container, without decoding it.
+    """
+    try:
+        with av.open(audio_file_path) as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0]
+            if stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+    except (av.FFmpegError, OSError, IndexError):
+        pass
+    return None
+
+
+def has_transcript(audio_file_path: str) -> bool:
+    """
+    Whether a finished transcript exists next to the audio file.
+
+    A transcript with a checkpoint was interrupted, so it is resumed rather than skipped.
+    """
+    transcript_file_path = get_transcript_path(audio_file_path)
+    return os.path.exists(transcript_file_path) and not os.path.exists(f"{transcript_file_path}.checkpoint")
+
+
+def _init_worker(profile: TranscriptionProfile, cpu_threads: int):
+    """
+    Loads the model once when a worker process starts; every file it transcribes reuses it.
+    """
+    get_whisper_model(profile.model_size, cpu_threads=cpu_threads)
+
+
+def _transcribe_file(audio_file_path: str, profile: TranscriptionProfile, cpu_threads: int) -> dict:
+    start_time = time.perf_counter()
+    result = transcribe_to_file(audio_file_path, profile=profile, workers=1, cpu_threads=cpu_threads, print_segments=False)
+    result["transcribe_seconds"] = time.perf_counter() - start_time
+    return result
+
+
+def transcribe_folder(
+    folder_path: str,
+    workers: int = WHISPER_BATCH_WORKERS,
+    recursive: bool = False,
+    profile: str | None = None
+) -> dict:
+    """
+    Transcribe every audio file in a folder that does not have a transcript yet.
+
+    Each audio file gets a transcript text file next to it, as written by transcribe_audio.
+    Files that already have a finished transcript are skipped, and interrupted ones resume
+    from their checkpoint. The remaining files are transcribed by a pool of worker processes,
+    longest first, with one Whisper model loaded per process and the CPU cores split evenly
+    between the processes. A report with the real-time factor (transcription time divided by
+    audio duration) of every file is saved as transcription_report.json in the folder.
+
+    Args:
+        folder_path (str): Path to the folder with the audio files.
+        workers (int): Number of files transcribed at once (WHISPER_BATCH_WORKERS by default).
+        recursive (bool): Whether to include audio files in subfolders.
+        profile (str | None): Decoding profile (fast, balanced or accurate); WHISPER_PROFILE
+            when not given.
+
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether no file failed
+            - message (str): Summary of the run
+            - report_file_path (str): Path of the saved report
+            - files (list): Per-file results with audio_file_path, status (transcribed,
+              cached, skipped or failed), transcript_file_path, segments, audio_seconds,
+              transcribe_seconds, real_time_factor and error
+
+    Example:
+        >>> result = transcribe_folder("/podcasts", workers=2)
+        ✓ E21.mp3: 412 segments, RTF 0.084
+        ✓ E22.mp3: 388 segments, RTF 0.079
+        ✓ Transcribed 2 files, skipped 5 with an existing transcript, 0 failed
+        >>> result["files"][0]["status"]
+        'skipped'
+    """
+    if not os.path.isdir(folder_path):
+        return {
+            "success": False,
+            "message": f"Folder not found: {folder_path}"
+        }
+
+    profile = get_profile(profile)
+    start_time = time.perf_counter()
+    reports = []
+    pending = []
+    for audio_file_path in find_audio_files(folder_path, recursive):
+        report = {
+            "audio_file_path": audio_file_path,
+            "status": "skipped",
+            "transcript_file_path": get_transcript_path(audio_file_path),
+            "segments": None,
+            "audio_seconds": get_audio_duration(audio_file_path),
+            "transcribe_seconds": None,
+            "real_time_factor": None,
+            "error": None
+        }
+        reports.append(report)
+        if not has_transcript(audio_file_path):
+            pending.append(report)
+
+    if pending:
+        workers = max(1, min(workers, len(pending)))
+        # Split the cores between the workers unless the thread count is configured
+        cpu_threads = WHISPER_CPU_THREADS or max(1, (os.cpu_count() or 1) // workers)
+        # Longest files first, so a long episode does not start last and hold up the batch
+        pending.sort(key=lambda report: report["audio_seconds"] or 0, reverse=True)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(profile, cpu_threads)
+        ) as executor:
+            futures = {
+                executor.submit(_transcribe_file, report["audio_file_path"], profile, cpu_threads): report
+                for report in pending
+            }
+            for future in as_completed(futures):
+                report = futures[future]
+                file_name = os.path.basename(report["audio_file_path"])
+                try:
+                    result = future.result()
+                except Exception as e:
+                    report["status"] = "failed"
+                    report["error"] = str(e)
+                    print(f"❌ {file_name}: {e}")
+                    continue
+
+                report["status"] = "cached" if result["cached"] else "transcribed"
+                report["segments"] = result["segments"]
+                report["transcribe_seconds"] = result["transcribe_seconds"]
+                if report["audio_seconds"]:
+                    report["real_time_factor"] = result["transcribe_seconds"] / report["audio_seconds"]
+                real_time_factor = f"{report['real_time_factor']:.3f}" if report["real_time_factor"] is not None else "n/a"
+                print(f"✓ {file_name}: {result['segments']} segments, RTF {real_time_factor}")
+
+    counts = {status: sum(1 for report in reports if report["status"] == status) for status in ("transcribed", "cached", "skipped", "failed")}
+    transcribed = [report for report in reports if report["status"] == "transcribed" and report["audio_seconds"]]
+    audio_seconds = sum(report["audio_seconds"] for report in transcribed)
+    message = (
+        f"Transcribed {counts['transcribed'] + counts['cached']} files"
+        + (f" ({counts['cached']} from the transcript cache)" if counts["cached"] else "")
+        + f", skipped {counts['skipped']} with an existing transcript, {counts['failed']} failed"
+    )
+
+    report_file_path = os.path.join(folder_path, REPORT_FILE_NAME)
+    with open(report_file_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "folder_path": folder_path,
+            "profile": profile.name,
+            "workers": workers,
+            "wall_seconds": time.perf_counter() - start_time,
+            "audio_seconds": audio_seconds,
+            "real_time_factor": sum(report["transcribe_seconds"] for report in transcribed) / audio_seconds if audio_seconds else None,
+            **counts,
+            "files": reports
+        }, f, ensure_ascii=False, indent=2)
+
+    print(f"{'❌' if counts['failed'] else '✓'} {message}")
+    return {
+        "success": not counts["failed"],
+        "message": message,
+        "report_file_path": report_file_path,
+        "files": reports
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder_path")
+    parser.add_argument("--workers", type=int, default=WHISPER_BATCH_WORKERS, help="Number of files transcribed at once")
+    parser.add_argument("--recursive", action="store_true", help="Include audio files in subfolders")
+    parser.add_argument("--profile", help="Decoding profile: fast, balanced or accurate")
+    args = parser.parse_args(argv)
+
+    result = transcribe_folder(args.folder_path, args.workers, args.recursive, args.profile)
+    print(f"Report saved to {result['report_file_path']}" if "report_file_path" in result else result["message"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Benchmarks for the podcast transcription pipeline.
+
+Run from the `src` folder, for example:
+
+    python -m podcast_shownotes_creator.benchmark models podcast_episode.mp3
+    python -m podcast_shownotes_creator.benchmark chunked podcast_episode.mp3 --workers 1 2 4
+    python -m podcast_shownotes_creator.benchmark profiles
+    python -m podcast_shownotes_creator.benchmark profiles sample_clip.mp3 --reference sample_clip_reference.txt
+    python -m podcast_shownotes_creator.benchmark shownotes --synthetic-hours 2 --model stub
+
+Every configuration runs in a fresh process, so load times and memory are not
+affected by models loaded by an earlier configuration.
+"""
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Clip used by the `profiles` benchmark when none is given: 11 seconds of John F. Kennedy's
+# 1961 inaugural address (public domain), with its reference transcript
+SAMPLES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+SAMPLE_CLIP_PATH = os.path.join(SAMPLES_FOLDER, "jfk_inaugural.mp3")
+SAMPLE_REFERENCE_PATH = os.path.join(SAMPLES_FOLDER, "jfk_inaugural.txt")
+
+# Default configurations compared by the `models` benchmark: (model size, compute type, cpu_threads, num_workers)
+MODEL_CONFIGURATIONS = [
+    ("base", "float32", 0, 1),
+    ("base", "int8_float32", 0, 1),
+    ("base", "int8", 0, 1),
+    ("base", "int8", os.cpu_count() or 1, 1),
+]
+
+
+def _peak_memory_bytes() -> int | None:
+    """
+    Returns the peak resident memory of the current process, if the platform reports it.
+    """
+    if sys.platform == "win32":
+        # Only Windows reports the peak working set through psutil; elsewhere rss is the current size
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _benchmark_model(audio_file_path: str, model_size: str, compute_type: str, cpu_threads: int, num_workers: int) -> dict:
+    from .whisper_models import get_whisper_model
+
+    start_time = time.perf_counter()
+    model = get_whisper_model(model_size, compute_type, cpu_threads, num_workers)
+    load_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    segments, info = model.transcribe(audio_file_path, beam_size=5)
+    segment_count = sum(1 for _ in segments)
+    transcribe_seconds = time.perf_counter() - start_time
+
+    return {
+        "model_size": model_size,
+        "compute_type": compute_type,
+        "cpu_threads": cpu_threads,
+        "num_workers": num_workers,
+        "load_seconds": load_seconds,
+        "transcribe_seconds": transcribe_seconds,
+        "audio_seconds": info.duration,
+        "real_time_factor": transcribe_seconds / info.duration if info.duration else None,
+        "segments": segment_count,
+        "peak_memory_bytes": _peak_memory_bytes()
+    }
+
+
+def benchmark_models(audio_file_path: str, configurations: list[tuple] = MODEL_CONFIGURATIONS) -> list[dict]:
+    """
+    Measures load time, real-time factor and peak memory of each Whisper model configuration.
+
+    The real-time factor is transcription time divided by audio duration (lower is faster).
+    """
+    results = []
+    for configuration in configurations:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results.append(executor.submit(_benchmark_model, audio_file_path, *configuration).result())
+    return results
+
+
+def _benchmark_chunked(audio_file_path: str, workers: int) -> dict:
+    from .transcription import shutdown_pool, transcribe_segments
+
+    # Run twice: the first run includes starting the workers and loading their models
+    timings = []
+    try:
+        for _ in range(2):
+            start_time = time.perf_counter()
+            segments, _, _ = transcribe_segments(audio_file_path, workers=workers)
+            segment_count = sum(1 for _ in segments)
+            timings.append(time.perf_counter() - start_time)
+    finally:
+        shutdown_pool()
+
+    return {
+        "workers": workers,
+        "cold_seconds": timings[0],
+        "warm_seconds": timings[1],
+        "segments": segment_count
+    }
+
+
+def benchmark_chunked(audio_file_path: str, worker_counts: list[int] | None = None) -> list[dict]:
+    """
+    Measures the wall-clock time of chunked transcription for several worker counts.
+
+    Speedups are relative to the first worker count (a single serial stream by default).
+    """
+    if worker_counts is None:
+        worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    results = []
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results.append(executor.submit(_benchmark_chunked, audio_file_path, workers).result())
+    for result in results:
+        result["speedup"] = results[0]["warm_seconds"] / result["warm_seconds"]
+    return results
+
+
+def _tokenize(text: str) -> list[str]:
+    """
+    Splits text into words for the error rate, with every CJK character counted as a word.
+    """
+    return re.findall(r'[\u3400-\u9fff\uf900-\ufaff]|[^\W_]+', text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Returns the word error rate of a transcript against a reference text: the minimum number
+    of substituted, deleted and inserted words divided by the number of reference words.
+
+    Punctuation and case are ignored, and Chinese is compared character by character
+    (the character error rate usually reported for Chinese).
+    """
+    reference_words = _tokenize(reference)
+    hypothesis_words = _tokenize(hypothesis)
+    if not reference_words:
+        return 0.0 if not hypothesis_words else 1.0
+
+    # Levenshtein distance, keeping only the previous row of the table
+    previous = list(range(len(hypothesis_words) + 1))
+    for i, reference_word in enumerate(reference_words, 1):
+        current = [i]
+        for j, hypothesis_word in enumerate(hypothesis_words, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (reference_word != hypothesis_word)
+            ))
+        previous = current
+    return previous[-1] / len(reference_words)
+
+
+def _benchmark_profile(audio_file_path: str, profile_name: str, reference: str) -> dict:
+    from .profiles import get_profile
+    from .transcription import transcribe_segments
+    from .whisper_models import get_whisper_model
+
+    profile = get_profile(profile_name)
+    start_time = time.perf_counter()
+    get_whisper_model(profile.model_size)
+    load_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    segments, _, _ = transcribe_segments(audio_file_path, workers=1, profile=profile)
+    hypothesis = " ".join(segment.text for segment in segments)
+    transcribe_seconds = time.perf_counter() - start_time
+
+    return {
+        "profile": profile.name,
+        "model_size": profile.model_size,
+        "beam_size": profile.beam_size,
+        "batch_size": profile.batch_size,
+        "load_seconds": load_seconds,
+        "transcribe_seconds": transcribe_seconds,
+        "word_error_rate": word_error_rate(reference, hypothesis)
+    }
+
+
+def benchmark_profiles(audio_file_path: str, reference: str, profile_names: list[str] | None = None) -> list[dict]:
+    """
+    Measures the real-time factor and the word error rate of each decoding profile on a
+    sample clip with a reference transcript.
+
+    The clip is decoded into the audio cache first, so every profile starts from the same
+    cached audio, and every profile runs in a fresh process.
+    """
+    from .batch import get_audio_duration
+    from .preprocessing import AUDIO_PREPROCESS, preprocess_audio
+    from .profiles import TRANSCRIPTION_PROFILES
+
+    if AUDIO_PREPROCESS:
+        preprocess_audio(audio_file_path)
+    audio_seconds = get_audio_duration(audio_file_path)
+
+    results = []
+    for profile_name in profile_names or list(TRANSCRIPTION_PROFILES):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            result = executor.submit(_benchmark_profile, audio_file_path, profile_name, reference).result()
+        result["real_time_factor"] = result["transcribe_seconds"] / audio_seconds if audio_seconds else None
+        results.append(result)
+    return results
+
+
+def _synthetic_transcript(hours: float, seconds_per_line: float = 8.0) -> str:
+    """
+    Returns a transcript of the given length with lines of typical spoken Chinese density.
+    """
+    from .transcript_writer import format_timestamp
+
+    lines = []
+    start = 0.0
+    while start < hours * 3600:
+        end = start + seconds_per_line
+        lines.append(f"[{format_timestamp(start)} -> {format_timestamp(end)}] " + "我们今天聊一聊技术图书出版背后的故事" * 2)
+        start = end
+    return "\n".join(lines)
+
+
+def benchmark_shownotes(transcript: str, model: str = "stub", concurrency_levels: list[int] | None = None) -> list[dict]:
+    """
+    Measures end-to-end shownotes latency of the single-shot prompt and of the map-reduce
+    pipeline at several concurrency levels.
+
+    With the "stub" model, calls are simulated by `StubModel` with a latency that grows with
+    the prompt and answer size (0.5s per call, 0.02s per 1000 prompt characters and 0.5s per
+    1000 answer characters), so no API key is needed. Its shownotes have a fixed size, so both
+    pipelines pay the same for the final answer. Any other value is used as the name of the
+    Gemini model for every call.
+    """
+    from .summarization import StubModel, create_shownotes, create_shownotes_single_shot, get_model
+
+    def make_model():
+        if model == "stub":
+            return StubModel(seconds_per_call=0.5, seconds_per_1k_input_chars=0.02, seconds_per_1k_output_chars=0.5)
+        return get_model(model)
+
+    results = []
+    single_shot = asyncio.run(create_shownotes_single_shot(transcript, make_model()))
+    results.append({"pipeline": "single-shot", "concurrency": 1, "calls": 1, "total_seconds": single_shot["total_seconds"]})
+
+    for concurrency in concurrency_levels or [1, 4, 8]:
+        map_model = make_model()
+        map_reduce = asyncio.run(create_shownotes(transcript, map_model, make_model(), max_concurrency=concurrency))
+        results.append({
+            "pipeline": "map-reduce",
+            "concurrency": concurrency,
+            "calls": getattr(map_model, "calls", map_reduce["windows"]) + 1,
+            "total_seconds": map_reduce["total_seconds"]
+        })
+
+    for result in results:
+        result["speedup"] = results[0]["total_seconds"] / result["total_seconds"]
+    return results
+
+
+def _format_bytes(size: int | None) -> str:
+    return "n/a" if size is None else f"{size / (1024 * 1024):.0f} MB"
+
+
+def _print_table(headers: list[str], rows: list[list]):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, ["-" * width for width in widths], *rows]:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    models_parser = subparsers.add_parser("models", help="Compare Whisper model configurations")
+    models_parser.add_argument("audio_file_path")
+
+    chunked_parser = subparsers.add_parser("chunked", help="Compare chunked transcription with different worker counts")
+    chunked_parser.add_argument("audio_file_path")
+    chunked_parser.add_argument("--workers", type=int, nargs="+", help="Worker counts to compare")
+
+    profiles_parser = subparsers.add_parser("profiles", help="Compare RTF and WER of the decoding profiles on a sample clip")
+    profiles_parser.add_argument("audio_file_path", nargs="?", default=SAMPLE_CLIP_PATH, help="Clip to transcribe (the bundled sample by default)")
+    profiles_parser.add_argument("--reference", help="Text file with the reference transcript of the clip (required for your own clip)")
+    profiles_parser.add_argument("--profiles", nargs="+", help="Profiles to compare (all by default)")
+
+    shownotes_parser = subparsers.add_parser("shownotes", help="Compare single-shot and map-reduce shownotes latency")
+    transcript_source = shownotes_parser.add_mutually_exclusive_group(required=True)
+    transcript_source.add_argument("--transcript", help="Transcript file written by transcribe_audio")
+    transcript_source.add_argument("--synthetic-hours", type=float, help="Generate a transcript of this many hours")
+    shownotes_parser.add_argument("--model", default="stub", help="'stub' for the local stub model, or a Gemini model name")
+    shownotes_parser.add_argument("--concurrency", type=int, nargs="+", help="Map-reduce concurrency levels to compare")
+
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "models":
+        results = benchmark_models(args.audio_file_path)
+        _print_table(
+            ["model", "compute type", "threads", "workers", "load", "transcribe", "RTF", "peak memory"],
+            [
+                [
+                    result["model_size"],
+                    result["compute_type"],
+                    result["cpu_threads"] or "auto",
+                    result["num_workers"],
+                    f"{result['load_seconds']:.2f}s",
+                    f"{result['transcribe_seconds']:.2f}s",
+                    f"{result['real_time_factor']:.3f}" if result["real_time_factor"] is not None else "n/a",
+                    _format_bytes(result["peak_memory_bytes"])
+                ]
+                for result in results
+            ]
+        )
+    elif args.benchmark == "chunked":
+        results = benchmark_chunked(args.audio_file_path, args.workers)
+        _print_table(
+            ["workers", "cold", "warm", "speedup", "segments"],
+            [
+                [
+                    result["workers"],
+                    f"{result['cold_seconds']:.2f}s",
+                    f"{result['warm_seconds']:.2f}s",
+                    f"{result['speedup']:.2f}x",
+                    result["segments"]
+                ]
+                for result in results
+            ]
+        )
+
+    elif args.benchmark == "profiles":
+        if args.reference is None:
+            if args.audio_file_path != SAMPLE_CLIP_PATH:
+                parser.error("--reference is required when a clip is given")
+            args.reference = SAMPLE_REFERENCE_PATH
+        with open(args.reference, 'r', encoding='utf-8') as f:
+            reference = f.read()
+        results = benchmark_profiles(args.audio_file_path, reference, args.profiles)
+        _print_table(
+            ["profile", "model", "beam", "batch", "load", "transcribe", "RTF", "WER"],
+            [
+                [
+                    result["profile"],
+                    result["model_size"],
+                    result["beam_size"],
+                    result["batch_size"] or "-",
+                    f"{result['load_seconds']:.2f}s",
+                    f"{result['transcribe_seconds']:.2f}s",
+                    f"{result['real_time_factor']:.3f}" if result["real_time_factor"] is not None else "n/a",
+                    f"{result['word_error_rate']:.1%}"
+                ]
+                for result in results
+            ]
+        )
+    elif args.benchmark == "shownotes":
+        if args.transcript:
+            with open(args.transcript, 'r', encoding='utf-8') as f:
+                transcript = f.read()
+        else:
+            transcript = _synthetic_transcript(args.synthetic_hours)
+        results = benchmark_shownotes(transcript, args.model, args.concurrency)
+        _print_table(
+            ["pipeline", "concurrency", "calls", "total", "speedup"],
+            [
+                [
+                    result["pipeline"],
+                    result["concurrency"],
+                    result["calls"],
+                    f"{result['total_seconds']:.2f}s",
+                    f"{result['speedup']:.2f}x"
+                ]
+                for result in results
+            ]
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import os
+import json
+import time
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+from faster_whisper import decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from .transcript_cache import hash_audio_file
+
+SAMPLE_RATE = 16000
+# Set AUDIO_PREPROCESS=0 to let faster-whisper decode the original file on every transcription
+AUDIO_PREPROCESS = os.getenv("AUDIO_PREPROCESS", "1").lower() in ("1", "true", "yes")
+# Set AUDIO_TRIM_SILENCE=0 to keep silences, music and jingles in the audio passed to Whisper
+AUDIO_TRIM_SILENCE = os.getenv("AUDIO_TRIM_SILENCE", "1").lower() in ("1", "true", "yes")
+# Only stretches without speech of at least this long are removed
+AUDIO_TRIM_MIN_SILENCE_MS = int(os.getenv("AUDIO_TRIM_MIN_SILENCE_MS", "2000"))
+# Audio kept on both sides of every stretch of speech
+AUDIO_TRIM_PAD_MS = int(os.getenv("AUDIO_TRIM_PAD_MS", "400"))
+
+
+class TimestampMap:
+    """
+    Maps times in trimmed audio back to the original audio, and the other way around.
+
+    Args:
+        spans (list[tuple[int, int]]): (start, end) sample indices of the original audio
+            that were kept, in order. The trimmed audio is these spans back to back.
+
+    Example:
+        >>> timestamp_map = TimestampMap([(16000, 32000), (64000, 80000)])
+        >>> timestamp_map.to_original(1.5)
+        4.5
+    """
+
+    def __init__(self, spans: list[tuple[int, int]]):
+        self.spans = spans
+        self._processed_starts = []
+        self._original_starts = [start for start, _ in spans]
+        processed_start = 0
+        for start, end in spans:
+            self._processed_starts.append(processed_start)
+            processed_start += end - start
+        self.processed_samples = processed_start
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        Converts a time in the trimmed audio to the original audio.
+
+        A time exactly at the joint of two spans belongs to the earlier span when it is the
+        end of a segment, so the segment does not stretch over the removed silence.
+        """
+        if not self.spans:
+            return seconds
+        sample = seconds * SAMPLE_RATE
+        if is_end:
+            index = max(0, bisect_left(self._processed_starts, sample) - 1)
+        else:
+            index = max(0, bisect_right(self._processed_starts, sample) - 1)
+        return (self.spans[index][0] + sample - self._processed_starts[index]) / SAMPLE_RATE
+
+    def to_processed(self, seconds: float) -> float:
+        """
+        Converts a time in the original audio to the trimmed audio.
+
+        A time inside a removed stretch moves to the start of the next kept span.
+        """
+        if not self.spans:
+            return seconds
+        sample = seconds * SAMPLE_RATE
+        index = bisect_right(self._original_starts, sample) - 1
+        if index < 0:
+            return 0.0
+        start, end = self.spans[index]
+        if sample < end:
+            return (self._processed_starts[index] + sample - start) / SAMPLE_RATE
+        if index + 1 < len(self.spans):
+            return self._processed_starts[index + 1] / SAMPLE_RATE
+        return self.processed_samples / SAMPLE_RATE
+
+
+class PcmCache:
+    """
+    On-disk cache of decoded audio as 16 kHz mono float32 `.npy` files, keyed by audio hash.
+
+    Cached audio is opened as a read-only memory map, so it is neither decoded again nor
+    read into memory before it is used. The speech spans found by the VAD are stored next
+    to the audio, and so is the trimmed audio made of those spans. The cache is bounded by
+    the total size of the stored files; the least recently used files are evicted first.
+
+    Args:
+        path (str): Folder of the cache. It is created on first use.
+        max_bytes (int): Maximum total size of the cached files, in bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def _audio_path(self, audio_hash: str) -> str:
+        return os.path.join(self.path, f"{audio_hash}.npy")
+
+    def _spans_path(self, audio_hash: str) -> str:
+        return os.path.join(self.path, f"{audio_hash}.spans.json")
+
+    def _trimmed_path(self, audio_hash: str, settings: str) -> str:
+        return os.path.join(self.path, f"{audio_hash}.{settings.replace(':', '-')}.npy")
+
+    def load(self, audio_file_path: str, audio_hash: str) -> np.ndarray:
+        """
+        Returns the decoded audio as a memory map, decoding and storing it on a miss.
+        """
+        audio_path = self._audio_path(audio_hash)
+        try:
+            audio = np.load(audio_path, mmap_mode='r')
+            # Mark as recently used for the eviction
+            os.utime(audio_path)
+            return audio
+        except (OSError, ValueError):
+            pass
+
+        start_time = time.perf_counter()
+        decoded = decode_audio(audio_file_path, sampling_rate=SAMPLE_RATE)
+        if decoded.nbytes > self.max_bytes:
+            return decoded
+        os.makedirs(self.path, exist_ok=True)
+        # Write a new file and rename it, so a crash never leaves a truncated file behind
+        temporary_path = f"{audio_path}.tmp.npy"
+        np.save(temporary_path, decoded)
+        os.replace(temporary_path, audio_path)
+        del decoded
+        elapsed = time.perf_counter() - start_time
+        print(f"Decoded {os.path.basename(audio_file_path)} to the audio cache in {elapsed:.1f}s")
+        self._evict(keep=audio_path)
+        return np.load(audio_path, mmap_mode='r')
+
+    def load_spans(self, audio_hash: str, settings: str) -> list[tuple[int, int]] | None:
+        try:
+            with open(self._spans_path(audio_hash), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get("settings") != settings:
+            return None
+        return [tuple(span) for span in stored["spans"]]
+
+    def store_spans(self, audio_hash: str, settings: str, spans: list[tuple[int, int]]):
+        if not os.path.exists(self._audio_path(audio_hash)):
+            return
+        spans_path = self._spans_path(audio_hash)
+        with open(f"{spans_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({"settings": settings, "spans": spans}, f)
+        os.replace(f"{spans_path}.tmp", spans_path)
+
+    def load_trimmed(
+        self,
+        audio_hash: str,
+        settings: str,
+        audio: np.ndarray,
+        spans: list[tuple[int, int]]
+    ) -> np.ndarray:
+        """
+        Returns the spans of the audio back to back as a memory map, writing it on a miss.
+
+        The spans are copied one at a time into a memory-mapped file, so the trimmed audio is
+        never held in memory as a whole. Audio too large for the cache is concatenated in memory.
+        """
+        trimmed_path = self._trimmed_path(audio_hash, settings)
+        try:
+            trimmed = np.load(trimmed_path, mmap_mode='r')
+            os.utime(trimmed_path)
+            return trimmed
+        except (OSError, ValueError):
+            pass
+
+        samples = sum(end - start for start, end in spans)
+        if samples * audio.itemsize > self.max_bytes:
+            return np.concatenate([audio[start:end] for start, end in spans])
+        os.makedirs(self.path, exist_ok=True)
+        temporary_path = f"{trimmed_path}.tmp.npy"
+        trimmed = np.lib.format.open_memmap(
+            temporary_path, mode='w+', dtype=audio.dtype, shape=(samples,)
+        )
+        position = 0
+        for start, end in spans:
+            trimmed[position:position + end - start] = audio[start:end]
+            position += end - start
+        trimmed.flush()
+        del trimmed
+        os.replace(temporary_path, trimmed_path)
+        self._evict(keep=trimmed_path)
+        return np.load(trimmed_path, mmap_mode='r')
+
+    def _evict(self, keep: str):
+        entries = []
+        for file in os.listdir(self.path):
+            if file.endswith(".npy") and not file.endswith(".tmp.npy"):
+                file_path = os.path.join(self.path, file)
+                stat = os.stat(file_path)
+                entries.append((stat.st_mtime, stat.st_size, file_path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, file_path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            if file_path == keep:
+                continue
+            # Memory maps that are still open keep their data on POSIX; on Windows the file stays
+            try:
+                os.remove(file_path)
+            except OSError:
+                continue
+            try:
+                os.remove(f"{file_path[:-len('.npy')]}.spans.json")
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+
+pcm_cache = PcmCache(
+    path=os.getenv(
+        "AUDIO_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "audio")
+    ),
+    max_bytes=int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+)
+
+
+def find_speech_spans(
+    audio: np.ndarray,
+    min_silence_ms: int = AUDIO_TRIM_MIN_SILENCE_MS,
+    pad_ms: int = AUDIO_TRIM_PAD_MS
+) -> list[tuple[int, int]]:
+    """
+    Returns the (start, end) sample indices of the audio to keep: every stretch of speech
+    found by the Silero VAD bundled with faster-whisper, padded by pad_ms on both sides.
+    Leading, trailing and internal stretches without speech of at least min_silence_ms
+    are left out.
+    """
+    speech = get_speech_timestamps(
+        audio,
+        VadOptions(min_silence_duration_ms=min_silence_ms, speech_pad_ms=pad_ms)
+    )
+    spans = []
+    for timestamp in speech:
+        start, end = max(0, int(timestamp["start"])), min(len(audio), int(timestamp["end"]))
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        elif end > start:
+            spans.append((start, end))
+    return spans
+
+
+def get_preprocessing_settings() -> str:
+    """
+    Returns the preprocessing settings that change the audio passed to Whisper.
+    """
+    if not AUDIO_PREPROCESS:
+        return "original"
+    if not AUDIO_TRIM_SILENCE:
+        return "pcm"
+    return f"trim:{AUDIO_TRIM_MIN_SILENCE_MS}:{AUDIO_TRIM_PAD_MS}"
+
+
+def preprocess_audio(
+    audio_file_path: str,
+    cache: PcmCache = pcm_cache,
+    audio_hash: str | None = None
+) -> tuple[np.ndarray, TimestampMap | None]:
+    """
+    Decodes an audio file once to 16 kHz mono PCM and removes the stretches without speech.
+
+    The decoded audio is kept in the PCM cache as a memory-mapped file, so later
+    transcriptions of the same audio (retries, resumes, other settings) skip decoding.
+    With AUDIO_TRIM_SILENCE, leading, trailing and long internal silences, music and
+    jingles without speech are cut out (see `find_speech_spans`), and the returned
+    TimestampMap converts times in the trimmed audio back to the original file. The
+    trimmed audio is cached as a memory-mapped file of its own.
+
+    Args:
+        audio_file_path (str): Path to the audio file.
+        cache (PcmCache): Cache of decoded audio.
+        audio_hash (str | None): The `hash_audio_file` digest of the file, if the caller
+            already has it; computed otherwise.
+
+    Returns:
+        tuple: The audio to transcribe and its TimestampMap, or None when nothing was trimmed.
+
+    Example:
+        >>> audio, timestamp_map = preprocess_audio("podcast_episode.mp3")
+        Trimmed 192s without speech from podcast_episode.mp3 (5%)
+        >>> timestamp_map.to_original(0.0)
+        11.2
+    """
+    audio_hash = audio_hash or hash_audio_file(audio_file_path)
+    audio = cache.load(audio_file_path, audio_hash)
+    if not AUDIO_TRIM_SILENCE or len(audio) == 0:
+        return audio, None
+
+    settings = get_preprocessing_settings()
+    spans = cache.load_spans(audio_hash, settings)
+    if spans is None:
+        spans = find_speech_spans(audio)
+        cache.store_spans(audio_hash, settings, spans)
+
+    timestamp_map = TimestampMap(spans)
+    trimmed_samples = len(audio) - timestamp_map.processed_samples
+    if not spans or trimmed_samples == 0:
+        # Nothing to trim, or no speech found at all: transcribe the whole file
+        return audio, None
+
+    print(
+        f"Trimmed {trimmed_samples / SAMPLE_RATE:.0f}s without speech from "
+        f"{os.path.basename(audio_file_path)} ({trimmed_samples / len(audio):.0%})"
+    )
+    return cache.load_trimmed(audio_hash, settings, audio, spans), timestamp_map
@@ -0,0 +1,97 @@
+import os
+from typing import NamedTuple
+
+# Default decoding profile: fast, balanced or accurate
+WHISPER_PROFILE = os.getenv("WHISPER_PROFILE", "balanced")
+
+
+class TranscriptionProfile(NamedTuple):
+    name: str
+    # Whisper model size, e.g. "base" or "small"
+    model_size: str
+    # 1 decodes greedily, larger values keep that many candidate sequences
+    beam_size: int
+    # Temperatures tried in order whenever a decode looks like a hallucination or a loop
+    temperature: tuple[float, ...]
+    # Number of 30 second windows decoded together by the batched pipeline (0 decodes sequentially)
+    batch_size: int
+    # Whether each window is prompted with the text of the previous one (ignored when batched)
+    condition_on_previous_text: bool
+    # Whether segment boundaries are aligned to word timings
+    word_timestamps: bool
+
+
+TRANSCRIPTION_PROFILES = {
+    # Greedy decoding of batched windows without fallback: the fastest, for drafts and long backlogs
+    "fast": TranscriptionProfile(
+        name="fast",
+        model_size="base",
+        beam_size=1,
+        temperature=(0.0,),
+        batch_size=8,
+        condition_on_previous_text=False,
+        word_timestamps=False
+    ),
+    # The settings transcribe_audio has always used
+    "balanced": TranscriptionProfile(
+        name="balanced",
+        model_size="base",
+        beam_size=5,
+        temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        batch_size=0,
+        condition_on_previous_text=True,
+        word_timestamps=False
+    ),
+    # A larger model with word-aligned timestamps, for episodes that are published as they are
+    "accurate": TranscriptionProfile(
+        name="accurate",
+        model_size="small",
+        beam_size=5,
+        temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        batch_size=0,
+        condition_on_previous_text=True,
+        word_timestamps=True
+    ),
+}
+
+
+def get_profile(profile: str | TranscriptionProfile | None = None) -> TranscriptionProfile:
+    """
+    Returns a decoding profile by name (WHISPER_PROFILE by default).
+
+    A WHISPER_MODEL_SIZE set in the environment replaces the model size of every profile.
+
+    Raises:
+        ValueError: If there is no profile with that name.
+
+    Example:
+        >>> get_profile("fast").beam_size
+        1
+    """
+    if isinstance(profile, TranscriptionProfile):
+        return profile
+    name = (profile or WHISPER_PROFILE).strip().lower()
+    if name not in TRANSCRIPTION_PROFILES:
+        raise ValueError(f"Unknown transcription profile '{name}', expected one of: {', '.join(TRANSCRIPTION_PROFILES)}")
+
+    selected = TRANSCRIPTION_PROFILES[name]
+    model_size = os.getenv("WHISPER_MODEL_SIZE")
+    if model_size:
+        selected = selected._replace(model_size=model_size)
+    return selected
+
+
+def get_decode_options(profile: TranscriptionProfile) -> dict:
+    """
+    Returns the faster-whisper `transcribe` keyword arguments for a profile.
+    """
+    options = {
+        "beam_size": profile.beam_size,
+        "temperature": list(profile.temperature),
+        "word_timestamps": profile.word_timestamps
+    }
+    if profile.batch_size:
+        options["batch_size"] = profile.batch_size
+    else:
+        options["condition_on_previous_text"] = profile.condition_on_previous_text
+    return options
@@ -0,0 +1,68 @@
+"""
+Prompts used to turn a timestamped transcript into Chinese shownotes.
+"""
+
+SHOWNOTES_TEMPLATE = """以下是摘要模板，请根据以下结构生成中文播客摘要：
+
+# [节目标题]
+**注意**：标题应该不超过两句话；标题的目标是简洁明了的概括整集节目谈论的话题。同时也要让标题看起来足够吸引人，让听众有点击播放的欲望
+
+## [节目简介]
+**注意**：用不超过两个自然段的篇幅对本期节目做一个简介。简介应该包含本集播客的主题，嘉宾谈论的有关话题以及听众可能在其中学习到的知识点。
+同样的简介也应该自然、亲切、足够吸引人，而不是机械的、生硬的将所有要点全盘托出。最好是用“我们”为人称进行描述
+- 以下是几个反例：
+    - "本期节目深入探讨了技术出版领域中作者与编辑之间的共生关系。我们再次邀请到资深编辑阳老师和技术作者广义，他们分享了从选题、创作到出版过程中的宝贵经验和深刻见解，揭示了技术图书出版背后不为人知的逻辑与挑战。"
+    - "本期嘉宾深入探讨了不同学习媒介的优劣。视频教程因其直观性在初学阶段备受青睐，却也因节奏缓慢而被资深程序员诟病。与此同时，传统的文字阅读仍以其快速、精准的信息获取能力，成为众多程序员持续的首选。"
+- 以下是几个正面例子：
+    - "你有没有萌生过写一本技术图书的想法？如果你觉得自己的选题不错，那么应该如何开始呢？是应该首先联系出版社还是应该立即动笔？你还有没有期望从出版一本技术图书的过程中得到其他方面的收获？放心，所有这些问题都可以在本期节目中找到答案。
+在本期节目中，我们将从作者的视角出发来探索一本技术图书是如何从构思，编写，再到校对，最后上市与读者见面的。我们力图通过分享出版过程中背后的故事，以及挖掘流程背后的挑战，来展现技术图书出版鲜为人知的那一面。同时还会尝试从读者、编辑、作者三个不同的视角来回答一些有关技术出版有关的尖锐问题。在节目的最后我们不禁想问，技术图书出版对个人以及出版社而言都还是个好生意吗？"
+下面同样是一个正面例子：
+    - "你书架上的《人工智能：现代方法（第4版）》《动手学深度学习》等经典图书背后有什么样的故事？为什么有些技术能成为主流，有些却默默无闻？从Go语言到Node.js，出版如何推动技术在中国的发展与普及？
+这期节目我们邀请了一位特殊的嘉宾——你可能从未见过但深受其影响的幕后英雄。杨海玲老师，人民邮电出版社异步社区资深策划编辑，25年IT图书出版经验，她参与责编过《重构（第2版）》《持续交付2.0》《代码整洁之道》等影响无数程序员职业生涯的经典图书。
+杨老师将从编辑的独特视角，分享技术出版如何推动技术发展，揭秘图书选择背后的专业逻辑，并探讨在AI时代，为什么程序员仍然需要系统化阅读。这不仅是一次出版行业内幕的揭秘，更是为程序员提供技术选书和学习路径的专业指南。"
+    - "我相信技术图书翻译对大多数听众来说既熟悉又陌生，之所以熟悉是因为我们每个人都是译本的消费者也同时是收益者，而陌生的地方则在于鲜有人会参与到真实的翻译流程中去，清晰的了解一本外文技术图书是如何从引进到面市的。
+    - 在这期节目中，我们会根据我们的图书翻译经历，聊聊图书翻译的选题、入坑，以及向各位听众展现图书翻译究竟是怎样一个过程。更重要的是，AI的出现给技术图书翻译带来了巨大影响，和前AI时代相比，AI解决哪些问题以及带来了哪些变化，也是我们想着重分享的。"
+
+
+## [时间轴]
+**注意**：在整集播客节目中，嘉宾会谈论好几个话题。时间轴应该作为整集提纲存在，快速帮助听众看到并且可以帮助他定位到想听的话题。时间轴内容应该是一个列表，每一个时间点都是独立一行
+- mm:ss – xxxx
+- mm:ss – xxxx
+- mm:ss – xxxx
+
+其他需要注意的点：
+-生成的播客摘要应该完全基于转录文字的内容
+"""
+
+# Map step: one call per transcript window, answered with JSON topic records
+WINDOW_SUMMARY_PROMPT = """你是一位专业的播客编辑。下面是一段播客转录内容（{window_start} 到 {window_end}），每一行的格式为 "[开始时间 -> 结束时间] 文字"。
+
+请找出这段内容中讨论的话题。对于每一个话题，给出：
+- "start"：该话题开始时所在行的开始时间，格式为 HH:MM:SS，必须来自转录内容
+- "topic"：不超过 20 个字的话题名称
+- "summary"：用 2 到 3 句话概括该话题中谈到的观点、故事和知识点
+
+话题按时间顺序排列，只基于转录内容，不要编造。只输出 JSON 数组，例如：
+[{{"start": "00:12:05", "topic": "话题名称", "summary": "话题概括"}}]
+
+转录内容：
+{transcript}
+"""
+
+# Intermediate reduce step for long episodes: merges neighbouring topic records
+CONDENSE_PROMPT = """你是一位专业的播客编辑。下面是一期播客中按时间顺序排列的话题记录（JSON 数组），它们来自相邻的几段转录内容。
+
+请合并重复或紧密相关的相邻话题，保留每个合并后话题最早的开始时间（"start"，格式 HH:MM:SS），并将 "summary" 精简为 2 到 3 句话。只输出与输入相同格式的 JSON 数组。
+
+话题记录：
+{records}
+"""
+
+# Final reduce step: writes the shownotes from all topic records
+SHOWNOTES_PROMPT = """你是一位专业的播客摘要（shownotes）创作者。下面是一期时长为 {duration} 的播客按时间顺序排列的话题记录，每条记录包含话题开始时间、话题名称以及概括。
+
+{template}
+
+话题记录：
+{records}
+"""
@@ -0,0 +1,378 @@
+import os
+import re
+import json
+import time
+import asyncio
+from typing import NamedTuple
+
+from .prompts import CONDENSE_PROMPT, SHOWNOTES_PROMPT, SHOWNOTES_TEMPLATE, WINDOW_SUMMARY_PROMPT
+from .transcript_writer import format_timestamp
+
+# Model that summarizes the transcript windows, or "stub" for the local stub model
+SHOWNOTES_MAP_MODEL = os.getenv("SHOWNOTES_MAP_MODEL", "gemini-2.5-flash")
+# Model that writes the final shownotes from the topic records
+SHOWNOTES_REDUCE_MODEL = os.getenv("SHOWNOTES_REDUCE_MODEL", "gemini-2.5-pro")
+# Transcript windows are cut at whichever limit is reached first
+SHOWNOTES_WINDOW_SECONDS = float(os.getenv("SHOWNOTES_WINDOW_SECONDS", "600"))
+SHOWNOTES_WINDOW_MAX_CHARS = int(os.getenv("SHOWNOTES_WINDOW_MAX_CHARS", "12000"))
+# Topic records are merged in further rounds until they fit in this many characters
+SHOWNOTES_REDUCE_MAX_CHARS = int(os.getenv("SHOWNOTES_REDUCE_MAX_CHARS", "24000"))
+# Maximum number of model calls in flight at once
+SHOWNOTES_MAX_CONCURRENCY = int(os.getenv("SHOWNOTES_MAX_CONCURRENCY", "4"))
+
+TRANSCRIPT_LINE_PATTERN = re.compile(r'^\[(\d+):(\d{2}):(\d{2}) -> (\d+):(\d{2}):(\d{2})\]\s?(.*)$')
+JSON_ARRAY_PATTERN = re.compile(r'\[.*\]', re.DOTALL)
+# Number of time line entries in the stub model's shownotes
+STUB_TIMELINE_ENTRIES = 20
+
+
+class TranscriptLine(NamedTuple):
+    start: float
+    end: float
+    line: str
+
+
+class GeminiModel:
+    """
+    Generates text with a Gemini model through the google-genai client used by ADK.
+
+    The client reads GOOGLE_API_KEY (or the Vertex AI settings) from the environment.
+    """
+
+    def __init__(self, model: str):
+        from google import genai
+
+        self.model = model
+        self._client = genai.Client()
+
+    async def generate(self, prompt: str, json_output: bool = False) -> str:
+        config = {"response_mime_type": "application/json"} if json_output else None
+        response = await self._client.aio.models.generate_content(model=self.model, contents=prompt, config=config)
+        return response.text or ""
+
+
+class StubModel:
+    """
+    Local stand-in for a Gemini model, for testing and benchmarking without API calls.
+
+    Topic prompts are answered with one record for every fourth transcript line or record in
+    the prompt, so the output has the shape a real model would return. Shownotes prompts are
+    answered with a time line of at most STUB_TIMELINE_ENTRIES entries, so the final answer
+    has the same size however long the episode is and however it was summarized. The
+    simulated latency grows with the size of the prompt and of the answer, like a hosted model's.
+
+    Args:
+        seconds_per_call (float): Fixed latency of every call.
+        seconds_per_1k_input_chars (float): Additional latency per 1000 prompt characters.
+        seconds_per_1k_output_chars (float): Additional latency per 1000 answer characters.
+    """
+
+    def __init__(
+        self,
+        seconds_per_call: float = 0.0,
+        seconds_per_1k_input_chars: float = 0.0,
+        seconds_per_1k_output_chars: float = 0.0
+    ):
+        self.model = "stub"
+        self.seconds_per_call = seconds_per_call
+        self.seconds_per_1k_input_chars = seconds_per_1k_input_chars
+        self.seconds_per_1k_output_chars = seconds_per_1k_output_chars
+        self.calls = 0
+
+    async def generate(self, prompt: str, json_output: bool = False) -> str:
+        self.calls += 1
+        # Only look at the transcript or records after the instructions
+        content = re.split(r'(?:转录内容|话题记录)：\n', prompt)[-1]
+        starts = re.findall(r'(?:^\[|"start": ")(\d+:\d{2}:\d{2})', content, re.MULTILINE)
+        if json_output:
+            # One topic every few lines, so every round reduces the number of records
+            records = [
+                {"start": start, "topic": f"话题 {start}", "summary": f"在 {start} 开始讨论的内容。"}
+                for start in starts[::4]
+            ]
+            text = json.dumps(records, ensure_ascii=False)
+        else:
+            # Spread a fixed number of entries over the episode
+            step = max(1, -(-len(starts) // STUB_TIMELINE_ENTRIES))
+            timeline = "\n".join(f"- {start} – 话题 {start}" for start in starts[::step])
+            text = f"# 节目标题\n\n## 节目简介\n\n本期节目的简介。\n\n## 时间轴\n{timeline}\n"
+
+        await asyncio.sleep(
+            self.seconds_per_call
+            + len(prompt) / 1000 * self.seconds_per_1k_input_chars
+            + len(text) / 1000 * self.seconds_per_1k_output_chars
+        )
+        return text
+
+
+def get_model(model: str):
+    """
+    Returns the model used for a summarization step: "stub" for the local stub model,
+    or the name of a Gemini model.
+    """
+    return StubModel() if model == "stub" else GeminiModel(model)
+
+
+def parse_transcript(transcript: str) -> list[TranscriptLine]:
+    """
+    Parses "[HH:MM:SS -> HH:MM:SS] text" lines; other lines are ignored.
+    """
+    lines = []
+    for line in transcript.splitlines():
+        match = TRANSCRIPT_LINE_PATTERN.match(line.strip())
+        if match:
+            h1, m1, s1, h2, m2, s2, _ = match.groups()
+            lines.append(TranscriptLine(
+                int(h1) * 3600 + int(m1) * 60 + int(s1),
+                int(h2) * 3600 + int(m2) * 60 + int(s2),
+                line.strip()
+            ))
+    return lines
+
+
+def window_transcript(
+    lines: list[TranscriptLine],
+    window_seconds: float = SHOWNOTES_WINDOW_SECONDS,
+    max_chars: int = SHOWNOTES_WINDOW_MAX_CHARS
+) -> list[list[TranscriptLine]]:
+    """
+    Splits transcript lines into consecutive windows of at most window_seconds of audio
+    and max_chars of text. A window always holds at least one line.
+    """
+    windows = []
+    current = []
+    current_chars = 0
+    for line in lines:
+        if current and (line.end - current[0].start > window_seconds or current_chars + len(line.line) > max_chars):
+            windows.append(current)
+            current = []
+            current_chars = 0
+        current.append(line)
+        current_chars += len(line.line) + 1
+    if current:
+        windows.append(current)
+    return windows
+
+
+def _parse_records(text: str) -> list[dict]:
+    """
+    Extracts the topic records from a model answer, tolerating code fences and extra text.
+    """
+    match = JSON_ARRAY_PATTERN.search(text)
+    if not match:
+        return []
+    try:
+        records = json.loads(match.group(0))
+    except ValueError:
+        return []
+    return [
+        {"start": str(record.get("start", "")), "topic": str(record.get("topic", "")), "summary": str(record.get("summary", ""))}
+        for record in records
+        if isinstance(record, dict) and record.get("topic")
+    ]
+
+
+def _format_records(records: list[dict]) -> str:
+    return json.dumps(records, ensure_ascii=False, indent=1)
+
+
+async def summarize_windows(
+    windows: list[list[TranscriptLine]],
+    model,
+    semaphore: asyncio.Semaphore
+) -> list[dict]:
+    """
+    Map step: summarizes every window concurrently into topic records, in transcript order.
+
+    A window whose answer can't be parsed is kept as one record with its first line's
+    timestamp, so no part of the episode disappears from the time line.
+    """
+    async def summarize(window: list[TranscriptLine]) -> list[dict]:
+        prompt = WINDOW_SUMMARY_PROMPT.format(
+            window_start=format_timestamp(window[0].start),
+            window_end=format_timestamp(window[-1].end),
+            transcript="\n".join(line.line for line in window)
+        )
+        async with semaphore:
+            answer = await model.generate(prompt, json_output=True)
+        records = _parse_records(answer)
+        if not records:
+            print(f"⚠️ Could not parse the topics of the window starting at {format_timestamp(window[0].start)}")
+            records = [{"start": format_timestamp(window[0].start), "topic": "", "summary": answer.strip()[:1000]}]
+        return records
+
+    results = await asyncio.gather(*(summarize(window) for window in windows))
+    return [record for records in results for record in records]
+
+
+async def condense_records(
+    records: list[dict],
+    model,
+    semaphore: asyncio.Semaphore,
+    max_chars: int = SHOWNOTES_REDUCE_MAX_CHARS
+) -> tuple[list[dict], int]:
+    """
+    Intermediate reduce step: merges neighbouring topic records in concurrent groups,
+    round after round, until all records fit in max_chars.
+
+    Returns:
+        tuple: The condensed records and the number of rounds that were needed.
+    """
+    rounds = 0
+    while len(_format_records(records)) > max_chars and len(records) > 1:
+        groups = [[]]
+        for record in records:
+            if groups[-1] and len(_format_records(groups[-1] + [record])) > max_chars:
+                groups.append([])
+            groups[-1].append(record)
+
+        async def condense(group: list[dict]) -> list[dict]:
+            async with semaphore:
+                answer = await model.generate(CONDENSE_PROMPT.format(records=_format_records(group)), json_output=True)
+            return _parse_records(answer) or group
+
+        results = await asyncio.gather(*(condense(group) for group in groups))
+        condensed = [record for group_records in results for record in group_records]
+        rounds += 1
+        if len(condensed) >= len(records):
+            # The model did not merge anything, so further rounds would not converge
+            records = condensed
+            break
+        records = condensed
+    return records, rounds
+
+
+async def create_shownotes(
+    transcript: str,
+    map_model=None,
+    reduce_model=None,
+    window_seconds: float = SHOWNOTES_WINDOW_SECONDS,
+    window_max_chars: int = SHOWNOTES_WINDOW_MAX_CHARS,
+    reduce_max_chars: int = SHOWNOTES_REDUCE_MAX_CHARS,
+    max_concurrency: int = SHOWNOTES_MAX_CONCURRENCY
+) -> dict:
+    """
+    Writes shownotes for a transcript with a hierarchical map-reduce over the model.
+
+    The transcript is split into windows by time and size (see `window_transcript`), every
+    window is summarized into topic records with timestamps by concurrent calls to the map
+    model, long episodes get their records merged in further concurrent rounds, and a
+    single call to the reduce model writes the 标题/简介/时间轴 template from the records.
+    At most max_concurrency model calls are in flight at once.
+
+    Args:
+        transcript (str): Transcript text with "[HH:MM:SS -> HH:MM:SS] text" lines.
+        map_model: Model for the window and merge calls (defaults to SHOWNOTES_MAP_MODEL).
+        reduce_model: Model for the final call (defaults to SHOWNOTES_REDUCE_MODEL).
+        window_seconds (float): Maximum audio length of one window.
+        window_max_chars (int): Maximum transcript characters in one window.
+        reduce_max_chars (int): Maximum size of the records passed to the final call.
+        max_concurrency (int): Maximum number of model calls in flight at once.
+
+    Returns:
+        dict: A dictionary containing:
+            - shownotes (str): The shownotes in Markdown
+            - windows (int): Number of transcript windows
+            - records (list): Topic records the shownotes were written from
+            - condense_rounds (int): Number of merge rounds before the final call
+            - map_seconds, reduce_seconds, total_seconds (float): Time spent in each stage
+
+    Example:
+        >>> result = await create_shownotes(transcript, map_model=StubModel(), reduce_model=StubModel())
+        >>> result["windows"]
+        12
+    """
+    map_model = map_model or get_model(SHOWNOTES_MAP_MODEL)
+    reduce_model = reduce_model or get_model(SHOWNOTES_REDUCE_MODEL)
+    lines = parse_transcript(transcript)
+    if not lines:
+        raise ValueError("The transcript has no '[HH:MM:SS -> HH:MM:SS] text' lines")
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    start_time = time.perf_counter()
+    windows = window_transcript(lines, window_seconds, window_max_chars)
+    records = await summarize_windows(windows, map_model, semaphore)
+    records, condense_rounds = await condense_records(records, map_model, semaphore, reduce_max_chars)
+    map_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    shownotes = await reduce_model.generate(SHOWNOTES_PROMPT.format(
+        duration=format_timestamp(lines[-1].end),
+        template=SHOWNOTES_TEMPLATE,
+        records=_format_records(records)
+    ))
+    reduce_seconds = time.perf_counter() - start_time
+
+    return {
+        "shownotes": shownotes,
+        "windows": len(windows),
+        "records": records,
+        "condense_rounds": condense_rounds,
+        "map_seconds": map_seconds,
+        "reduce_seconds": reduce_seconds,
+        "total_seconds": map_seconds + reduce_seconds
+    }
+
+
+async def create_shownotes_single_shot(transcript: str, model=None) -> dict:
+    """
+    Writes shownotes with one call that receives the whole transcript, as the agent did
+    before the map-reduce pipeline. Kept as the baseline for the shownotes benchmark.
+    """
+    model = model or get_model(SHOWNOTES_REDUCE_MODEL)
+    start_time = time.perf_counter()
+    shownotes = await model.generate(f"{SHOWNOTES_TEMPLATE}\n转录内容：\n{transcript}")
+    return {"shownotes": shownotes, "total_seconds": time.perf_counter() - start_time}
+
+
+async def summarize_transcript(transcript_file_path: str) -> dict:
+    """
+    Creates Chinese shownotes from a transcript text file with a map-reduce summarization.
+
+    The transcript is read from disk, so it never has to pass through the agent's context.
+    It is split into time windows that are summarized concurrently into topics with
+    timestamps, and the topics are then combined into the 标题/简介/时间轴 template.
+    The shownotes are also saved as a Markdown file next to the transcript.
+
+    Args:
+        transcript_file_path (str): Path to a transcript file with lines formatted as
+            "[HH:MM:SS -> HH:MM:SS] text", such as the one written by transcribe_audio.
+
+    Returns:
+        dict: A dictionary containing:
+            - success (bool): Whether the shownotes were created
+            - message (str): Description of the result
+            - shownotes (str): The shownotes in Markdown
+            - shownotes_file_path (str): Path of the saved shownotes
+            - windows (int): Number of transcript windows that were summarized
+
+    Example:
+        >>> result = await summarize_transcript("/podcasts/E22.txt")
+        ✓ Created shownotes from 12 transcript windows in 41.3s
+        >>> result["shownotes_file_path"]
+        '/podcasts/E22.shownotes.md'
+    """
+    try:
+        with open(transcript_file_path, 'r', encoding='utf-8') as f:
+            transcript = f.read()
+        result = await create_shownotes(transcript)
+    except Exception as e:
+        print(f"❌ Error creating shownotes from {transcript_file_path}: {e}")
+        return {
+            "success": False,
+            "message": f"Error creating shownotes: {str(e)}"
+        }
+
+    shownotes_file_path = os.path.splitext(transcript_file_path)[0] + ".shownotes.md"
+    with open(shownotes_file_path, 'w', encoding='utf-8') as f:
+        f.write(result["shownotes"])
+
+    message = f"Created shownotes from {result['windows']} transcript windows in {result['total_seconds']:.1f}s"
+    print(f"✓ {message}")
+    return {
+        "success": True,
+        "message": message,
+        "shownotes": result["shownotes"],
+        "shownotes_file_path": shownotes_file_path,
+        "windows": result["windows"]
+    }
@@ -0,0 +1,99 @@
+import time
+import hashlib
+
+from .sqlite_cache import SqliteLruCache
+
+
+def hash_audio_file(audio_file_path: str) -> str:
+    """
+    Returns the BLAKE2b hex digest of an audio file, streamed in 1 MB chunks.
+
+    The hash only depends on the content, so a copied or renamed episode still matches.
+    BLAKE2b hashes at several hundred MB per second, a fraction of a second for a podcast.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(audio_file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TranscriptCache(SqliteLruCache):
+    """
+    On-disk SQLite cache of finished transcripts, keyed by audio content hash and model settings.
+
+    A transcript is returned only for the exact audio content (see `hash_audio_file`) and
+    the same transcription settings (model size, compute type, beam size, ...) it was made
+    with. The cache is bounded by the total size of the stored transcripts; the least
+    recently used entries are evicted first.
+
+    Args:
+        path (str): Path of the SQLite database file. Parent folders are created on first use.
+        max_bytes (int): Maximum total size of the cached transcripts, in bytes.
+
+    Example:
+        >>> cache = TranscriptCache("./.cache/transcripts.sqlite3", max_bytes=256 * 1024 * 1024)
+        >>> cache.put(audio_hash, "base:int8:5", transcript, "zh", 0.98, 412)
+        >>> cache.get(audio_hash, "base:int8:5")["segments"]
+        412
+        >>> cache.stats()
+        {'hits': 1, 'misses': 0, 'entries': 1, 'size_bytes': 40960, 'max_bytes': 268435456}
+    """
+
+    table = "transcripts"
+    key_columns = ("audio_hash", "settings")
+    columns = (
+        "audio_hash TEXT NOT NULL, settings TEXT NOT NULL, transcript TEXT NOT NULL, "
+        "language TEXT, language_probability REAL, segments INTEGER NOT NULL"
+    )
+
+    def get(self, audio_hash: str, settings: str) -> dict | None:
+        """
+        Returns the cached transcript with its language and segment count, or None on a miss.
+        """
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT transcript, language, language_probability, segments FROM transcripts "
+            "WHERE audio_hash = ? AND settings = ?",
+            (audio_hash, settings)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self._touch(connection, (audio_hash, settings))
+        connection.commit()
+        self.hits += 1
+        transcript, language, language_probability, segments = row
+        return {
+            "transcript": transcript,
+            "language": language,
+            "language_probability": language_probability,
+            "segments": segments
+        }
+
+    def put(
+        self,
+        audio_hash: str,
+        settings: str,
+        transcript: str,
+        language: str,
+        language_probability: float,
+        segments: int
+    ):
+        """
+        Stores a finished transcript, then evicts least recently used entries over max_bytes.
+        """
+        size = len(transcript.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        connection = self._connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO transcripts "
+            "(audio_hash, settings, transcript, language, language_probability, segments, size, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (audio_hash, settings, transcript, language, language_probability, segments, size, time.time())
+        )
+        self._evict(connection)
+        connection.commit()
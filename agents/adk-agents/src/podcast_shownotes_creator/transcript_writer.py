@@ -0,0 +1,244 @@
+import os
+import json
+import sqlite3
+
+from .preprocessing import get_preprocessing_settings
+from .transcript_cache import TranscriptCache, hash_audio_file
+from .profiles import TranscriptionProfile, get_profile
+from .transcription import WHISPER_PARALLEL_WORKERS, TranscriptSegment, transcribe_segments
+from .whisper_models import WHISPER_COMPUTE_TYPE, WHISPER_CPU_THREADS
+
+# Set TRANSCRIPT_CACHE=0 to always transcribe, even audio that was transcribed before
+TRANSCRIPT_CACHE = os.getenv("TRANSCRIPT_CACHE", "1").lower() in ("1", "true", "yes")
+
+transcript_cache = TranscriptCache(
+    path=os.getenv(
+        "TRANSCRIPT_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "transcripts.sqlite3")
+    ),
+    max_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+)
+
+
+def format_timestamp(seconds):
+    """Convert seconds to HH:MM:SS format"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def format_segment(segment: TranscriptSegment) -> str:
+    """Format a segment as "[HH:MM:SS -> HH:MM:SS] text" on a single line"""
+    text = segment.text.replace("\r", " ").replace("\n", " ")
+    return "[%s -> %s] %s" % (format_timestamp(segment.start), format_timestamp(segment.end), text)
+
+
+def get_transcript_path(audio_file_path: str) -> str:
+    """
+    Returns the path of the transcript text file next to an audio file.
+
+    Example:
+        >>> get_transcript_path("/podcasts/E22.mp3")
+        '/podcasts/E22.txt'
+    """
+    return os.path.splitext(audio_file_path)[0] + ".txt"
+
+
+def get_transcription_settings(profile: TranscriptionProfile) -> dict:
+    """
+    Returns the settings that change the transcript produced for the same audio.
+    """
+    return {
+        "model_size": profile.model_size,
+        "compute_type": WHISPER_COMPUTE_TYPE,
+        "beam_size": profile.beam_size,
+        "temperature": list(profile.temperature),
+        "batch_size": profile.batch_size,
+        "condition_on_previous_text": profile.condition_on_previous_text,
+        "word_timestamps": profile.word_timestamps,
+        "preprocessing": get_preprocessing_settings()
+    }
+
+
+def _get_fingerprint(audio_file_path: str, profile: TranscriptionProfile) -> dict:
+    """
+    Identifies the audio file and the model settings a checkpoint belongs to.
+    """
+    stat = os.stat(audio_file_path)
+    return {
+        "audio_size": stat.st_size,
+        "audio_mtime": stat.st_mtime,
+        **get_transcription_settings(profile)
+    }
+
+
+def _write_text(file_path: str, text: str):
+    # Write a new file and rename it, so a crash never leaves a half-written file
+    temporary_path = f"{file_path}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temporary_path, file_path)
+
+
+def _load_checkpoint(checkpoint_path: str, fingerprint: dict) -> dict | None:
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(checkpoint.get(key) != value for key, value in fingerprint.items()):
+        return None
+    return checkpoint
+
+
+def _save_checkpoint(checkpoint_path: str, checkpoint: dict):
+    _write_text(checkpoint_path, json.dumps(checkpoint))
+
+
+def _keep_first_lines(file_path: str, line_count: int):
+    """
+    Truncates a text file after its first line_count lines.
+    """
+    with open(file_path, 'r+', encoding='utf-8') as f:
+        for _ in range(line_count):
+            if not f.readline():
+                break
+        f.truncate(f.tell())
+
+
+def transcribe_to_file(
+    audio_file_path: str,
+    transcript_file_path: str | None = None,
+    profile: str | TranscriptionProfile | None = None,
+    cache: TranscriptCache | None = transcript_cache if TRANSCRIPT_CACHE else None,
+    workers: int = WHISPER_PARALLEL_WORKERS,
+    cpu_threads: int = WHISPER_CPU_THREADS,
+    print_segments: bool = True
+) -> dict:
+    """
+    Transcribes an audio file, streaming every segment to a transcript text file as it is produced.
+
+    Each segment is written (and flushed) as one "[HH:MM:SS -> HH:MM:SS] text" line, so the
+    transcript is never held in memory. After every line, a checkpoint with the end time of
+    the last completed segment is saved next to the transcript. If a transcription is
+    interrupted, the next run for the same audio file and model settings keeps the lines
+    already written and resumes from the checkpoint instead of from zero. The checkpoint
+    is removed once the transcription completes.
+
+    Finished transcripts are stored in the transcript cache, keyed by a hash of the audio
+    content and the transcription settings. Transcribing the same audio again (e.g. to
+    rerun the shownotes with another prompt) writes the cached transcript instantly.
+
+    Args:
+        audio_file_path (str): Path to the audio file.
+        transcript_file_path (str | None): Path of the transcript file. Defaults to a .txt
+            file with the same name next to the audio file.
+        profile (str | TranscriptionProfile | None): Decoding profile (fast, balanced or
+            accurate); WHISPER_PROFILE when not given.
+        cache (TranscriptCache | None): Cache of finished transcripts, or None to always transcribe.
+        workers (int): Number of worker processes for chunked transcription (see `transcribe_segments`).
+        cpu_threads (int): Threads per transcription (0 for the default).
+        print_segments (bool): Whether to print every segment as it is written.
+
+    Returns:
+        dict: A dictionary containing:
+            - transcript_file_path (str): Path of the transcript file
+            - segments (int): Number of lines in the transcript
+            - language (str): Detected language
+            - language_probability (float): Probability of the detected language
+            - resumed_from (float): Seconds into the audio the run resumed from (0 for a fresh run)
+            - cached (bool): Whether the transcript came from the transcript cache
+
+    Example:
+        >>> result = transcribe_to_file("/podcasts/E22.mp3")
+        Detected language 'zh' with probability 0.981234
+        [00:00:00 -> 00:00:05] 欢迎收听本期节目
+        >>> result["transcript_file_path"]
+        '/podcasts/E22.txt'
+    """
+    transcript_file_path = transcript_file_path or get_transcript_path(audio_file_path)
+    checkpoint_path = f"{transcript_file_path}.checkpoint"
+    profile = get_profile(profile)
+    fingerprint = _get_fingerprint(audio_file_path, profile)
+
+    audio_hash = None
+    if cache is not None:
+        audio_hash = hash_audio_file(audio_file_path)
+        settings = ":".join(str(value) for value in get_transcription_settings(profile).values())
+        try:
+            cached = cache.get(audio_hash, settings)
+        except sqlite3.Error as e:
+            # A locked or corrupt cache must not stop the transcription; treat it as a miss
+            print(f"⚠️ Could not read the transcript cache, continuing without it: {e}")
+            cached = None
+            cache = None
+        if cached is not None:
+            _write_text(transcript_file_path, cached["transcript"])
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+            print(f"Using cached transcript ({cached['segments']} segments)")
+            return {
+                "transcript_file_path": transcript_file_path,
+                "segments": cached["segments"],
+                "language": cached["language"],
+                "language_probability": cached["language_probability"],
+                "resumed_from": 0.0,
+                "cached": True
+            }
+
+    checkpoint = _load_checkpoint(checkpoint_path, fingerprint)
+    if checkpoint is not None and os.path.exists(transcript_file_path):
+        # Keep the lines covered by the checkpoint, dropping anything written after it
+        _keep_first_lines(transcript_file_path, checkpoint["segments"])
+        resumed_from = checkpoint["completed_seconds"]
+        segment_count = checkpoint["segments"]
+        mode = 'a'
+        print(f"Resuming transcription from {format_timestamp(resumed_from)} ({segment_count} segments already written)")
+    else:
+        resumed_from = 0.0
+        segment_count = 0
+        mode = 'w'
+
+    segments, language, language_probability = transcribe_segments(
+        audio_file_path,
+        workers=workers,
+        profile=profile,
+        start_seconds=resumed_from,
+        cpu_threads=cpu_threads,
+        audio_hash=audio_hash
+    )
+    print("Detected language '%s' with probability %f" % (language, language_probability))
+
+    with open(transcript_file_path, mode, encoding='utf-8') as f:
+        for segment in segments:
+            formatted_text = format_segment(segment)
+            if print_segments:
+                print(formatted_text)
+            f.write(formatted_text + "\n")
+            f.flush()
+            segment_count += 1
+            _save_checkpoint(checkpoint_path, {
+                **fingerprint,
+                "completed_seconds": segment.end,
+                "segments": segment_count
+            })
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    if cache is not None:
+        try:
+            with open(transcript_file_path, 'r', encoding='utf-8') as f:
+                cache.put(audio_hash, settings, f.read(), language, language_probability, segment_count)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Could not add the transcript to the cache: {e}")
+
+    return {
+        "transcript_file_path": transcript_file_path,
+        "segments": segment_count,
+        "language": language,
+        "language_probability": language_probability,
+        "resumed_from": resumed_from,
+        "cached": False
+    }
@@ -0,0 +1,230 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, NamedTuple
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from .preprocessing import AUDIO_PREPROCESS, preprocess_audio
+from .profiles import TranscriptionProfile, get_decode_options, get_profile
+from .whisper_models import WHISPER_COMPUTE_TYPE, WHISPER_CPU_THREADS, WHISPER_NUM_WORKERS, get_whisper_model
+
+SAMPLE_RATE = 16000
+# Number of worker processes for chunked transcription; 1 transcribes the file as one stream
+WHISPER_PARALLEL_WORKERS = int(os.getenv("WHISPER_PARALLEL_WORKERS", "1"))
+# Target chunk length; chunks are cut at the first silence after this many seconds
+WHISPER_CHUNK_SECONDS = float(os.getenv("WHISPER_CHUNK_SECONDS", "300"))
+# Only silences at least this long are used as chunk boundaries
+WHISPER_CHUNK_MIN_SILENCE_MS = int(os.getenv("WHISPER_CHUNK_MIN_SILENCE_MS", "500"))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+class TranscriptSegment(NamedTuple):
+    start: float
+    end: float
+    text: str
+
+
+def find_chunk_boundaries(
+    audio: np.ndarray,
+    chunk_seconds: float = WHISPER_CHUNK_SECONDS,
+    min_silence_ms: int = WHISPER_CHUNK_MIN_SILENCE_MS
+) -> list[tuple[int, int]]:
+    """
+    Splits 16 kHz audio into chunks of roughly chunk_seconds, cutting only inside silences.
+
+    Speech is detected with the Silero VAD bundled with faster-whisper. Each chunk ends in
+    the middle of the first silence found after chunk_seconds, so no word is cut in half.
+
+    Returns:
+        list[tuple[int, int]]: (start, end) sample indices covering the whole audio.
+    """
+    if len(audio) == 0:
+        return []
+
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=min_silence_ms))
+    chunk_samples = int(chunk_seconds * SAMPLE_RATE)
+    boundaries = [0]
+    for previous, current in zip(speech, speech[1:]):
+        middle_of_silence = (previous["end"] + current["start"]) // 2
+        if middle_of_silence - boundaries[-1] >= chunk_samples:
+            boundaries.append(middle_of_silence)
+    boundaries.append(len(audio))
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _transcribe(audio, profile: TranscriptionProfile, compute_type: str, cpu_threads: int, num_workers: int, options: dict):
+    """
+    Runs the model of a profile, through the batched pipeline when the profile batches windows.
+    """
+    model = get_whisper_model(profile.model_size, compute_type, cpu_threads, num_workers)
+    if profile.batch_size:
+        return BatchedInferencePipeline(model).transcribe(audio, **get_decode_options(profile), **options)
+    return model.transcribe(audio, **get_decode_options(profile), **options)
+
+
+def _transcribe_chunk(
+    audio: np.ndarray,
+    offset_seconds: float,
+    profile: TranscriptionProfile,
+    compute_type: str,
+    cpu_threads: int
+) -> tuple[list[TranscriptSegment], str, float]:
+    """
+    Transcribes one chunk in a worker process, shifting timestamps to the whole file.
+    """
+    segments, info = _transcribe(audio, profile, compute_type, cpu_threads, 1, {})
+    return (
+        [
+            TranscriptSegment(offset_seconds + segment.start, offset_seconds + segment.end, segment.text)
+            for segment in segments
+        ],
+        info.language,
+        info.language_probability
+    )
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Returns the worker pool, keeping it (and the model loaded in each worker) between calls.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    """
+    Stops the chunked transcription workers and releases their models.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def transcribe_segments(
+    audio_file_path: str,
+    workers: int = WHISPER_PARALLEL_WORKERS,
+    chunk_seconds: float = WHISPER_CHUNK_SECONDS,
+    profile: str | TranscriptionProfile | None = None,
+    start_seconds: float = 0.0,
+    cpu_threads: int = WHISPER_CPU_THREADS,
+    audio_hash: str | None = None
+) -> tuple[Iterator[TranscriptSegment], str, float]:
+    """
+    Transcribes an audio file and returns its segments with the detected language.
+
+    Unless AUDIO_PREPROCESS is disabled, the audio is first decoded once into the PCM cache
+    and stretches without speech are cut out (see `preprocess_audio`); reported timestamps
+    are mapped back to the original file.
+
+    With more than one worker, the audio is split into chunks at silences
+    (see `find_chunk_boundaries`) and the chunks are transcribed in parallel in a process
+    pool with one model per worker. Segments are yielded in order with timestamps relative
+    to the start of the file, as soon as every earlier chunk is done. Audio shorter than one
+    chunk, or a single worker, is transcribed as one stream in this process.
+
+    Args:
+        audio_file_path (str): Path to the audio file.
+        workers (int): Number of worker processes.
+        chunk_seconds (float): Target chunk length in seconds. Shorter chunks are used when
+            the audio would otherwise not give every worker a chunk.
+        profile (str | TranscriptionProfile | None): Decoding profile (fast, balanced or
+            accurate, see `profiles.py`); WHISPER_PROFILE when not given.
+        start_seconds (float): Position to start transcribing from, e.g. to resume an
+            interrupted transcription. Timestamps stay relative to the start of the file.
+        cpu_threads (int): Threads per transcription (0 for the default). With several
+            workers, 0 splits the cores evenly between them.
+        audio_hash (str | None): The `hash_audio_file` digest of the file, if already
+            computed, so preprocessing does not hash the audio again.
+
+    Returns:
+        tuple: An iterator of TranscriptSegment(start, end, text), the detected language
+            and its probability. Chunked transcriptions report the language of the first chunk.
+
+    Example:
+        >>> segments, language, probability = transcribe_segments("podcast_episode.mp3", workers=4)
+        >>> next(segments)
+        TranscriptSegment(start=0.0, end=5.2, text=' Welcome to our podcast.')
+    """
+    profile = get_profile(profile)
+    options = {}
+    audio = audio_file_path
+    timestamp_map = None
+    offset_seconds = 0.0
+
+    if AUDIO_PREPROCESS:
+        audio, timestamp_map = preprocess_audio(audio_file_path, audio_hash=audio_hash)
+    elif workers > 1 or (start_seconds > 0 and profile.batch_size):
+        audio = decode_audio(audio_file_path, sampling_rate=SAMPLE_RATE)
+
+    if start_seconds > 0 and not isinstance(audio, str):
+        if timestamp_map is not None:
+            offset_seconds = timestamp_map.to_processed(start_seconds)
+        else:
+            offset_seconds = start_seconds
+        audio = audio[int(offset_seconds * SAMPLE_RATE):]
+
+    def to_original(segment_start: float, segment_end: float, text: str) -> TranscriptSegment:
+        start, end = offset_seconds + segment_start, offset_seconds + segment_end
+        if timestamp_map is not None:
+            start, end = timestamp_map.to_original(start), timestamp_map.to_original(end, is_end=True)
+        return TranscriptSegment(start, end, text)
+
+    if workers > 1:
+        # Give every worker at least one chunk, without going below Whisper's 30 second window
+        chunk_seconds = max(30.0, min(chunk_seconds, len(audio) / SAMPLE_RATE / workers))
+        chunks = find_chunk_boundaries(audio, chunk_seconds) if len(audio) > chunk_seconds * SAMPLE_RATE else []
+        if len(chunks) > 1:
+            # Split the cores between the workers unless the thread count is configured
+            cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+            pool = _get_pool(workers)
+            futures = [
+                pool.submit(
+                    _transcribe_chunk,
+                    np.ascontiguousarray(audio[start:end]),
+                    start / SAMPLE_RATE,
+                    profile,
+                    WHISPER_COMPUTE_TYPE,
+                    cpu_threads
+                )
+                for start, end in chunks
+            ]
+            first_segments, language, language_probability = futures[0].result()
+
+            def iter_segments() -> Iterator[TranscriptSegment]:
+                try:
+                    for future in futures:
+                        chunk_segments = first_segments if future is futures[0] else future.result()[0]
+                        for segment in chunk_segments:
+                            yield to_original(*segment)
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+            return iter_segments(), language, language_probability
+
+    if start_seconds > 0 and isinstance(audio, str):
+        # Whisper skips to the clip start and keeps timestamps relative to the whole file
+        options["clip_timestamps"] = [start_seconds]
+
+    segments, info = _transcribe(audio, profile, WHISPER_COMPUTE_TYPE, cpu_threads, WHISPER_NUM_WORKERS, options)
+    return (
+        (to_original(segment.start, segment.end, segment.text) for segment in segments),
+        info.language,
+        info.language_probability
+    )
@@ -0,0 +1,84 @@
+import os
+import time
+import threading
+from faster_whisper import WhisperModel
+
+# Default model size (tiny, base, small, medium, large-v3, ...); when set, it also replaces the model of every profile
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+# int8 is the fastest on CPU, int8_float32 keeps float32 activations, float32 is full precision
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+# Threads per transcription (0 lets CTranslate2 decide) and transcriptions that can run in parallel
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "1"))
+# Set WHISPER_PRELOAD=1 to load the model in the background when the agent starts
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "0").lower() in ("1", "true", "yes")
+
+CPU_COMPUTE_TYPES = ["int8", "int8_float32", "int8_float16", "int16", "float32"]
+
+_models: dict[tuple, WhisperModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_whisper_model(
+    model_size: str = WHISPER_MODEL_SIZE,
+    compute_type: str = WHISPER_COMPUTE_TYPE,
+    cpu_threads: int = WHISPER_CPU_THREADS,
+    num_workers: int = WHISPER_NUM_WORKERS
+) -> WhisperModel:
+    """
+    Returns a CPU Whisper model, loading it only the first time it is requested.
+
+    Models are kept for the lifetime of the process and keyed by model size, compute type
+    and threading settings, so every transcription after the first skips the model load.
+
+    Args:
+        model_size (str): Whisper model size, e.g. "tiny", "base" or "small".
+        compute_type (str): CTranslate2 compute type; "int8" and "int8_float32" are
+            quantized modes that run considerably faster on CPU than "float32".
+        cpu_threads (int): Number of threads used by one transcription (0 for the default).
+        num_workers (int): Number of transcriptions that can run in parallel on the model.
+
+    Returns:
+        WhisperModel: The loaded model.
+
+    Example:
+        >>> model = get_whisper_model("base", "int8")
+        Loaded Whisper model 'base' (int8) in 0.8s
+        >>> model is get_whisper_model("base", "int8")
+        True
+    """
+    key = (model_size, compute_type, cpu_threads, num_workers)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            start_time = time.perf_counter()
+            model = WhisperModel(
+                model_size,
+                device="cpu",
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers
+            )
+            print(f"Loaded Whisper model '{model_size}' ({compute_type}) in {time.perf_counter() - start_time:.1f}s")
+            _models[key] = model
+    return model
+
+
+def preload_whisper_model(model_size: str = WHISPER_MODEL_SIZE) -> threading.Thread:
+    """
+    Loads a Whisper model with the default settings in a background thread.
+
+    A transcription requested while the model is still loading waits for that load
+    instead of starting a second one.
+    """
+    thread = threading.Thread(target=get_whisper_model, args=(model_size,), name="whisper-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def clear_whisper_models():
+    """
+    Drops every loaded model so its memory can be released.
+    """
+    with _models_lock:
+        _models.clear()